@@ -0,0 +1,3 @@
+import json,sys
+_ = json.loads(sys.stdin.read())
+print(json.dumps({"status":"executed","reason":"executor_success","operation_id":"tx-1"}))
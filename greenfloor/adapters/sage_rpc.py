@@ -8,16 +8,129 @@ This module provides:
 - ``_sage_data_dir()``    – OS-aware path to com.rigidnetwork.sage/
 - ``SageRpcClient``       – async aiohttp-based RPC client with mTLS
 - ``resolve_sage_client`` – build a client from config or auto-detected paths
+- ``shutdown_sage_sessions`` – close the shared sessions on the running loop
 """
+
 from __future__ import annotations
 
-import json
+import asyncio
+import functools
+import os
 import platform
 import ssl
+import time
+import weakref
+from collections.abc import AsyncGenerator, Callable
 from pathlib import Path
 from typing import Any
 
 import aiohttp
+import orjson
+
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+_LOOPBACK_HOSTS = frozenset({"127.0.0.1", "localhost", "::1"})
+
+# A hung Sage must not pin a pooled connection (and every coroutine queued
+# behind it) forever.
+_DEFAULT_TIMEOUT_SECONDS = 30.0
+_CONNECT_TIMEOUT_SECONDS = 5.0
+# State-changing calls (make_offer, bulk_send_cat, sign_coin_spends, ...) can
+# legitimately run for minutes on a large wallet, and abandoning one midway
+# leaves its outcome unknown.  They get no total limit, only a bound on how
+# long Sage may go silent.
+_STATE_CHANGING_READ_TIMEOUT_SECONDS = 300.0
+_STATE_CHANGING_TIMEOUT = aiohttp.ClientTimeout(
+    total=None,
+    connect=_CONNECT_TIMEOUT_SECONDS,
+    sock_connect=_CONNECT_TIMEOUT_SECONDS,
+    sock_read=_STATE_CHANGING_READ_TIMEOUT_SECONDS,
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _client_timeout(total: float) -> aiohttp.ClientTimeout:
+    return aiohttp.ClientTimeout(
+        total=total,
+        connect=_CONNECT_TIMEOUT_SECONDS,
+        sock_connect=_CONNECT_TIMEOUT_SECONDS,
+        sock_read=total,
+    )
+
+
+# Sage serves HTTP/1.1 only, so concurrent RPCs each need their own connection.
+# A small pool keeps gather()-style fan-outs on a handful of reused keep-alive
+# connections instead of paying a fresh mTLS handshake per in-flight call.
+_SAGE_MAX_CONNECTIONS = 8
+
+# Endpoints with typed helpers on SageRpcClient; their URLs are pre-formatted.
+_KNOWN_ENDPOINTS = frozenset(
+    {
+        "get_version",
+        "get_sync_status",
+        "get_keys",
+        "get_key",
+        "login",
+        "logout",
+        "get_coins",
+        "get_cats",
+        "get_token",
+        "make_offer",
+        "sign_coin_spends",
+        "submit_transaction",
+        "view_offer",
+        "get_offers",
+        "cancel_offer",
+        "bulk_send_cat",
+    }
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _base_url_for(host: str, port: int, tls: bool) -> str:
+    """Return the interned base URL for a Sage host/port (shared by all clients)."""
+    return f"{'https' if tls else 'http'}://{host}:{port}"
+
+
+@functools.lru_cache(maxsize=8)
+def _endpoint_urls(base_url: str) -> dict[str, str]:
+    """Return the ``{endpoint: url}`` table shared by all clients of *base_url*."""
+    return {endpoint: f"{base_url}/{endpoint}" for endpoint in _KNOWN_ENDPOINTS}
+
+
+# Endpoints that only read wallet state.  Every other endpoint (make_offer,
+# bulk_send_cat, login, ...) may change what Sage would answer, so calling one
+# clears the response cache.
+_READ_ONLY_ENDPOINTS = frozenset(
+    {
+        "get_version",
+        "get_sync_status",
+        "get_keys",
+        "get_key",
+        "get_coins",
+        "get_cats",
+        "get_token",
+        "view_offer",
+        "get_offers",
+    }
+)
+
+# Cache TTLs in seconds.  Only the Sage version is cached: balances and coin
+# state move with every offer and send, so they are always fetched live.  Raw
+# response bytes are cached (not parsed objects) so every caller gets its own
+# fresh, mutable result.
+_CACHEABLE_ENDPOINT_TTLS: dict[str, float] = {
+    "get_version": 3600.0,
+}
+_response_cache: dict[tuple[str, str, bytes], tuple[float, bytes]] = {}
+
+
+def _decode_body(raw: bytes) -> Any:
+    try:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        return raw.decode("utf-8", "replace")
 
 
 # ---------------------------------------------------------------------------
@@ -43,31 +156,145 @@ def configure_sage_fingerprint(fingerprint: int | None) -> None:
 # Path helpers
 # ---------------------------------------------------------------------------
 
+# Per-OS base directory for app data; anything else is treated as Linux/POSIX.
+_OS_DATA_BASE: dict[str, tuple[str, ...]] = {
+    "Windows": ("AppData", "Roaming"),
+    "Darwin": ("Library", "Application Support"),
+}
+
+# The OS and home directory are fixed for the life of the process, so the
+# default locations are resolved once at import.
+_SAGE_DATA_DIR = Path.home().joinpath(
+    *_OS_DATA_BASE.get(platform.system(), (".local", "share")), "com.rigidnetwork.sage"
+)
+_DEFAULT_CERT_PATH = _SAGE_DATA_DIR / "ssl" / "wallet.crt"
+_DEFAULT_KEY_PATH = _SAGE_DATA_DIR / "ssl" / "wallet.key"
+
+
 def _sage_data_dir() -> Path:
     """Return the default Sage wallet data directory for the current OS."""
-    system = platform.system()
-    if system == "Windows":
-        base = Path.home() / "AppData" / "Roaming"
-    elif system == "Darwin":
-        base = Path.home() / "Library" / "Application Support"
-    else:
-        # Linux / other POSIX
-        base = Path.home() / ".local" / "share"
-    return base / "com.rigidnetwork.sage"
+    return _SAGE_DATA_DIR
 
 
 def _default_cert_path() -> Path:
-    return _sage_data_dir() / "ssl" / "wallet.crt"
+    return _DEFAULT_CERT_PATH
 
 
 def _default_key_path() -> Path:
-    return _sage_data_dir() / "ssl" / "wallet.key"
+    return _DEFAULT_KEY_PATH
+
+
+# ---------------------------------------------------------------------------
+# TLS context
+# ---------------------------------------------------------------------------
+
+
+@functools.lru_cache(maxsize=8)
+def _build_ssl_ctx(
+    cert_path: str,
+    key_path: str,
+    cert_mtime_ns: int,
+    key_mtime_ns: int,
+) -> ssl.SSLContext:
+    """Build the mTLS client context for a cert pair.
+
+    Loading the cert chain is the expensive part, so contexts are cached; the
+    file mtimes are part of the key so a regenerated Sage cert is picked up.
+    TLS session tickets are left enabled (no ``OP_NO_TICKET``).
+    """
+    _ = cert_mtime_ns, key_mtime_ns
+    ssl_ctx = ssl.create_default_context()
+    ssl_ctx.check_hostname = False
+    ssl_ctx.verify_mode = ssl.CERT_NONE  # Sage uses a self-signed cert
+    ssl_ctx.load_cert_chain(certfile=cert_path, keyfile=key_path)
+    return ssl_ctx
+
+
+def _ssl_ctx_for(cert_path: Path, key_path: Path) -> ssl.SSLContext:
+    return _build_ssl_ctx(
+        str(cert_path),
+        str(key_path),
+        os.stat(cert_path).st_mtime_ns,
+        os.stat(key_path).st_mtime_ns,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Shared sessions
+#
+# GreenFloor only ever talks to one local Sage endpoint, so every client for
+# the same (cert, key, base URL) shares one aiohttp session and therefore
+# one keep-alive connection pool.  aiohttp sessions are bound to the event
+# loop that created them, so the cache is per loop.  Each session is owned by
+# a small async generator: when the loop shuts down (``asyncio.run`` and
+# aiohttp's runner both call ``loop.shutdown_asyncgens()``) the generator is
+# finalized, closes its session and drops the loop's cache entry, so
+# short-lived loops leak neither sockets nor the loop itself.
+# ---------------------------------------------------------------------------
+
+_SessionKey = tuple[str, str, str]
+
+_shared_sessions: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop,
+    dict[_SessionKey, tuple[aiohttp.ClientSession, AsyncGenerator[aiohttp.ClientSession, None]]],
+] = weakref.WeakKeyDictionary()
+
+
+async def _session_keeper(
+    session: aiohttp.ClientSession,
+    key: _SessionKey,
+) -> AsyncGenerator[aiohttp.ClientSession, None]:
+    loop = asyncio.get_running_loop()
+    try:
+        yield session
+    finally:
+        if not session.closed:
+            await session.close()
+        # The entry (session, keeper) references the loop it is keyed by, so
+        # the weak key alone would never drop it; forget it explicitly.
+        sessions = _shared_sessions.get(loop)
+        if sessions is not None:
+            entry = sessions.get(key)
+            if entry is not None and entry[0] is session:
+                del sessions[key]
+            if not sessions:
+                _shared_sessions.pop(loop, None)
+
+
+async def _shared_session(
+    key: _SessionKey,
+    factory: Callable[[], aiohttp.ClientSession],
+) -> aiohttp.ClientSession:
+    """Return the running loop's session for *key*, creating it on first use."""
+    sessions = _shared_sessions.setdefault(asyncio.get_running_loop(), {})
+    entry = sessions.get(key)
+    if entry is not None and not entry[0].closed:
+        return entry[0]
+    session = factory()
+    keeper = _session_keeper(session, key)
+    sessions[key] = (session, keeper)
+    await keeper.__anext__()
+    return session
+
+
+async def shutdown_sage_sessions() -> None:
+    """Close every shared Sage session opened on the running event loop.
+
+    Call this only from process/application shutdown hooks (e.g. aiohttp
+    ``on_cleanup``): closing drops the pooled keep-alive connections, so the
+    next RPC pays a full TLS handshake again.  Loops torn down via
+    ``asyncio.run`` close their sessions automatically.
+    """
+    sessions = _shared_sessions.pop(asyncio.get_running_loop(), {})
+    for _session, keeper in sessions.values():
+        await keeper.aclose()
 
 
 # ---------------------------------------------------------------------------
 # Client
 # ---------------------------------------------------------------------------
 
+
 class SageRpcClient:
     """Async client for the Sage wallet local RPC.
 
@@ -75,11 +302,19 @@ class SageRpcClient:
     return a JSON response.  Authentication is Mutual TLS – the client must
     present the same wallet.crt + wallet.key that Sage generated.
 
+    ``tls=False`` talks plain HTTP to a loopback host (tests, or a Sage port
+    forwarded over an already-encrypted tunnel).  Sage itself currently only
+    serves mTLS, so production callers keep the default.
+
     Usage (async context manager)::
 
         async with SageRpcClient(cert_path, key_path) as client:
             status = await client.call("get_sync_status", {})
             keys   = await client.call("get_keys", {})
+
+    Clients borrow a session shared by every client for the same endpoint and
+    cert pair on the running loop; leaving the context manager does not close
+    it.  See ``shutdown_sage_sessions``.
     """
 
     def __init__(
@@ -89,10 +324,17 @@ class SageRpcClient:
         port: int = 9257,
         host: str = "127.0.0.1",
         fingerprint: int | None = None,
+        tls: bool = True,
+        timeout: float = _DEFAULT_TIMEOUT_SECONDS,
     ) -> None:
-        self._cert_path = Path(cert_path)
-        self._key_path = Path(key_path)
-        self._base_url = f"https://{host}:{port}"
+        if not tls and host not in _LOOPBACK_HOSTS:
+            raise ValueError("sage_rpc_plain_http_requires_loopback_host")
+        self._cert_path = cert_path if isinstance(cert_path, Path) else Path(cert_path)
+        self._key_path = key_path if isinstance(key_path, Path) else Path(key_path)
+        self._tls = tls
+        self._timeout = _client_timeout(timeout)
+        self._base_url = _base_url_for(host, port, tls)
+        self._urls = _endpoint_urls(self._base_url)
         self._session: aiohttp.ClientSession | None = None
         self._fingerprint = fingerprint
 
@@ -101,58 +343,100 @@ class SageRpcClient:
     # ------------------------------------------------------------------
 
     async def __aenter__(self) -> "SageRpcClient":
-        self._session = self._make_session()
+        self._session = await self._acquire_session()
         return self
 
     async def __aexit__(self, *_: Any) -> None:
-        if self._session and not self._session.closed:
-            await self._session.close()
         self._session = None
 
+    async def _acquire_session(self) -> aiohttp.ClientSession:
+        key = (str(self._cert_path), str(self._key_path), self._base_url)
+        return await _shared_session(key, self._make_session)
+
     def _make_session(self) -> aiohttp.ClientSession:
-        ssl_ctx = ssl.create_default_context()
-        ssl_ctx.check_hostname = False
-        ssl_ctx.verify_mode = ssl.CERT_NONE  # Sage uses a self-signed cert
-        ssl_ctx.load_cert_chain(
-            certfile=str(self._cert_path),
-            keyfile=str(self._key_path),
+        # Plain HTTP skips the cert files and the handshake entirely.
+        connector = aiohttp.TCPConnector(
+            ssl=_ssl_ctx_for(self._cert_path, self._key_path) if self._tls else False,
+            limit=_SAGE_MAX_CONNECTIONS,
+            limit_per_host=_SAGE_MAX_CONNECTIONS,
+            # Keep idle connections open across daemon cycles so steady-state
+            # RPCs reuse an established mTLS connection with no new handshake.
+            keepalive_timeout=120,
+            force_close=False,
+        )
+        return aiohttp.ClientSession(
+            connector=connector, timeout=_client_timeout(_DEFAULT_TIMEOUT_SECONDS)
         )
-        connector = aiohttp.TCPConnector(ssl=ssl_ctx)
-        return aiohttp.ClientSession(connector=connector)
 
     # ------------------------------------------------------------------
     # Core RPC call
     # ------------------------------------------------------------------
 
-    async def call(self, endpoint: str, body: dict[str, Any] | None = None) -> Any:
+    async def call(
+        self,
+        endpoint: str,
+        body: dict[str, Any] | None = None,
+        *,
+        timeout: float | None = None,
+    ) -> Any:
         """Call a Sage RPC endpoint and return the parsed JSON response.
 
         Args:
             endpoint: snake_case endpoint name, e.g. ``make_offer``.
             body:     JSON-serialisable request body (default: empty dict).
+            timeout:  per-call total timeout in seconds.  By default
+                      read-only endpoints use the client's ``timeout`` and
+                      state-changing ones have no total limit, only a
+                      ``_STATE_CHANGING_READ_TIMEOUT_SECONDS`` read timeout.
 
         Returns:
             Parsed JSON from the response body.
 
         Raises:
             SageRpcError: on non-200 HTTP status.
+            asyncio.TimeoutError: if Sage does not answer within the timeout.
             RuntimeError: if the client has not been started with ``async with``.
         """
         if self._session is None:
             # Allow one-shot usage without context manager
-            self._session = self._make_session()
+            self._session = await self._acquire_session()
+
+        url = self._urls.get(endpoint) or f"{self._base_url}/{endpoint}"
+        data = orjson.dumps(body or {})
+
+        if endpoint not in _READ_ONLY_ENDPOINTS:
+            _response_cache.clear()
+        ttl = _CACHEABLE_ENDPOINT_TTLS.get(endpoint)
+        cache_key = (self._base_url, endpoint, data)
+        if ttl is not None:
+            cached = _response_cache.get(cache_key)
+            if cached is not None and cached[0] > time.monotonic():
+                return _decode_body(cached[1])
+
+        if timeout is not None:
+            request_timeout = _client_timeout(timeout)
+        elif endpoint in _READ_ONLY_ENDPOINTS:
+            request_timeout = self._timeout
+        else:
+            request_timeout = _STATE_CHANGING_TIMEOUT
+        async with self._session.post(
+            url, data=data, headers=_JSON_HEADERS, timeout=request_timeout
+        ) as resp:
+            raw = await resp.read()
+            if resp.status != 200:
+                raise SageRpcError(resp.status, raw.decode("utf-8", "replace"), endpoint)
+        if ttl is not None:
+            _response_cache[cache_key] = (time.monotonic() + ttl, raw)
+        return _decode_body(raw)
 
-        url = f"{self._base_url}/{endpoint}"
-        payload = body or {}
+    async def call_batch(self, calls: list[tuple[str, dict[str, Any] | None]]) -> list[Any]:
+        """Issue several independent RPC calls concurrently.
 
-        async with self._session.post(url, json=payload) as resp:
-            text = await resp.text()
-            if resp.status != 200:
-                raise SageRpcError(resp.status, text, endpoint)
-            try:
-                return json.loads(text)
-            except json.JSONDecodeError:
-                return text
+        Sage has no multicall endpoint, so the calls are fanned out over the
+        shared session's connection pool and awaited together.  Results are
+        returned in the order of *calls*; the first failure is raised.
+        """
+        return list(await asyncio.gather(*(self.call(ep, body) for ep, body in calls)))
 
     # ------------------------------------------------------------------
     # Typed helpers for the endpoints GreenFloor actually uses
@@ -188,6 +472,30 @@ class SageRpcClient:
             body["asset_id"] = asset_id
         return await self.call("get_coins", body)
 
+    async def get_all_coins(
+        self,
+        *,
+        asset_id: str | None = None,
+        page_size: int = 100,
+    ) -> list[dict[str, Any]]:
+        """Return every coin for *asset_id*, fetching pages concurrently.
+
+        The first page reports ``total``; the remaining pages are then
+        requested together, so the whole list costs two round-trips.
+        """
+        first = await self.get_coins(asset_id=asset_id, limit=page_size, offset=0)
+        coins = list(first.get("coins", []))
+        total = int(first.get("total") or 0)
+        pages = await asyncio.gather(
+            *(
+                self.get_coins(asset_id=asset_id, limit=page_size, offset=offset)
+                for offset in range(page_size, total, page_size)
+            )
+        )
+        for page in pages:
+            coins.extend(page.get("coins", []))
+        return coins
+
     async def get_cats(self) -> dict[str, Any]:
         """Return all CAT tokens held by the active key with name/ticker/icon_url."""
         return await self.call("get_cats", {})
@@ -260,6 +568,7 @@ class SageRpcClient:
         fee: int = 0,
         auto_submit: bool = True,
         include_hint: bool = True,
+        chunk_size: int | None = None,
     ) -> dict[str, Any]:
         """Send *amount* mojos of *asset_id* to each address in *addresses*.
 
@@ -268,6 +577,14 @@ class SageRpcClient:
         existing holdings.  The surplus balance (change) stays in the wallet.
 
         ``auto_submit=True`` broadcasts the transaction immediately.
+
+        By default all addresses go out in one transaction and Sage's
+        response is returned unchanged.  Passing *chunk_size* opts in to
+        splitting longer lists into several ``bulk_send_cat`` transactions,
+        sent one after another; *fee* then applies to each chunk and the
+        result is ``{"chunks": [<response>, ...]}`` in chunk order.  If a chunk
+        fails the error propagates and later chunks are not sent, but earlier
+        chunks may already have been submitted.
         """
         body: dict[str, Any] = {
             "asset_id": asset_id,
@@ -277,12 +594,17 @@ class SageRpcClient:
             "auto_submit": auto_submit,
             "include_hint": include_hint,
         }
-        return await self.call("bulk_send_cat", body)
+        if chunk_size is None:
+            return await self.call("bulk_send_cat", body)
+
+        chunks = []
+        for start in range(0, len(addresses), chunk_size):
+            chunk_body = {**body, "addresses": addresses[start : start + chunk_size]}
+            chunks.append(await self.call("bulk_send_cat", chunk_body))
+        return {"chunks": chunks}
 
     async def close(self) -> None:
-        """Explicitly close the underlying session."""
-        if self._session and not self._session.closed:
-            await self._session.close()
+        """Release this client's session; the shared session itself stays open."""
         self._session = None
 
 
@@ -290,6 +612,7 @@ class SageRpcClient:
 # Error type
 # ---------------------------------------------------------------------------
 
+
 class SageRpcError(Exception):
     """Raised when Sage RPC returns a non-200 status."""
 
@@ -297,7 +620,12 @@ class SageRpcError(Exception):
         self.status = status
         self.body = body
         self.endpoint = endpoint
-        super().__init__(f"Sage RPC {endpoint!r} failed with HTTP {status}: {body}")
+        # The message is formatted lazily in __str__; bodies can be large and
+        # callers that only read .status / .to_dict() never need it.
+        super().__init__(status, body, endpoint)
+
+    def __str__(self) -> str:
+        return f"Sage RPC {self.endpoint!r} failed with HTTP {self.status}: {self.body}"
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -311,6 +639,7 @@ class SageRpcError(Exception):
 # Factory helpers
 # ---------------------------------------------------------------------------
 
+
 def resolve_sage_client(
     *,
     port: int = 9257,
@@ -318,21 +647,21 @@ def resolve_sage_client(
     key_path: str | None = None,
     host: str = "127.0.0.1",
     fingerprint: int | None = None,
+    tls: bool = True,
 ) -> SageRpcClient:
     """Build a ``SageRpcClient`` from explicit paths or auto-detected defaults.
 
     If *fingerprint* is not passed explicitly, the module-level default set by
-    ``configure_sage_fingerprint()`` is used.  When a fingerprint is active the
-    client calls ``login(fingerprint)`` on ``__aenter__`` so every session is
-    locked to the correct wallet regardless of what is active in the Sage UI.
+    ``configure_sage_fingerprint()`` is used.  The fingerprint is only recorded
+    on the client; ``__aenter__`` does not call ``login()``.
 
-    Call ``await client.close()`` when finished, or use as an async context
-    manager.
+    Use as an async context manager, or call ``await client.close()`` when
+    finished.
     """
     fp = fingerprint if fingerprint is not None else _default_fingerprint
     cp = Path(cert_path) if cert_path else _default_cert_path()
     kp = Path(key_path) if key_path else _default_key_path()
-    return SageRpcClient(cert_path=cp, key_path=kp, port=port, host=host, fingerprint=fp)
+    return SageRpcClient(cert_path=cp, key_path=kp, port=port, host=host, fingerprint=fp, tls=tls)
 
 
 def sage_certs_present(
@@ -52,6 +52,7 @@ from greenfloor.storage.sqlite import SqliteStore
 _TEST_PHASE_OFFER_EXPIRY_MINUTES = 5
 _MANAGER_SERVICE_NAME = "manager"
 _TESTNET_NETWORKS: frozenset[str] = frozenset({"testnet", "testnet11"})
+_XCH_ASSET_SENTINELS: frozenset[str] = frozenset({"xch", "txch", "1", ""})
 
 
 def _is_testnet(network: str) -> bool:
@@ -2280,7 +2281,8 @@ def _build_and_post_offer_cloud_wallet(
                 * float(quote_price)
                 * (
                     1_000_000_000_000
-                    if str(getattr(market, "quote_asset", "") or "").strip().lower() in {"xch", "txch", "1"}
+                    if str(getattr(market, "quote_asset", "") or "").strip().lower()
+                    in {"xch", "txch", "1"}
                     else int((market.pricing or {}).get("quote_unit_mojo_multiplier", 1000))
                 )
             )
@@ -2464,6 +2466,7 @@ def _build_and_post_offer_cloud_wallet(
 # ---------------------------------------------------------------------------
 _SAGE_PREFLIGHT_POLL_INTERVAL: float = 15.0
 _SAGE_PREFLIGHT_WARNING_INTERVAL: float = 30.0
+_SAGE_PREFLIGHT_COIN_PAGE_SIZE = 200
 
 
 def _get_monotonic() -> float:
@@ -2490,18 +2493,41 @@ def _sage_count_eligible_coins(coins: list[dict], *, offer_mojos: int) -> int:
     """
     count = 0
     for c in coins:
-        if c.get("spent_height") is not None:
+        if c.get("spent_height") is not None or c.get("lock_id") is not None:
             continue
-        if c.get("lock_id") is not None:
-            continue
-        try:
-            if int(c.get("amount", 0)) == offer_mojos:
-                count += 1
-        except (TypeError, ValueError):
-            pass
+        amount = c.get("amount", 0)
+        # Sage reports ints; only other types need the int() conversion.
+        if amount == offer_mojos:
+            count += 1
+        elif type(amount) is not int:
+            try:
+                if int(amount) == offer_mojos:
+                    count += 1
+            except (TypeError, ValueError):
+                pass
     return count
 
 
+async def _iter_sage_coin_pages(
+    client: Any, *, asset_id: str, page_size: int = _SAGE_PREFLIGHT_COIN_PAGE_SIZE
+) -> collections.abc.AsyncIterator[list[dict]]:
+    """Yield ``get_coins`` pages for *asset_id* one at a time.
+
+    Stops after a short page or once Sage's reported ``total`` is reached, so
+    consumers that only count coins never hold more than one page in memory
+    and can stop fetching as soon as they have seen enough.
+    """
+    offset = 0
+    while True:
+        result = await client.get_coins(asset_id=asset_id, limit=page_size, offset=offset)
+        coins = result.get("coins", [])
+        yield coins
+        offset += len(coins)
+        total = result.get("total")
+        if len(coins) < page_size or (total is not None and offset >= int(total)):
+            return
+
+
 def _sage_preflight_cat_split(
     *,
     asset_id: str,
@@ -2530,27 +2556,34 @@ def _sage_preflight_cat_split(
 
     from greenfloor.adapters.sage_rpc import SageRpcError, resolve_sage_client
 
-    _xch_ids = {"xch", "txch", "1", ""}
-    if not asset_id or asset_id.strip().lower() in _xch_ids:
+    if not asset_id or asset_id.strip().lower() in _XCH_ASSET_SENTINELS:
         return 0  # XCH: denomination splits not needed
 
-    async def _fetch_coins_and_address() -> tuple[list[dict], str]:
+    async def _count_eligible(client: Any) -> int:
+        # Stops paging once enough coins are found, so "eligible" is a lower
+        # bound whenever it already meets number_of_coins.
+        eligible = 0
+        async for page in _iter_sage_coin_pages(client, asset_id=asset_id):
+            eligible += _sage_count_eligible_coins(page, offer_mojos=offer_mojos)
+            if eligible >= number_of_coins:
+                break
+        return eligible
+
+    async def _fetch_eligible_and_address() -> tuple[int, str]:
         async with resolve_sage_client() as client:
-            coins_result, sync_result = await asyncio.gather(
-                client.get_coins(asset_id=asset_id, limit=200),
+            eligible, sync_result = await asyncio.gather(
+                _count_eligible(client),
                 client.get_sync_status(),
             )
-        coins = list(coins_result.get("coins", []))
         addr = str(sync_result.get("receive_address", "")).strip()
-        return coins, addr
+        return eligible, addr
 
-    async def _fetch_coins() -> list[dict]:
+    async def _fetch_eligible() -> int:
         async with resolve_sage_client() as client:
-            result = await client.get_coins(asset_id=asset_id, limit=200)
-        return list(result.get("coins", []))
+            return await _count_eligible(client)
 
     # ---- initial readiness check + address resolution ----
-    coins, sage_address = asyncio.run(_fetch_coins_and_address())
+    eligible, sage_address = asyncio.run(_fetch_eligible_and_address())
     resolved_address = receive_address if receive_address else sage_address
     if not resolved_address:
         print(
@@ -2563,7 +2596,6 @@ def _sage_preflight_cat_split(
             )
         )
         return 3
-    eligible = _sage_count_eligible_coins(coins, offer_mojos=offer_mojos)
     if eligible >= number_of_coins:
         print(
             _format_json_output(
@@ -2642,7 +2674,7 @@ def _sage_preflight_cat_split(
         time.sleep(poll_interval)
 
         try:
-            coins = asyncio.run(_fetch_coins())
+            eligible = asyncio.run(_fetch_eligible())
         except Exception as exc:
             print(
                 _format_json_output(
@@ -2655,7 +2687,6 @@ def _sage_preflight_cat_split(
             )
             continue
 
-        eligible = _sage_count_eligible_coins(coins, offer_mojos=offer_mojos)
         elapsed = _get_monotonic() - start
 
         if elapsed >= next_warning:
@@ -2742,9 +2773,11 @@ def _build_and_post_offer(
         sell_usd = pricing.get("sell_usd_per_base")
         buy_usd = pricing.get("buy_usd_per_base")
         usd_per_base = (
-            buy_usd if (side == "buy" and buy_usd is not None) else
-            sell_usd if sell_usd is not None else
             buy_usd
+            if (side == "buy" and buy_usd is not None)
+            else sell_usd
+            if sell_usd is not None
+            else buy_usd
         )
         if usd_per_base is not None:
             try:
@@ -2839,13 +2872,19 @@ def _build_and_post_offer(
     for index in range(repeat):
         _base_mojo_mult = int(pricing.get("base_unit_mojo_multiplier", 1000))
         _xch_mojo_mult = 1_000_000_000_000
-        _quote_is_xch = str(getattr(market, "quote_asset", "") or "").strip().lower() in {"xch", "txch", "1"}
+        _quote_is_xch = str(getattr(market, "quote_asset", "") or "").strip().lower() in {
+            "xch",
+            "txch",
+            "1",
+        }
         _xch_asset_symbol = "txch" if network in ("testnet", "testnet11") else "xch"
 
         if side == "buy":
             # Buy side: we offer XCH (or txch) and request the base CAT.
             # Swap offered/requested assets and compute mojos explicitly.
-            _offer_mojos_buy = int(round(float(size_base_units) * float(quote_price) * _xch_mojo_mult))
+            _offer_mojos_buy = int(
+                round(float(size_base_units) * float(quote_price) * _xch_mojo_mult)
+            )
             _request_mojos_buy = int(size_base_units) * _base_mojo_mult
             payload = {
                 "market_id": market.market_id,
@@ -2895,7 +2934,8 @@ def _build_and_post_offer(
                 "quote_price_quote_per_base": float(quote_price),
                 "base_unit_mojo_multiplier": _base_mojo_mult,
                 "quote_unit_mojo_multiplier": (
-                    _xch_mojo_mult if _quote_is_xch
+                    _xch_mojo_mult
+                    if _quote_is_xch
                     else int(pricing.get("quote_unit_mojo_multiplier", 1000))
                 ),
                 "fee_mojos": 0,
@@ -4110,7 +4150,7 @@ def _offers_status(
             path=Path(_mp),
             overlay_path=Path(testnet_markets_path) if testnet_markets_path else None,
         )
-        for _m in (_markets.markets or []):
+        for _m in _markets.markets or []:
             market_meta[str(_m.market_id)] = {
                 "base_symbol": str(getattr(_m, "base_symbol", "") or ""),
                 "quote_asset": str(getattr(_m, "quote_asset", "") or ""),
@@ -4605,8 +4645,12 @@ def main() -> None:
             market_id=args.market_id or None,
             limit=int(args.limit),
             events_limit=int(args.events_limit),
-            markets_path=Path(args.markets_config) if getattr(args, "markets_config", None) else None,
-            testnet_markets_path=Path(args.testnet_markets_config) if getattr(args, "testnet_markets_config", None) else None,
+            markets_path=Path(args.markets_config)
+            if getattr(args, "markets_config", None)
+            else None,
+            testnet_markets_path=Path(args.testnet_markets_config)
+            if getattr(args, "testnet_markets_config", None)
+            else None,
         )
     elif args.command == "offers-reconcile":
         code = _offers_reconcile(
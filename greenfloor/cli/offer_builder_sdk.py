@@ -1,50 +1,243 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import functools
 import os
+import queue
 import shlex
 import subprocess
 import sys
-from typing import Any
+import threading
+from collections.abc import Callable, Coroutine
+from typing import Any, TypeVar
 
+import orjson
 
+from greenfloor import signing
+from greenfloor.adapters.sage_rpc import (
+    _CONNECT_TIMEOUT_SECONDS,
+    _STATE_CHANGING_READ_TIMEOUT_SECONDS,
+    resolve_sage_client,
+)
+
+_T = TypeVar("_T")
+
+# Upper bound for one make_offer on the loop thread: just past the longest the
+# Sage client itself can wait (connect, then a silent read), so the client's
+# own timeout normally fires first and this only guards a wedged loop.
+_SAGE_CALL_TIMEOUT_SECONDS = _CONNECT_TIMEOUT_SECONDS + _STATE_CHANGING_READ_TIMEOUT_SECONDS + 5
+
+# Asset ids that mean native XCH (Sage expects null for these).
+_XCH_IDS = frozenset({"xch", "txch", "1", ""})
+_EXPIRY_MULT: dict[str, int] = {"seconds": 1, "minutes": 60, "hours": 3600}
+
+
+class _SageLoopThread:
+    """Long-lived event loop on a daemon thread for synchronous Sage calls.
+
+    Sage sessions are pooled per event loop, so running every offer on the
+    same loop keeps the TLS connection warm across calls instead of paying
+    loop setup and a fresh handshake each time via ``asyncio.run``.  Callers
+    wait at most *timeout* seconds; on expiry the coroutine is cancelled and
+    ``TimeoutError`` is raised (docs/decisions/0003-sage-loop-thread.md).
+    """
+
+    def __init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name="greenfloor-sage-loop", daemon=True
+                ).start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, _T], timeout: float) -> _T:
+        future = asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+
+_sage_loop = _SageLoopThread()
+
+_OFFER_BUILDER_TIMEOUT_SECONDS = 120
+
+
+class _BuilderServer:
+    """Long-lived ``--server`` offer builder process reused across offers.
+
+    One-shot builder commands pay interpreter start-up and the wallet SDK
+    import on every offer.  When ``GREENFLOOR_OFFER_BUILDER_CMD`` includes
+    ``--server`` the process is kept alive and fed one JSON request per line;
+    it is re-spawned after it exits, times out, or the command changes.
+    Failures, including timeouts, raise the same ``RuntimeError`` reasons as
+    the one-shot path (docs/decisions/0004-offer-builder-server-mode.md).
+    """
+
+    def __init__(self) -> None:
+        self._argv: tuple[str, ...] | None = None
+        self._proc: subprocess.Popen[bytes] | None = None
+        self._lines: queue.Queue[bytes] = queue.Queue()
+        self._lock = threading.Lock()
+
+    def _spawn(self, argv: tuple[str, ...]) -> subprocess.Popen[bytes]:
+        proc = subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        lines: queue.Queue[bytes] = queue.Queue()
+
+        def _pump() -> None:
+            assert proc.stdout is not None
+            for line in proc.stdout:
+                lines.put(line)
+            lines.put(b"")
+
+        threading.Thread(target=_pump, name="greenfloor-offer-builder", daemon=True).start()
+        self._argv, self._proc, self._lines = argv, proc, lines
+        return proc
+
+    def _terminate(self) -> None:
+        if self._proc is not None:
+            self._proc.kill()
+            self._proc.wait()
+        self._argv = None
+        self._proc = None
+
+    def request(self, argv: tuple[str, ...], payload: dict[str, Any]) -> dict[str, Any]:
+        try:
+            request_line = orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError as exc:
+            raise RuntimeError(f"offer_builder_failed:{exc}") from exc
+        with self._lock:
+            proc = self._proc
+            if proc is None or proc.poll() is not None or argv != self._argv:
+                self._terminate()
+                try:
+                    proc = self._spawn(argv)
+                except Exception as exc:
+                    raise RuntimeError(f"offer_builder_spawn_error:{exc}") from exc
+            assert proc.stdin is not None
+            try:
+                proc.stdin.write(request_line)
+                proc.stdin.flush()
+                line = self._lines.get(timeout=_OFFER_BUILDER_TIMEOUT_SECONDS)
+            except queue.Empty:
+                self._terminate()
+                raise RuntimeError("offer_builder_failed:timeout") from None
+            except OSError as exc:
+                self._terminate()
+                raise RuntimeError(f"offer_builder_failed:{exc}") from exc
+            if not line:
+                self._terminate()
+                raise RuntimeError("offer_builder_failed:server_exited")
+        try:
+            body = orjson.loads(line)
+        except orjson.JSONDecodeError as exc:
+            raise RuntimeError("offer_builder_invalid_json") from exc
+        if not isinstance(body, dict):
+            raise RuntimeError("offer_builder_invalid_json")
+        return body
+
+
+_builder_server = _BuilderServer()
+
+
+def _offer_builder_from_env() -> tuple[str, tuple[str, ...]]:
+    """Return ``(mode, argv)`` for ``GREENFLOOR_OFFER_BUILDER_CMD``.
+
+    ``mode`` is ``"sdk"`` (unset), ``"server"`` (command has ``--server``) or
+    ``"cmd"`` (one-shot command).
+    """
+    cmd_raw = os.getenv("GREENFLOOR_OFFER_BUILDER_CMD", "").strip()
+    if not cmd_raw:
+        return "sdk", ()
+    argv = tuple(shlex.split(cmd_raw))
+    return ("server" if "--server" in argv else "cmd"), argv
+
+
+# Read once at import rather than per offer; see reload_dispatch_config().
+_OFFER_BUILDER = _offer_builder_from_env()
+
+
+def reload_dispatch_config() -> None:
+    """Re-read ``GREENFLOOR_OFFER_BUILDER_CMD`` after changing it in-process."""
+    global _OFFER_BUILDER
+    _OFFER_BUILDER = _offer_builder_from_env()
+
+
+@functools.cache
 def _import_sdk() -> Any:
     import chia_wallet_sdk as sdk  # type: ignore
 
     return sdk
 
 
+def _stripped(value: Any) -> str:
+    return str(value).strip()
+
+
+def _positive(value: float) -> bool:
+    return value > 0
+
+
+# Payload field specs: (name, coerce, default, is_valid, error).  Fields are
+# coerced and checked in table order; ``is_valid=None`` means no check.
+_PayloadField = tuple[str, Callable[[Any], Any], Any, Callable[[Any], bool] | None, str]
+
+_COIN_BACKED_FIELDS: tuple[_PayloadField, ...] = (
+    ("receive_address", _stripped, "", bool, "missing_receive_address"),
+    ("size_base_units", int, 0, _positive, "invalid_size_base_units"),
+    ("key_id", _stripped, "", bool, "missing_key_id"),
+    ("network", _stripped, "", bool, "missing_network"),
+    ("keyring_yaml_path", _stripped, "", bool, "missing_keyring_yaml_path"),
+    ("quote_price_quote_per_base", float, 0.0, _positive, "invalid_quote_price_quote_per_base"),
+    ("base_unit_mojo_multiplier", int, 0, _positive, "invalid_base_unit_mojo_multiplier"),
+    ("quote_unit_mojo_multiplier", int, 0, _positive, "invalid_quote_unit_mojo_multiplier"),
+)
+
+_SAGE_OFFER_FIELDS: tuple[_PayloadField, ...] = (
+    ("size_base_units", int, 0, _positive, "invalid_size_base_units"),
+    ("quote_price_quote_per_base", float, 0.0, _positive, "invalid_quote_price_quote_per_base"),
+    ("base_unit_mojo_multiplier", int, 1000, None, ""),
+    ("quote_unit_mojo_multiplier", int, 1000, None, ""),
+    ("expiry_unit", str, "minutes", None, ""),
+    ("expiry_value", int, 10, None, ""),
+)
+
+
+def _read_payload_fields(
+    payload: dict[str, Any], fields: tuple[_PayloadField, ...]
+) -> dict[str, Any]:
+    """Coerce and validate ``fields`` from ``payload`` in one pass; raises ValueError."""
+    values: dict[str, Any] = {}
+    get = payload.get
+    for name, coerce, default, is_valid, error in fields:
+        value = coerce(get(name, default))
+        if is_valid is not None and not is_valid(value):
+            raise ValueError(error)
+        values[name] = value
+    return values
+
+
 def _build_coin_backed_spend_bundle_hex(payload: dict[str, Any]) -> str:
-    from greenfloor.signing import build_signed_spend_bundle
-
-    receive_address = str(payload.get("receive_address", "")).strip()
-    key_id = str(payload.get("key_id", "")).strip()
-    network = str(payload.get("network", "")).strip()
-    keyring_yaml_path = str(payload.get("keyring_yaml_path", "")).strip()
-    size_base_units = int(payload.get("size_base_units", 0))
-    quote_price_quote_per_base = float(payload.get("quote_price_quote_per_base", 0.0))
-    base_unit_mojo_multiplier = int(payload.get("base_unit_mojo_multiplier", 0))
-    quote_unit_mojo_multiplier = int(payload.get("quote_unit_mojo_multiplier", 0))
-    if not receive_address:
-        raise ValueError("missing_receive_address")
-    if size_base_units <= 0:
-        raise ValueError("invalid_size_base_units")
-    if not key_id:
-        raise ValueError("missing_key_id")
-    if not network:
-        raise ValueError("missing_network")
-    if not keyring_yaml_path:
-        raise ValueError("missing_keyring_yaml_path")
-    if quote_price_quote_per_base <= 0:
-        raise ValueError("invalid_quote_price_quote_per_base")
-    if base_unit_mojo_multiplier <= 0:
-        raise ValueError("invalid_base_unit_mojo_multiplier")
-    if quote_unit_mojo_multiplier <= 0:
-        raise ValueError("invalid_quote_unit_mojo_multiplier")
+    fields = _read_payload_fields(payload, _COIN_BACKED_FIELDS)
+    receive_address = fields["receive_address"]
+    key_id = fields["key_id"]
+    network = fields["network"]
+    keyring_yaml_path = fields["keyring_yaml_path"]
+    size_base_units = fields["size_base_units"]
+    quote_price_quote_per_base = fields["quote_price_quote_per_base"]
+    base_unit_mojo_multiplier = fields["base_unit_mojo_multiplier"]
+    quote_unit_mojo_multiplier = fields["quote_unit_mojo_multiplier"]
 
     asset_id = str(payload.get("asset_id", "xch")).strip().lower() or "xch"
     quote_asset = str(payload.get("quote_asset", "xch")).strip().lower() or "xch"
-    if quote_asset in {"xch", "txch", "1"}:
+    if quote_asset in _XCH_IDS:
         request_asset_id = quote_asset
     else:
         if len(quote_asset) != 64:
@@ -64,7 +257,7 @@ def _build_coin_backed_spend_bundle_hex(payload: dict[str, Any]) -> str:
     if request_amount <= 0:
         raise ValueError("invalid_request_amount")
 
-    result = build_signed_spend_bundle(
+    result = signing.build_signed_spend_bundle(
         {
             "key_id": key_id,
             "network": network,
@@ -105,36 +298,21 @@ def build_offer(payload: dict[str, Any]) -> str:
 
 def _expiry_to_seconds(unit: str, value: int) -> int:
     """Convert expiry_unit / expiry_value to total seconds."""
-    unit_l = unit.strip().lower()
-    if unit_l == "seconds":
-        return value
-    if unit_l == "hours":
-        return value * 3600
-    return value * 60  # default: minutes
-
+    return value * _EXPIRY_MULT.get(unit.strip().lower(), 60)  # default: minutes
 
-async def _sage_make_offer_async(payload: dict[str, Any]) -> str:
-    """Call the Sage RPC make_offer endpoint and return the offer1... string.
-
-    This function translates the internal GreenFloor payload format to the
-    Sage `make_offer` request body, then unwraps the returned offer string.
-    """
-    from greenfloor.adapters.sage_rpc import resolve_sage_client
 
+def _sage_offer_params(payload: dict[str, Any]) -> dict[str, Any]:
+    """Translate the internal GreenFloor payload to a Sage ``make_offer`` body."""
     asset_id_raw = str(payload.get("asset_id", "xch")).strip().lower() or "xch"
     quote_asset_raw = str(payload.get("quote_asset", "xch")).strip().lower() or "xch"
 
-    size_base_units = int(payload.get("size_base_units", 0))
-    base_mojo_mult = int(payload.get("base_unit_mojo_multiplier", 1000))
-    quote_mojo_mult = int(payload.get("quote_unit_mojo_multiplier", 1000))
-    quote_price = float(payload.get("quote_price_quote_per_base", 0.0))
-    expiry_unit = str(payload.get("expiry_unit", "minutes"))
-    expiry_value = int(payload.get("expiry_value", 10))
-
-    if size_base_units <= 0:
-        raise ValueError("invalid_size_base_units")
-    if quote_price <= 0:
-        raise ValueError("invalid_quote_price_quote_per_base")
+    fields = _read_payload_fields(payload, _SAGE_OFFER_FIELDS)
+    size_base_units = fields["size_base_units"]
+    base_mojo_mult = fields["base_unit_mojo_multiplier"]
+    quote_mojo_mult = fields["quote_unit_mojo_multiplier"]
+    quote_price = fields["quote_price_quote_per_base"]
+    expiry_unit = fields["expiry_unit"]
+    expiry_value = fields["expiry_value"]
 
     offer_amount = size_base_units * base_mojo_mult
     request_amount = int(round(float(size_base_units) * quote_price * float(quote_mojo_mult)))
@@ -150,9 +328,8 @@ async def _sage_make_offer_async(payload: dict[str, Any]) -> str:
         raise ValueError("invalid_request_amount")
 
     # Sage uses null for XCH, hex string for CATs.
-    xch_ids = {"xch", "txch", "1", ""}
-    offered_asset_id: str | None = None if asset_id_raw in xch_ids else asset_id_raw
-    requested_asset_id: str | None = None if quote_asset_raw in xch_ids else quote_asset_raw
+    offered_asset_id: str | None = None if asset_id_raw in _XCH_IDS else asset_id_raw
+    requested_asset_id: str | None = None if quote_asset_raw in _XCH_IDS else quote_asset_raw
 
     # For buy-side offers the market maker offers XCH and requests the base CAT:
     # swap the assets and amounts so the offer encodes the correct direction.
@@ -163,16 +340,15 @@ async def _sage_make_offer_async(payload: dict[str, Any]) -> str:
 
     expiration_seconds = _expiry_to_seconds(expiry_unit, expiry_value)
 
-    offer_params: dict[str, Any] = {
+    return {
         "offered_assets": [{"asset_id": offered_asset_id, "amount": offer_amount}],
         "requested_assets": [{"asset_id": requested_asset_id, "amount": request_amount}],
         "fee": 0,
         "expiration_seconds": expiration_seconds,
     }
 
-    async with resolve_sage_client() as client:
-        result = await client.make_offer(offer_params)
 
+def _sage_offer_text(result: dict[str, Any]) -> str:
     offer_str = str(result.get("offer", "")).strip()
     if not offer_str:
         raise RuntimeError(f"sage_make_offer_returned_no_offer:{result}")
@@ -181,11 +357,57 @@ async def _sage_make_offer_async(payload: dict[str, Any]) -> str:
     return offer_str
 
 
+async def _sage_make_offer_async(payload: dict[str, Any]) -> str:
+    """Call the Sage RPC make_offer endpoint and return the offer1... string.
+
+    This function translates the internal GreenFloor payload format to the
+    Sage `make_offer` request body, then unwraps the returned offer string.
+    """
+    offer_params = _sage_offer_params(payload)
+    async with resolve_sage_client() as client:
+        result = await client.make_offer(offer_params)
+    return _sage_offer_text(result)
+
+
+async def _sage_make_offers_async(payloads: list[dict[str, Any]]) -> list[str | Exception]:
+    """Issue one ``make_offer`` per payload over a single Sage client.
+
+    Offers that spend the same asset are made one at a time, in payload
+    order, so each ``make_offer`` sees the coins Sage locked for the one
+    before it; only offers for different offered assets overlap.  Each
+    element of the result is the offer text or the exception raised for that
+    payload, so one bad payload does not discard the rest of the batch.
+    """
+    results: list[str | Exception | None] = [None] * len(payloads)
+    lanes: dict[str | None, list[tuple[int, dict[str, Any]]]] = {}
+    for index, payload in enumerate(payloads):
+        try:
+            params = _sage_offer_params(payload)
+        except Exception as exc:
+            results[index] = exc
+            continue
+        lanes.setdefault(params["offered_assets"][0]["asset_id"], []).append((index, params))
+
+    async def _lane(client: Any, items: list[tuple[int, dict[str, Any]]]) -> None:
+        for index, params in items:
+            try:
+                results[index] = _sage_offer_text(await client.make_offer(params))
+            except Exception as exc:
+                results[index] = exc
+
+    if lanes:
+        async with resolve_sage_client() as client:
+            await asyncio.gather(*(_lane(client, items) for items in lanes.values()))
+    batch: list[str | Exception] = []
+    for result in results:
+        assert result is not None
+        batch.append(result)
+    return batch
+
+
 def _build_offer_via_sage(payload: dict[str, Any]) -> str:
     """Synchronous wrapper around the async Sage make_offer call."""
-    import asyncio
-
-    return asyncio.run(_sage_make_offer_async(payload))
+    return _sage_loop.run(_sage_make_offer_async(payload), _SAGE_CALL_TIMEOUT_SECONDS)
 
 
 def build_offer_text(payload: dict[str, Any]) -> str:
@@ -199,36 +421,50 @@ def build_offer_text(payload: dict[str, Any]) -> str:
     When the env var is absent, calls build_offer() directly (no subprocess).
     When the env var is present, spawns the external command, feeds payload as
     JSON on stdin, and parses the {"status","offer"} JSON response from stdout.
+    The env var is read once at import (see ``reload_dispatch_config``).
     Raises RuntimeError on any failure so callers can handle a single exception type.
     """
     if bool(payload.get("use_sage_wallet", False)):
         return _build_offer_via_sage(payload)
 
-    cmd_raw = os.getenv("GREENFLOOR_OFFER_BUILDER_CMD", "").strip()
-    if not cmd_raw:
+    mode, argv = _OFFER_BUILDER
+    if mode == "sdk":
         return build_offer(payload)
+    if mode == "server":
+        return _offer_from_builder_body(_builder_server.request(argv, payload))
 
     try:
         completed = subprocess.run(
-            shlex.split(cmd_raw),
-            input=json.dumps(payload),
+            argv,
+            input=orjson.dumps(payload),
             capture_output=True,
             check=False,
-            text=True,
-            timeout=120,
+            timeout=_OFFER_BUILDER_TIMEOUT_SECONDS,
         )
+    except subprocess.TimeoutExpired:
+        raise RuntimeError("offer_builder_failed:timeout") from None
     except Exception as exc:
         raise RuntimeError(f"offer_builder_spawn_error:{exc}") from exc
 
     if completed.returncode != 0:
-        err = completed.stderr.strip() or completed.stdout.strip() or "unknown_error"
-        raise RuntimeError(f"offer_builder_failed:{err}")
+        err = completed.stderr.strip() or completed.stdout.strip() or b"unknown_error"
+        raise RuntimeError(f"offer_builder_failed:{err.decode('utf-8', 'replace')}")
 
+    return _offer_from_builder_body(_parse_builder_stdout(completed.stdout))
+
+
+def _parse_builder_stdout(out: bytes) -> dict[str, Any]:
+    # Parse the captured bytes in place: orjson skips surrounding whitespace
+    # itself, so no stripped copy of a possibly large spend-bundle reply.
+    if not out or out.isspace():
+        return {}
     try:
-        body = json.loads(completed.stdout.strip() or "{}")
-    except json.JSONDecodeError as exc:
+        return orjson.loads(out)
+    except orjson.JSONDecodeError as exc:
         raise RuntimeError("offer_builder_invalid_json") from exc
 
+
+def _offer_from_builder_body(body: dict[str, Any]) -> str:
     status = str(body.get("status", "skipped"))
     if status != "executed":
         raise RuntimeError(str(body.get("reason", "offer_builder_skipped")))
@@ -241,45 +477,67 @@ def build_offer_text(payload: dict[str, Any]) -> str:
     return offer
 
 
-def main() -> None:
-    raw = sys.stdin.read()
+def build_offer_texts(payloads: list[dict[str, Any]]) -> list[str | Exception]:
+    """Build several offers in one batch, returning text or the exception per payload.
+
+    A batch made only of ``use_sage_wallet`` payloads is sent to Sage over a
+    single client, one offer at a time per offered asset; any other batch is
+    built payload by payload through ``build_offer_text``.
+    """
+    if payloads and all(bool(p.get("use_sage_wallet", False)) for p in payloads):
+        return _sage_loop.run(
+            _sage_make_offers_async(payloads), _SAGE_CALL_TIMEOUT_SECONDS * len(payloads)
+        )
+    results: list[str | Exception] = []
+    for payload in payloads:
+        try:
+            results.append(build_offer_text(payload))
+        except Exception as exc:
+            results.append(exc)
+    return results
+
+
+def _handle_request(raw: str) -> dict[str, Any]:
     try:
-        payload = json.loads(raw or "{}")
-    except json.JSONDecodeError:
-        print(json.dumps({"status": "skipped", "reason": "invalid_request_json"}))
-        raise SystemExit(0) from None
+        payload = orjson.loads(raw or "{}")
+    except orjson.JSONDecodeError:
+        return {"status": "skipped", "reason": "invalid_request_json"}
     if not isinstance(payload, dict):
-        print(json.dumps({"status": "skipped", "reason": "invalid_request_payload"}))
-        raise SystemExit(0)
+        return {"status": "skipped", "reason": "invalid_request_payload"}
 
     try:
         sdk = _import_sdk()
     except Exception as exc:
-        print(json.dumps({"status": "skipped", "reason": f"wallet_sdk_import_error:{exc}"}))
-        raise SystemExit(0) from None
+        return {"status": "skipped", "reason": f"wallet_sdk_import_error:{exc}"}
 
     try:
         offer = _build_offer(payload, sdk)
     except Exception as exc:
-        print(
-            json.dumps(
-                {
-                    "status": "skipped",
-                    "reason": f"wallet_sdk_offer_build_failed:{exc}",
-                }
-            )
-        )
-        raise SystemExit(0) from None
-
-    print(
-        json.dumps(
-            {
-                "status": "executed",
-                "reason": "wallet_sdk_offer_build_success",
-                "offer": offer,
-            }
-        )
-    )
+        return {"status": "skipped", "reason": f"wallet_sdk_offer_build_failed:{exc}"}
+
+    return {
+        "status": "executed",
+        "reason": "wallet_sdk_offer_build_success",
+        "offer": offer,
+    }
+
+
+def main() -> None:
+    """Read one JSON request from stdin and print the JSON response.
+
+    With ``--server``, keep reading newline-delimited requests until stdin
+    closes and answer each on its own line, importing the SDK only once.
+    """
+    if "--server" in sys.argv[1:]:
+        for line in sys.stdin:
+            if line.strip():
+                print(orjson.dumps(_handle_request(line)).decode("utf-8"), flush=True)
+        return
+
+    response = _handle_request(sys.stdin.read())
+    print(orjson.dumps(response).decode("utf-8"))
+    if response["status"] != "executed":
+        raise SystemExit(0)
 
 
 if __name__ == "__main__":
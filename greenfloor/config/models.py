@@ -74,7 +74,7 @@ class MarketInventoryConfig:
     bucket_counts: dict[int, int] = field(default_factory=dict)
 
 
-@dataclass(slots=True)
+@dataclass(frozen=True, slots=True)
 class MarketLadderEntry:
     size_base_units: int
     target_count: int
@@ -95,7 +95,7 @@ class MarketConfig:
     signer_key_id: str
     inventory: MarketInventoryConfig
     pricing: dict[str, Any] = field(default_factory=dict)
-    ladders: dict[str, list[MarketLadderEntry]] = field(default_factory=dict)
+    ladders: dict[str, tuple[MarketLadderEntry, ...]] = field(default_factory=dict)
 
 
 @dataclass(slots=True)
@@ -315,19 +315,17 @@ def parse_markets_config(raw: dict[str, Any]) -> MarketsConfig:
             },
         )
         raw_ladders = row.get("ladders", {})
-        ladders: dict[str, list[MarketLadderEntry]] = {}
+        ladders: dict[str, tuple[MarketLadderEntry, ...]] = {}
         for side, entries in dict(raw_ladders).items():
-            side_entries: list[MarketLadderEntry] = []
-            for e in entries:
-                side_entries.append(
-                    MarketLadderEntry(
-                        size_base_units=int(_req(e, "size_base_units")),
-                        target_count=int(_req(e, "target_count")),
-                        split_buffer_count=int(e.get("split_buffer_count", 0)),
-                        combine_when_excess_factor=float(e.get("combine_when_excess_factor", 2.0)),
-                    )
+            ladders[str(side)] = tuple(
+                MarketLadderEntry(
+                    size_base_units=int(_req(e, "size_base_units")),
+                    target_count=int(_req(e, "target_count")),
+                    split_buffer_count=int(e.get("split_buffer_count", 0)),
+                    combine_when_excess_factor=float(e.get("combine_when_excess_factor", 2.0)),
                 )
-            ladders[str(side)] = side_entries
+                for e in entries
+            )
         market_id = str(_req(row, "id"))
         pricing = dict(row.get("pricing", {}))
         _validate_strategy_pricing(pricing, market_id)
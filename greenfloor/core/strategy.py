@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 from datetime import datetime
+from typing import Any
 
 
 @dataclass(frozen=True, slots=True)
@@ -28,6 +29,19 @@ class StrategyConfig:
     # Generic target map for arbitrary ladder sizes.  When populated,
     # `evaluate_market` uses this instead of ones/tens/hundreds lookup.
     targets_by_size: dict[int, int] | None = None
+    # `targets_by_size` as (size, target) pairs sorted by size, computed once
+    # at construction so `evaluate_market` does not re-sort every cycle.
+    sorted_targets: tuple[tuple[int, int], ...] | None = field(
+        init=False, repr=False, compare=False, default=None
+    )
+
+    def __post_init__(self) -> None:
+        if self.targets_by_size is not None:
+            object.__setattr__(
+                self,
+                "sorted_targets",
+                tuple((size, int(target)) for size, target in sorted(self.targets_by_size.items())),
+            )
 
 
 @dataclass(frozen=True, slots=True)
@@ -44,6 +58,13 @@ class PlannedAction:
     # "buy":  offer quote asset (XCH), request base asset.
     direction: str = "sell"
 
+    def to_dict(self) -> dict[str, Any]:
+        """Flat JSON-ready view (audit events, API payloads)."""
+        return {name: getattr(self, name) for name in _PLANNED_ACTION_FIELDS}
+
+
+_PLANNED_ACTION_FIELDS: tuple[str, ...] = tuple(f.name for f in fields(PlannedAction))
+
 
 _PAIR_EXPIRY_CONFIG: dict[str, tuple[str, int]] = {
     "xch": ("minutes", 10),
@@ -72,14 +93,11 @@ def evaluate_market(
     expiry_unit, expiry_value = _PAIR_EXPIRY_CONFIG.get(pair, _PAIR_EXPIRY_CONFIG["xch"])
 
     # Generic ladder: use targets_by_size + buckets_by_size when both are available.
-    if config.targets_by_size is not None:
-        current_by_size = (state.buckets_by_size or {}) if state.buckets_by_size is not None else {}
-        offer_configs_generic = [
-            (size, int(current_by_size.get(size, 0)), int(target))
-            for size, target in sorted(config.targets_by_size.items())
-        ]
+    if config.sorted_targets is not None:
+        current_by_size = state.buckets_by_size or {}
         actions: list[PlannedAction] = []
-        for size, current, target in offer_configs_generic:
+        for size, target in config.sorted_targets:
+            current = int(current_by_size.get(size, 0))
             if current < target:
                 actions.append(
                     PlannedAction(
@@ -96,6 +114,14 @@ def evaluate_market(
                 )
         return actions
 
+    # Steady state: every rung is at or above target, nothing to plan.
+    if (
+        state.ones >= config.ones_target
+        and state.tens >= config.tens_target
+        and state.hundreds >= config.hundreds_target
+    ):
+        return []
+
     offer_configs = [
         (1, state.ones, config.ones_target),
         (10, state.tens, config.tens_target),
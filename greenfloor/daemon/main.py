@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import functools
 import json
 import logging
 import os
@@ -269,7 +270,6 @@ def _strategy_config_from_market(market, *, direction: str = "sell") -> Strategy
         ladder = market.ladders.get("buy", [])
     else:
         ladder = market.ladders.get("sell", [])
-    targets_by_size = {int(e.size_base_units): int(e.target_count) for e in ladder}
     pricing = _market_pricing(market)
 
     def _to_int(value: Any) -> int | None:
@@ -290,14 +290,37 @@ def _strategy_config_from_market(market, *, direction: str = "sell") -> Strategy
             return None
         return parsed
 
+    return _strategy_config_from_key(
+        str(market.quote_asset),
+        tuple((int(e.size_base_units), int(e.target_count)) for e in ladder),
+        _to_int(pricing.get("strategy_target_spread_bps")),
+        _to_float(pricing.get("strategy_min_xch_price_usd")),
+        _to_float(pricing.get("strategy_max_xch_price_usd")),
+    )
+
+
+# markets.yaml is reloaded every cycle, so each tick hands in fresh
+# MarketConfig objects; keying on the values the config is derived from lets
+# unchanged markets reuse the StrategyConfig (and its pre-sorted targets)
+# built on an earlier tick.  StrategyConfig is frozen and never mutated by
+# callers, so sharing instances is safe.
+@functools.lru_cache(maxsize=256)
+def _strategy_config_from_key(
+    quote_asset: str,
+    ladder_targets: tuple[tuple[int, int], ...],
+    target_spread_bps: int | None,
+    min_xch_price_usd: float | None,
+    max_xch_price_usd: float | None,
+) -> StrategyConfig:
+    targets_by_size = dict(ladder_targets)
     return StrategyConfig(
-        pair=_normalize_strategy_pair(market.quote_asset),
+        pair=_normalize_strategy_pair(quote_asset),
         ones_target=int(targets_by_size.get(1, 5)),
         tens_target=int(targets_by_size.get(10, 2)),
         hundreds_target=int(targets_by_size.get(100, 1)),
-        target_spread_bps=_to_int(pricing.get("strategy_target_spread_bps")),
-        min_xch_price_usd=_to_float(pricing.get("strategy_min_xch_price_usd")),
-        max_xch_price_usd=_to_float(pricing.get("strategy_max_xch_price_usd")),
+        target_spread_bps=target_spread_bps,
+        min_xch_price_usd=min_xch_price_usd,
+        max_xch_price_usd=max_xch_price_usd,
         targets_by_size=targets_by_size if targets_by_size else None,
     )
 
@@ -466,29 +489,21 @@ def _resolve_quote_price_quote_per_base(
     )
 
 
-def _build_offer_for_action(
+def _offer_payload_for_action(
     *,
     market,
     action,
     xch_price_usd: float | None,
     network: str,
     keyring_yaml_path: str,
-    use_sage_wallet: bool = False,
+    use_sage_wallet: bool,
 ) -> dict[str, Any]:
-    from greenfloor.cli.offer_builder_sdk import build_offer_text
-
+    """Return the offer builder payload; raises when the market price cannot be resolved."""
     pricing = _market_pricing(market)
-    try:
-        quote_price = _resolve_quote_price_quote_per_base(
-            market, direction=action.direction, xch_price_usd=xch_price_usd
-        )
-    except Exception as exc:
-        return {
-            "status": "skipped",
-            "reason": f"offer_builder_failed:{exc}",
-            "offer": None,
-        }
-    payload = {
+    quote_price = _resolve_quote_price_quote_per_base(
+        market, direction=action.direction, xch_price_usd=xch_price_usd
+    )
+    return {
         "market_id": market.market_id,
         "base_asset": market.base_asset,
         "base_symbol": market.base_symbol,
@@ -519,11 +534,82 @@ def _build_offer_for_action(
         "use_sage_wallet": use_sage_wallet,
         "direction": action.direction,
     }
+
+
+def _built_offer_result(offer: str | Exception) -> dict[str, Any]:
+    if isinstance(offer, Exception):
+        return {"status": "skipped", "reason": f"offer_builder_failed:{offer}", "offer": None}
+    return {"status": "executed", "reason": "offer_builder_success", "offer": offer}
+
+
+def _build_offer_for_action(
+    *,
+    market,
+    action,
+    xch_price_usd: float | None,
+    network: str,
+    keyring_yaml_path: str,
+    use_sage_wallet: bool = False,
+) -> dict[str, Any]:
+    from greenfloor.cli.offer_builder_sdk import build_offer_text
+
     try:
-        offer = build_offer_text(payload)
+        payload = _offer_payload_for_action(
+            market=market,
+            action=action,
+            xch_price_usd=xch_price_usd,
+            network=network,
+            keyring_yaml_path=keyring_yaml_path,
+            use_sage_wallet=use_sage_wallet,
+        )
+        offer: str | Exception = build_offer_text(payload)
     except Exception as exc:
-        return {"status": "skipped", "reason": f"offer_builder_failed:{exc}", "offer": None}
-    return {"status": "executed", "reason": "offer_builder_success", "offer": offer}
+        offer = exc
+    return _built_offer_result(offer)
+
+
+def _build_offers_for_action(
+    *,
+    market,
+    action,
+    xch_price_usd: float | None,
+    network: str,
+    keyring_yaml_path: str,
+    use_sage_wallet: bool,
+) -> list[dict[str, Any]]:
+    """Build all ``action.repeat`` offers for one action.
+
+    Sage-backed repeats share one payload and one Sage client; they spend the
+    same asset, so ``build_offer_texts`` makes them one after another.  Every
+    other builder is invoked once per offer.
+    """
+    repeat = int(action.repeat)
+    if not use_sage_wallet or repeat <= 1:
+        return [
+            _build_offer_for_action(
+                market=market,
+                action=action,
+                xch_price_usd=xch_price_usd,
+                network=network,
+                keyring_yaml_path=keyring_yaml_path,
+                use_sage_wallet=use_sage_wallet,
+            )
+            for _ in range(repeat)
+        ]
+    from greenfloor.cli.offer_builder_sdk import build_offer_texts
+
+    try:
+        payload = _offer_payload_for_action(
+            market=market,
+            action=action,
+            xch_price_usd=xch_price_usd,
+            network=network,
+            keyring_yaml_path=keyring_yaml_path,
+            use_sage_wallet=use_sage_wallet,
+        )
+    except Exception as exc:
+        return [_built_offer_result(exc)] * repeat
+    return [_built_offer_result(offer) for offer in build_offer_texts([payload] * repeat)]
 
 
 def _cloud_wallet_configured(program: Any) -> bool:
@@ -703,7 +789,10 @@ def _daemon_sage_coin_preflight(
         return True  # XCH: Sage handles coin selection internally
 
     import asyncio as _asyncio
-    from greenfloor.adapters.sage_rpc import SageRpcError as _SageRpcError, resolve_sage_client as _resolve_sage_client
+    from greenfloor.adapters.sage_rpc import (
+        SageRpcError as _SageRpcError,
+        resolve_sage_client as _resolve_sage_client,
+    )
 
     def _count_eligible(coins: list[dict]) -> int:
         count = 0
@@ -742,19 +831,25 @@ def _daemon_sage_coin_preflight(
         if ready:
             _daemon_logger.debug(
                 "coin_preflight_ok asset_id=%s eligible=%d needed=%d",
-                asset_id, eligible, number_of_coins,
+                asset_id,
+                eligible,
+                number_of_coins,
             )
         else:
             _daemon_logger.info(
                 "coin_preflight_split_submitted asset_id=%s eligible=%d needed=%d"
                 " offer_mojos=%d — skipping offers this cycle",
-                asset_id, eligible, number_of_coins, offer_mojos,
+                asset_id,
+                eligible,
+                number_of_coins,
+                offer_mojos,
             )
         return ready
     except Exception as exc:
         _daemon_logger.warning(
             "coin_preflight_error asset_id=%s error=%s — proceeding with offer attempt",
-            asset_id, exc,
+            asset_id,
+            exc,
         )
         return True  # Don't block on preflight errors; let offer attempt surface its own failure
 
@@ -782,6 +877,8 @@ def _execute_strategy_actions(
     # Use Sage RPC wallet when no keyring path is configured and Sage certs are present.
     use_sage_wallet = sage_certs_present()
     for action in strategy_actions:
+        # Preflight each rung right before building it, so it sees the coins
+        # locked by the offers built for the rungs before it.
         if use_sage_wallet and not runtime_dry_run:
             pricing = _market_pricing(market)
             _base_mojo_mult = int(pricing.get("base_unit_mojo_multiplier", 1000))
@@ -796,16 +893,18 @@ def _execute_strategy_actions(
             )
             if not _preflight_ok:
                 for _ in range(int(action.repeat)):
-                    items.append({
-                        "size": action.size,
-                        "status": "skipped",
-                        "reason": "coin_preflight_split_submitted",
-                        "offer_id": None,
-                    })
+                    items.append(
+                        {
+                            "size": action.size,
+                            "status": "skipped",
+                            "reason": "coin_preflight_split_submitted",
+                            "offer_id": None,
+                        }
+                    )
                 continue
 
-        for _ in range(int(action.repeat)):
-            if runtime_dry_run:
+        if runtime_dry_run:
+            for _ in range(int(action.repeat)):
                 items.append(
                     {
                         "size": action.size,
@@ -814,16 +913,17 @@ def _execute_strategy_actions(
                         "offer_id": None,
                     }
                 )
-                continue
+            continue
 
-            built = _build_offer_for_action(
-                market=market,
-                action=action,
-                xch_price_usd=xch_price_usd,
-                network=app_network,
-                keyring_yaml_path=keyring_yaml_path,
-                use_sage_wallet=use_sage_wallet,
-            )
+        built_offers = _build_offers_for_action(
+            market=market,
+            action=action,
+            xch_price_usd=xch_price_usd,
+            network=app_network,
+            keyring_yaml_path=keyring_yaml_path,
+            use_sage_wallet=use_sage_wallet,
+        )
+        for built in built_offers:
             if built.get("status") != "executed":
                 built_reason = str(built.get("reason", "offer_builder_skipped"))
                 if (
@@ -1323,20 +1423,7 @@ def _process_single_market(
         {
             "market_id": market.market_id,
             "xch_price_usd": xch_price_usd,
-            "actions": [
-                {
-                    "size": action.size,
-                    "repeat": action.repeat,
-                    "pair": action.pair,
-                    "expiry_unit": action.expiry_unit,
-                    "expiry_value": action.expiry_value,
-                    "cancel_after_create": action.cancel_after_create,
-                    "reason": action.reason,
-                    "target_spread_bps": action.target_spread_bps,
-                    "direction": action.direction,
-                }
-                for action in strategy_actions
-            ],
+            "actions": [action.to_dict() for action in strategy_actions],
         },
         market_id=market.market_id,
     )
@@ -8,23 +8,77 @@ replicates exactly what ``greenfloord`` does on each cycle:
 3. Post new offers to fill gaps (via Sage RPC).
 4. Cancel / rotate offers when the cancel policy triggers.
 
-Implementation: wraps the daemon's synchronous ``run_once`` in
-``asyncio.get_event_loop().run_in_executor`` so the aiohttp event loop
-is never blocked.
+Implementation: runs the daemon's synchronous ``run_once`` (SQLite and
+blocking HTTP adapters throughout) in a worker thread via
+``asyncio.to_thread`` so the aiohttp event loop is never blocked.
 """
+
 from __future__ import annotations
 
 import asyncio
+import functools
+import itertools
 import logging
+import time
+from collections import deque
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
+import yaml
+
+from greenfloor.adapters.sage_rpc import sage_certs_present
 from greenfloor.config.io import load_markets_config_with_optional_overlay, load_program_config
+from greenfloor.config.models import MarketsConfig, ProgramConfig
+from greenfloor.daemon.main import run_once
 
 logger = logging.getLogger("greenfloor.webui.market_loop")
 
 _MAX_LOG_EVENTS = 200
+_STATUS_RECENT_EVENTS = 20
+
+
+@functools.lru_cache(maxsize=2)
+def _format_iso(epoch_second: int) -> str:
+    return datetime.fromtimestamp(epoch_second, UTC).isoformat()
+
+
+def _now_iso() -> str:
+    """Current UTC time at one-second resolution, formatted once per second.
+
+    Bursts of events (a failing cycle emits several back to back) reuse the
+    same string instead of re-running datetime formatting for each.
+    """
+    return _format_iso(time.time_ns() // 1_000_000_000)
+
+
+def _stat_key(path: Path | None) -> tuple[int, int] | None:
+    """Return (mtime_ns, size) for cache keys, or None when the file is absent."""
+    if path is None:
+        return None
+    try:
+        st = path.expanduser().stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+# status() is polled by every open WebUI tab; re-parsing YAML on each poll is
+# wasted work while the files are unchanged.  The stat key in the cache key
+# invalidates entries as soon as a file is edited.
+@functools.lru_cache(maxsize=4)
+def _load_program_cached(path: Path, stat_key: tuple[int, int] | None) -> ProgramConfig:
+    return load_program_config(path)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_markets_cached(
+    path: Path,
+    stat_key: tuple[int, int] | None,
+    overlay_path: Path | None,
+    overlay_stat_key: tuple[int, int] | None,
+) -> MarketsConfig:
+    return load_markets_config_with_optional_overlay(path=path, overlay_path=overlay_path)
 
 
 class MarketLoop:
@@ -46,7 +100,12 @@ class MarketLoop:
         self._last_result: dict[str, Any] | None = None
         self._cycle_count = 0
         self._error_count = 0
-        self._log_events: list[dict[str, Any]] = []
+        self._log_events: deque[dict[str, Any]] = deque(maxlen=_MAX_LOG_EVENTS)
+        # Cuts the inter-cycle sleep short (manual trigger or stop).
+        self._wake = asyncio.Event()
+        self._cycle_lock = asyncio.Lock()
+        # trigger_once() callers waiting for the background loop's next cycle.
+        self._cycle_waiters: list[asyncio.Future[dict[str, Any]]] = []
 
     # ------------------------------------------------------------------
     # Public control API
@@ -63,6 +122,7 @@ class MarketLoop:
     def stop(self) -> None:
         """Stop the background loop."""
         self._running = False
+        self._wake.set()
         if self._task and not self._task.done():
             self._task.cancel()
         self._task = None  # clear so start() always creates a fresh task
@@ -82,14 +142,29 @@ class MarketLoop:
             "last_result": self._last_result,
             "cycle_count": self._cycle_count,
             "error_count": self._error_count,
-            "recent_events": list(self._log_events[-20:]),
+            "recent_events": list(
+                itertools.islice(
+                    self._log_events,
+                    max(0, len(self._log_events) - _STATUS_RECENT_EVENTS),
+                    None,
+                )
+            ),
         }
 
     async def trigger_once(self) -> dict[str, Any]:
-        """Run one cycle immediately in the executor and return the result."""
+        """Run one cycle now and return its result.
+
+        While the background loop is running, its sleep is cut short and the
+        caller gets the result of the loop's next cycle (or of the one already
+        in flight), so a manual trigger never runs alongside a scheduled cycle.
+        """
         self._emit("trigger", "Manual cycle triggered")
-        result = await self._run_once_in_executor()
-        return result
+        if self._task is not None and not self._task.done():
+            waiter: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
+            self._cycle_waiters.append(waiter)
+            self._wake.set()
+            return await waiter
+        return await self._run_cycle()
 
     # ------------------------------------------------------------------
     # Internals
@@ -98,23 +173,22 @@ class MarketLoop:
     def _sage_connected(self) -> bool:
         """Check Sage cert availability using configured paths (mirrors handle_sage_rpc_status)."""
         try:
-            import yaml as _yaml
-            from greenfloor.adapters.sage_rpc import sage_certs_present
             with open(self._program_path, "r", encoding="utf-8") as f:
-                data = _yaml.safe_load(f) or {}
+                data = yaml.safe_load(f) or {}
             sage_cfg = dict(data.get("sage_rpc", {}))
             cert_path = str(sage_cfg.get("cert_path") or "") or None
             key_path = str(sage_cfg.get("key_path") or "") or None
             return sage_certs_present(cert_path, key_path)
         except Exception:
-            from greenfloor.adapters.sage_rpc import sage_certs_present
             return sage_certs_present()
 
     def _count_enabled_markets(self) -> int:
         try:
-            markets = load_markets_config_with_optional_overlay(
-                path=self._markets_path,
-                overlay_path=self._testnet_markets_path,
+            markets = _load_markets_cached(
+                self._markets_path,
+                _stat_key(self._markets_path),
+                self._testnet_markets_path,
+                _stat_key(self._testnet_markets_path),
             )
             return sum(1 for m in markets.markets if m.enabled)
         except Exception:
@@ -122,30 +196,45 @@ class MarketLoop:
 
     def _emit(self, event_type: str, message: str, extra: dict[str, Any] | None = None) -> None:
         entry: dict[str, Any] = {
-            "at": datetime.now(UTC).isoformat(),
+            "at": _now_iso(),
             "type": event_type,
             "message": message,
         }
         if extra:
             entry.update(extra)
         self._log_events.append(entry)
-        if len(self._log_events) > _MAX_LOG_EVENTS:
-            self._log_events = self._log_events[-_MAX_LOG_EVENTS:]
+
+    async def _run_cycle(self) -> dict[str, Any]:
+        async with self._cycle_lock:
+            return await self._run_once_in_executor()
 
     async def _loop(self) -> None:
-        while self._running:
-            result = await self._run_once_in_executor()
-            interval = int(result.get("loop_interval_seconds", 30))
-            self._emit("sleep", f"Next cycle in {interval}s")
-            try:
-                await asyncio.sleep(interval)
-            except asyncio.CancelledError:
-                break
+        try:
+            while self._running:
+                result = await self._run_cycle()
+                waiters, self._cycle_waiters = self._cycle_waiters, []
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(result)
+                # Triggers that arrived mid-cycle were answered above.
+                self._wake.clear()
+                interval = int(result.get("loop_interval_seconds", 30))
+                self._emit("sleep", f"Next cycle in {interval}s")
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=interval)
+                except TimeoutError:
+                    pass
+                except asyncio.CancelledError:
+                    break
+        finally:
+            for waiter in self._cycle_waiters:
+                if not waiter.done():
+                    waiter.set_result({"status": "error", "error": "market_loop_stopped"})
+            self._cycle_waiters = []
 
     async def _run_once_in_executor(self) -> dict[str, Any]:
-        loop = asyncio.get_event_loop()
         try:
-            program = load_program_config(self._program_path)
+            program = _load_program_cached(self._program_path, _stat_key(self._program_path))
             state_dir = Path(program.home_dir).expanduser() / "state"
             state_dir.mkdir(parents=True, exist_ok=True)
             interval = int(getattr(program, "runtime_loop_interval_seconds", 30))
@@ -153,7 +242,6 @@ class MarketLoop:
             self._emit("cycle_start", "Running market cycle")
 
             def _sync_run() -> int:
-                from greenfloor.daemon.main import run_once
                 return run_once(
                     program_path=self._program_path,
                     markets_path=self._markets_path,
@@ -166,9 +254,9 @@ class MarketLoop:
                     testnet_markets_path=self._testnet_markets_path,
                 )
 
-            exit_code: int = await loop.run_in_executor(None, _sync_run)
+            exit_code: int = await asyncio.to_thread(_sync_run)
             self._cycle_count += 1
-            self._last_cycle_at = datetime.now(UTC).isoformat()
+            self._last_cycle_at = _now_iso()
             status = "ok" if exit_code == 0 else "error"
             self._last_result = {
                 "status": status,
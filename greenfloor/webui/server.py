@@ -4,23 +4,49 @@ Launch:
     python -m greenfloor.webui
     python -m greenfloor.webui --port 8765 --host 0.0.0.0
 """
+
 from __future__ import annotations
 
 import argparse
 import asyncio
+import contextlib
+import copy
+import gzip
+import hashlib
 import json
 import logging
 import os
+import stat
 import sys
+import tempfile
+import time
+from collections import OrderedDict
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
+import aiohttp
+import orjson
+import yaml
 from aiohttp import web
 
+from greenfloor.adapters.sage_rpc import (
+    SageRpcClient,
+    SageRpcError,
+    configure_sage_fingerprint,
+    resolve_sage_client,
+    sage_certs_present,
+    shutdown_sage_sessions,
+)
 from greenfloor.webui.market_loop import MarketLoop
 
 logger = logging.getLogger("greenfloor.webui")
 
+# libyaml-backed loader/dumper when PyYAML was built with it (3-10x faster);
+# both produce the same documents as the pure-Python safe variants.
+_SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 # ---------------------------------------------------------------------------
 # Config path helpers
 # ---------------------------------------------------------------------------
@@ -29,55 +55,216 @@ _REPO_ROOT = Path(__file__).resolve().parents[2]
 _VENV_BIN = Path(sys.executable).parent
 
 
+# Both helpers stat the filesystem and are hit on nearly every request.  Only
+# a preferred location that was found is remembered; fallbacks are re-checked
+# on each call, so installing the manager or creating ~/.greenfloor/config
+# while the server runs takes effect without a restart.
+_RESOLVED_PATHS: dict[str, Any] = {}
+
+
 def _manager_cmd() -> str:
+    cached = _RESOLVED_PATHS.get("manager_cmd")
+    if cached is not None:
+        return cached
     candidates = [
         _VENV_BIN / "greenfloor-manager",
         _VENV_BIN / "greenfloor-manager.exe",
     ]
     for c in candidates:
         if c.exists():
+            _RESOLVED_PATHS["manager_cmd"] = str(c)
             return str(c)
     return "greenfloor-manager"  # fall back to PATH
 
 
 def _default_config_paths() -> tuple[str, str]:
+    cached = _RESOLVED_PATHS.get("config_paths")
+    if cached is not None:
+        return cached
     home_cfg = Path.home() / ".greenfloor" / "config"
     program = home_cfg / "program.yaml"
     markets = home_cfg / "markets.yaml"
-    if not program.exists():
+    found_program = program.exists()
+    found_markets = markets.exists()
+    if not found_program:
         program = _REPO_ROOT / "config" / "program.yaml"
-    if not markets.exists():
+    if not found_markets:
         markets = _REPO_ROOT / "config" / "markets.yaml"
-    return str(program), str(markets)
+    paths = (str(program), str(markets))
+    if found_program and found_markets:
+        _RESOLVED_PATHS["config_paths"] = paths
+    return paths
+
+
+# ---------------------------------------------------------------------------
+# YAML config cache
+#
+# Every /api/sage-rpc/* request reads the sage_rpc section of program.yaml, and
+# the config / markets pages poll their files.  Parsed documents are kept per
+# path and reused while (mtime_ns, size) is unchanged.
+# ---------------------------------------------------------------------------
+
+_YAML_CACHE_MAX = 16
+_YAML_CACHE: OrderedDict[str, tuple[int, int, Any]] = OrderedDict()
+
+
+def _read_yaml(path: str) -> Any:
+    with open(path, "rb") as f:
+        return yaml.load(f, Loader=_SafeLoader)
+
+
+def _write_yaml(path: str, data: Any) -> os.stat_result:
+    """Atomically replace *path* with *data* dumped as YAML; return the new stat.
+
+    The document is written to a temp file in the same directory and renamed
+    over the original, so a crash mid-write never leaves a truncated config.
+    Symlinks are resolved first, so a linked config is updated in place and
+    the link itself is left alone.
+    """
+    text = yaml.dump(
+        data,
+        Dumper=_SafeDumper,
+        default_flow_style=False,
+        allow_unicode=True,
+        sort_keys=False,
+    )
+    target = os.path.realpath(path)
+    directory, name = os.path.split(target)
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=directory, prefix=f".{name}.", suffix=".tmp", delete=False
+    ) as tmp:
+        try:
+            tmp.write(text)
+            tmp.flush()
+            os.fsync(tmp.fileno())
+            os.chmod(tmp.name, stat.S_IMODE(os.stat(target).st_mode))
+        except BaseException:
+            tmp.close()
+            os.unlink(tmp.name)
+            raise
+    os.replace(tmp.name, target)
+    return os.stat(target)
+
+
+def _cache_yaml(path: str, st: os.stat_result, data: Any) -> None:
+    _YAML_CACHE[path] = (st.st_mtime_ns, st.st_size, data)
+    _YAML_CACHE.move_to_end(path)
+    while len(_YAML_CACHE) > _YAML_CACHE_MAX:
+        _YAML_CACHE.popitem(last=False)
+
+
+async def _save_yaml_cached(path: str, data: Any) -> None:
+    """Write *data* to *path* off the loop and cache it, so the next read skips a parse."""
+    st = await asyncio.to_thread(_write_yaml, path, data)
+    _cache_yaml(path, st, data)
+
+
+async def _load_yaml_cached(path: str) -> Any:
+    """Return the parsed YAML document at *path*, re-parsing only when it changed.
+
+    Reading and parsing run in a worker thread so a large or slow file never
+    stalls the event loop; cache hits cost one stat.  Callers get a deep copy
+    so that patching the result (as the write handlers do) never leaks into
+    the cached document.
+    """
+    st = os.stat(path)
+    cached = _YAML_CACHE.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        _YAML_CACHE.move_to_end(path)
+        return copy.deepcopy(cached[2])
+    data = await asyncio.to_thread(_read_yaml, path)
+    _cache_yaml(path, st, data)
+    return copy.deepcopy(data)
+
+
+# ---------------------------------------------------------------------------
+# Responses
+# ---------------------------------------------------------------------------
+
+
+def _orjson_response(payload: Any, status: int = 200) -> web.Response:
+    """JSON response encoded with orjson, for the large / frequently polled payloads.
+
+    ``OPT_NON_STR_KEYS`` keeps YAML mappings with int keys serialisable, as
+    they are with the stdlib encoder.
+    """
+    return web.Response(
+        body=orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS),
+        content_type="application/json",
+        status=status,
+    )
 
 
 # ---------------------------------------------------------------------------
 # Subprocess helpers
 # ---------------------------------------------------------------------------
 
+
+def _manager_prefix(program_path: str | None, markets_path: str | None) -> tuple[str, ...]:
+    """Shared ``greenfloor-manager ... --json`` argv prefix for _run and _stream.
+
+    Built per call: the path helpers it reads are already cached once their
+    preferred locations exist, and memoising here would freeze the fallbacks.
+    """
+    prog, mkts = _default_config_paths()
+    return (
+        _manager_cmd(),
+        "--program-config",
+        program_path or prog,
+        "--markets-config",
+        markets_path or mkts,
+        "--json",
+    )
+
+
+_MANAGER_SUBPROCESS_LIMIT = 4
+
+
+class _SubprocessLimiter:
+    """Bounds concurrent greenfloor-manager subprocesses for one app.
+
+    Each manager run is a full Python process; a burst of polls must queue
+    rather than fork without limit.  ``waiting`` is reported on /api/doctor.
+    """
+
+    def __init__(self, limit: int = _MANAGER_SUBPROCESS_LIMIT) -> None:
+        self._sem = asyncio.Semaphore(limit)
+        self.limit = limit
+        self.running = 0
+        self.waiting = 0
+
+    async def __aenter__(self) -> None:
+        self.waiting += 1
+        try:
+            await self._sem.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+
+    async def __aexit__(self, *_: object) -> None:
+        self.running -= 1
+        self._sem.release()
+
+    def snapshot(self) -> dict[str, int]:
+        return {"limit": self.limit, "running": self.running, "waiting": self.waiting}
+
+
 async def _run(
+    app: web.Application,
     *extra_args: str,
     timeout: int = 60,
     program_path: str | None = None,
     markets_path: str | None = None,
 ) -> dict[str, Any]:
-    prog, mkts = _default_config_paths()
-    program_path = program_path or prog
-    markets_path = markets_path or mkts
-    cmd = [
-        _manager_cmd(),
-        "--program-config", program_path,
-        "--markets-config", markets_path,
-        "--json",
-        *extra_args,
-    ]
+    cmd = [*_manager_prefix(program_path, markets_path), *extra_args]
     try:
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+        async with app["subproc_limiter"]:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=timeout)
         raw = stdout.decode(errors="replace")
         err = stderr.decode(errors="replace")
         try:
@@ -98,7 +285,51 @@ async def _run(
         return {"ok": False, "error": str(exc), "cmd": cmd}
 
 
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+_SSE_RAW_PREFIXES = {
+    evt: b'data: {"type":"%s","data":' % evt.encode() for evt in ("json_line", "stderr_line")
+}
+_SSE_RAW_SUFFIX = b"}\n\n"
+_PIPE_READ_SIZE = 65536
+_STREAM_DRAIN_SECONDS = 1.0
+# SSE frames are coalesced into one response.write() per burst: flushed once
+# this many bytes are pending or this long after the burst's first frame.
+_SSE_FLUSH_BYTES = 16384
+_SSE_FLUSH_SECONDS = 0.01
+
+
+async def _coalesce_writes(
+    response: web.StreamResponse, queue: asyncio.Queue[bytes | None]
+) -> None:
+    """Drain SSE frames from *queue* into *response* until a ``None`` sentinel."""
+    loop = asyncio.get_running_loop()
+    while (first := await queue.get()) is not None:
+        buf = bytearray(first)
+        deadline = loop.time() + _SSE_FLUSH_SECONDS
+        done = False
+        while len(buf) < _SSE_FLUSH_BYTES:
+            try:
+                frame = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    frame = await asyncio.wait_for(queue.get(), remaining)
+                except TimeoutError:
+                    break
+            if frame is None:
+                done = True
+                break
+            buf += frame
+        await response.write(buf)
+        if done:
+            return
+
+
 async def _stream(
+    app: web.Application,
     response: web.StreamResponse,
     *extra_args: str,
     timeout: int = 300,
@@ -106,72 +337,159 @@ async def _stream(
     markets_path: str | None = None,
 ) -> None:
     """Write SSE lines to an already-prepared StreamResponse."""
-    prog, mkts = _default_config_paths()
-    program_path = program_path or prog
-    markets_path = markets_path or mkts
-    cmd = [
-        _manager_cmd(),
-        "--program-config", program_path,
-        "--markets-config", markets_path,
-        "--json",
-        *extra_args,
-    ]
+    cmd = [*_manager_prefix(program_path, markets_path), *extra_args]
+    queue: asyncio.Queue[bytes | None] = asyncio.Queue()
+    writer = asyncio.create_task(_coalesce_writes(response, queue))
+
+    def _send(event_type: str, data: Any) -> None:
+        if writer.done():
+            writer.result()  # surface a failed write (client went away)
+        payload = orjson.dumps({"type": event_type, "data": data})
+        queue.put_nowait(b"".join((_SSE_PREFIX, payload, _SSE_SUFFIX)))
+
+    def _send_raw(event_type: str, raw_json: bytes) -> None:
+        # raw_json is already-validated JSON; splice it in rather than re-encoding.
+        if writer.done():
+            writer.result()
+        queue.put_nowait(b"".join((_SSE_RAW_PREFIXES[event_type], raw_json, _SSE_RAW_SUFFIX)))
 
-    async def _send(event_type: str, data: Any) -> None:
-        payload = json.dumps({"type": event_type, "data": data})
-        await response.write(f"data: {payload}\n\n".encode())
+    try:
+        await _run_streamed(app["subproc_limiter"], cmd, _send, _send_raw, timeout)
+    finally:
+        queue.put_nowait(None)
+        await writer
+
+
+async def _run_streamed(
+    limiter: _SubprocessLimiter,
+    cmd: list[str],
+    send: Callable[[str, Any], None],
+    send_raw: Callable[[str, bytes], None],
+    timeout: int,
+) -> None:
+    """Run *cmd* and report its output lines and exit status as SSE events.
 
-    await _send("cmd", {"cmd": " ".join(cmd)})
+    JSON output lines are forwarded verbatim through *send_raw*; everything
+    else goes through *send*.
+    """
+    send("cmd", {"cmd": " ".join(cmd)})
+
+    def _send_line(raw_line: bytes, is_stderr: bool) -> None:
+        line = raw_line.rstrip()
+        if not line:
+            return
+        # Parse only to validate (log lines often start with "["); valid
+        # JSON is forwarded as-is and only non-JSON lines are decoded.
+        try:
+            orjson.loads(line)
+        except orjson.JSONDecodeError:
+            evt = "stderr_text" if is_stderr else "text_line"
+            send(evt, line.decode(errors="replace"))
+            return
+        send_raw("stderr_line" if is_stderr else "json_line", line)
+
+    async def _read_pipe(pipe: asyncio.StreamReader, is_stderr: bool) -> None:
+        # Bulk reads: one await per chunk rather than one readline() per line.
+        carry = b""
+        while chunk := await pipe.read(_PIPE_READ_SIZE):
+            *lines, carry = (carry + chunk).split(b"\n")
+            for raw_line in lines:
+                _send_line(raw_line, is_stderr)
+        _send_line(carry, is_stderr)
 
     try:
-        proc = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        assert proc.stdout is not None
-        assert proc.stderr is not None
-
-        async def _read_pipe(pipe: asyncio.StreamReader, is_stderr: bool) -> None:
-            async for raw_line in pipe:
-                line = raw_line.decode(errors="replace").rstrip()
-                if not line:
-                    continue
-                try:
-                    parsed = json.loads(line)
-                    evt = "stderr_line" if is_stderr else "json_line"
-                    await _send(evt, parsed)
-                except json.JSONDecodeError:
-                    evt = "stderr_text" if is_stderr else "text_line"
-                    await _send(evt, line)
-
-        await asyncio.wait_for(
-            asyncio.gather(_read_pipe(proc.stdout, False), _read_pipe(proc.stderr, True)),
-            timeout=timeout,
-        )
-        await proc.wait()
-        await _send("done", {"exit_code": proc.returncode, "ok": proc.returncode == 0})
-    except asyncio.TimeoutError:
-        await _send("error", {"message": "command timed out"})
+        async with limiter:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            assert proc.stdout is not None
+            assert proc.stderr is not None
+
+            # Each pipe drains on its own task so a stalled stream never holds
+            # back the other; the timeout covers readers and exit together.
+            readers = (
+                asyncio.create_task(_read_pipe(proc.stdout, False)),
+                asyncio.create_task(_read_pipe(proc.stderr, True)),
+            )
+            exited = asyncio.create_task(proc.wait())
+            try:
+                # FIRST_EXCEPTION: a failed send (client went away) ends the
+                # wait at once instead of running on until the timeout.
+                done, pending = await asyncio.wait(
+                    (*readers, exited), timeout=timeout, return_when=asyncio.FIRST_EXCEPTION
+                )
+                for reader in readers:
+                    if reader in done:
+                        reader.result()
+                if pending:
+                    proc.kill()
+                    # Forward whatever was already buffered before giving up.
+                    await asyncio.wait(readers, timeout=_STREAM_DRAIN_SECONDS)
+                    send("error", {"message": "command timed out"})
+                    return
+            finally:
+                await _reap_streamed(proc, (*readers, exited))
+            send("done", {"exit_code": proc.returncode, "ok": proc.returncode == 0})
     except Exception as exc:
-        await _send("error", {"message": str(exc)})
+        send("error", {"message": str(exc)})
+
+
+async def _discard_pipe(pipe: asyncio.StreamReader) -> None:
+    while await pipe.read(_PIPE_READ_SIZE):
+        pass
+
+
+async def _reap_streamed(proc: asyncio.subprocess.Process, tasks: tuple[asyncio.Task, ...]) -> None:
+    """Kill *proc* if it is still running, stop *tasks* and wait for the exit.
+
+    Runs on every exit path (including cancellation) before the subprocess
+    slot is released.  Output nobody read would leave the pipe transports
+    paused short of EOF, and ``proc.wait()`` only returns once both pipes
+    close, so any remainder is read and dropped first.
+    """
+    if proc.returncode is None:
+        with contextlib.suppress(ProcessLookupError):
+            proc.kill()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    assert proc.stdout is not None
+    assert proc.stderr is not None
+    await asyncio.gather(_discard_pipe(proc.stdout), _discard_pipe(proc.stderr))
+    await proc.wait()
 
 
 # ---------------------------------------------------------------------------
 # Route handlers
 # ---------------------------------------------------------------------------
 
+
 async def handle_index(request: web.Request) -> web.Response:
-    return web.Response(text=_HTML, content_type="text/html")
+    """Serve the embedded UI, gzip-compressed once at import and ETag-validated."""
+    headers = {
+        "ETag": _HTML_ETAG,
+        "Cache-Control": "public, max-age=300",
+        "Vary": "Accept-Encoding",
+    }
+    if request.headers.get("If-None-Match") == _HTML_ETAG:
+        return web.Response(status=304, headers=headers)
+    body = _HTML_BYTES
+    if "gzip" in request.headers.get("Accept-Encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        body = _HTML_GZIP
+    return web.Response(body=body, content_type="text/html", charset="utf-8", headers=headers)
 
 
 async def handle_doctor(request: web.Request) -> web.Response:
-    result = await _run("doctor")
+    result = await _run(request.app, "doctor")
+    result["subprocess_queue"] = request.app["subproc_limiter"].snapshot()
     return web.json_response(result)
 
 
 async def handle_config_validate(request: web.Request) -> web.Response:
-    result = await _run("config-validate")
+    result = await _run(request.app, "config-validate")
     return web.json_response(result)
 
 
@@ -182,8 +500,8 @@ async def handle_offers_status(request: web.Request) -> web.Response:
     extra: list[str] = ["offers-status", "--limit", limit, "--events-limit", events_limit]
     if market_id:
         extra += ["--market-id", market_id]
-    result = await _run(*extra)
-    return web.json_response(result)
+    result = await _run(request.app, *extra)
+    return _orjson_response(result)
 
 
 async def handle_offers_reconcile(request: web.Request) -> web.Response:
@@ -197,7 +515,7 @@ async def handle_offers_reconcile(request: web.Request) -> web.Response:
     extra: list[str] = ["offers-reconcile", "--limit", limit]
     if market_id:
         extra += ["--market-id", market_id]
-    result = await _run(*extra, timeout=120)
+    result = await _run(request.app, *extra, timeout=120)
     return web.json_response(result)
 
 
@@ -206,28 +524,28 @@ async def handle_coins_list(request: web.Request) -> web.Response:
     extra: list[str] = ["coins-list"]
     if asset:
         extra += ["--asset", asset]
-    result = await _run(*extra, timeout=60)
+    result = await _run(request.app, *extra, timeout=60)
     return web.json_response(result)
 
 
 async def handle_config_paths(request: web.Request) -> web.Response:
     prog, mkts = _default_config_paths()
-    return web.json_response({
-        "program_config": prog,
-        "markets_config": mkts,
-        "manager_cmd": _manager_cmd(),
-        "python": sys.executable,
-    })
+    return web.json_response(
+        {
+            "program_config": prog,
+            "markets_config": mkts,
+            "manager_cmd": _manager_cmd(),
+            "python": sys.executable,
+        }
+    )
 
 
 async def handle_config_read(request: web.Request) -> web.Response:
     """Return the current program.yaml as JSON."""
     try:
-        import yaml as _yaml
         prog, _ = _default_config_paths()
-        with open(prog, "r", encoding="utf-8") as f:
-            data = _yaml.safe_load(f)
-        return web.json_response({"ok": True, "path": prog, "config": data})
+        data = await _load_yaml_cached(prog)
+        return _orjson_response({"ok": True, "path": prog, "config": data})
     except Exception as exc:
         return web.json_response({"ok": False, "error": str(exc)}, status=500)
 
@@ -235,12 +553,10 @@ async def handle_config_read(request: web.Request) -> web.Response:
 async def handle_config_write(request: web.Request) -> web.Response:
     """Patch specific keys in program.yaml and save."""
     try:
-        import yaml as _yaml
         body = await request.json()
         prog, _ = _default_config_paths()
 
-        with open(prog, "r", encoding="utf-8") as f:
-            data = _yaml.safe_load(f) or {}
+        data = await _load_yaml_cached(prog) or {}
 
         # Apply patches from body — each key is a dot-path like "cloud_wallet.base_url"
         patches: dict[str, Any] = body.get("patches", {})
@@ -253,8 +569,7 @@ async def handle_config_write(request: web.Request) -> web.Response:
                 node = node[part]
             node[parts[-1]] = value
 
-        with open(prog, "w", encoding="utf-8") as f:
-            _yaml.dump(data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        await _save_yaml_cached(prog, data)
 
         return web.json_response({"ok": True, "path": prog})
     except Exception as exc:
@@ -269,22 +584,18 @@ async def handle_config_write(request: web.Request) -> web.Response:
 # Python API, which forwards the request to Sage using the local cert pair.
 # ---------------------------------------------------------------------------
 
-def _load_sage_rpc_cfg() -> dict[str, Any]:
+
+async def _load_sage_rpc_cfg() -> dict[str, Any]:
     """Return the sage_rpc sub-section from the current program.yaml."""
     try:
-        import yaml as _yaml
         prog, _ = _default_config_paths()
-        with open(prog, "r", encoding="utf-8") as f:
-            data = _yaml.safe_load(f) or {}
+        data = await _load_yaml_cached(prog) or {}
         return dict(data.get("sage_rpc", {}))
     except Exception:
         return {}
 
 
-def _build_sage_client() -> "Any":
-    """Build a SageRpcClient from config (or auto-detected cert paths)."""
-    from greenfloor.adapters.sage_rpc import resolve_sage_client
-    cfg = _load_sage_rpc_cfg()
+def _sage_client_kwargs(cfg: dict[str, Any]) -> dict[str, Any]:
     fp_raw = cfg.get("fingerprint")
     fingerprint: int | None = None
     if fp_raw is not None:
@@ -294,70 +605,90 @@ def _build_sage_client() -> "Any":
                 fingerprint = fp_int
         except (TypeError, ValueError):
             pass
-    return resolve_sage_client(
-        port=int(cfg.get("port") or 9257),
-        cert_path=str(cfg.get("cert_path") or "") or None,
-        key_path=str(cfg.get("key_path") or "") or None,
-        fingerprint=fingerprint,
-    )
+    return {
+        "port": int(cfg.get("port") or 9257),
+        "cert_path": str(cfg.get("cert_path") or "") or None,
+        "key_path": str(cfg.get("key_path") or "") or None,
+        "fingerprint": fingerprint,
+    }
+
+
+async def _app_sage_client(app: web.Application) -> SageRpcClient:
+    """Return the app's long-lived SageRpcClient (config or auto-detected cert paths).
+
+    The client is rebuilt only when the sage_rpc section of program.yaml
+    changes; otherwise every request reuses it (and, through it, the shared
+    keep-alive session and cached TLS context).
+    """
+    holder: dict[str, Any] = app["sage_client"]
+    kwargs = _sage_client_kwargs(await _load_sage_rpc_cfg())
+    key = tuple(kwargs.values())
+    if holder["client"] is None or holder["key"] != key:
+        holder["client"] = resolve_sage_client(**kwargs)
+        holder["key"] = key
+    return holder["client"]
 
 
 async def handle_sage_rpc_status(request: web.Request) -> web.Response:
     """Test the Sage RPC connection and return version + sync status + logged-in key."""
-    from greenfloor.adapters.sage_rpc import SageRpcError, sage_certs_present
-    cfg = _load_sage_rpc_cfg()
+    cfg = await _load_sage_rpc_cfg()
     enabled = bool(cfg.get("enabled", False))
     cert_path = str(cfg.get("cert_path") or "") or None
     key_path = str(cfg.get("key_path") or "") or None
 
     certs_ok = sage_certs_present(cert_path, key_path)
     if not certs_ok:
-        return web.json_response({
-            "ok": False,
-            "connected": False,
-            "enabled": enabled,
-            "error": "Sage wallet cert/key not found. Enable the Sage RPC server in Sage Settings -> RPC.",
-            "cert_path": cert_path,
-        })
+        return web.json_response(
+            {
+                "ok": False,
+                "connected": False,
+                "enabled": enabled,
+                "error": "Sage wallet cert/key not found. Enable the Sage RPC server in Sage Settings -> RPC.",
+                "cert_path": cert_path,
+            }
+        )
 
     try:
-        client = _build_sage_client()
-        async with client:
-            version = await client.get_version()
-            sync = await client.get_sync_status()
-            key = await client.get_key()
-        return web.json_response({
-            "ok": True,
-            "connected": True,
-            "enabled": enabled,
-            "version": version,
-            "sync_status": sync,
-            "active_key": key.get("key"),
-        })
+        client = await _app_sage_client(request.app)
+        version, sync, key = await client.call_batch(
+            [("get_version", {}), ("get_sync_status", {}), ("get_key", {"fingerprint": None})]
+        )
+        return web.json_response(
+            {
+                "ok": True,
+                "connected": True,
+                "enabled": enabled,
+                "version": version,
+                "sync_status": sync,
+                "active_key": key.get("key"),
+            }
+        )
     except SageRpcError as exc:
-        return web.json_response({
-            "ok": False,
-            "connected": False,
-            "enabled": enabled,
-            "error": str(exc),
-            "http_status": exc.status,
-        })
+        return web.json_response(
+            {
+                "ok": False,
+                "connected": False,
+                "enabled": enabled,
+                "error": str(exc),
+                "http_status": exc.status,
+            }
+        )
     except Exception as exc:
-        return web.json_response({
-            "ok": False,
-            "connected": False,
-            "enabled": enabled,
-            "error": str(exc),
-        })
+        return web.json_response(
+            {
+                "ok": False,
+                "connected": False,
+                "enabled": enabled,
+                "error": str(exc),
+            }
+        )
 
 
 async def handle_sage_rpc_keys(request: web.Request) -> web.Response:
     """Return the list of keys known to the Sage wallet."""
-    from greenfloor.adapters.sage_rpc import SageRpcError
     try:
-        client = _build_sage_client()
-        async with client:
-            result = await client.get_keys()
+        client = await _app_sage_client(request.app)
+        result = await client.get_keys()
         return web.json_response({"ok": True, "keys": result.get("keys", [])})
     except SageRpcError as exc:
         return web.json_response({"ok": False, "error": str(exc)}, status=exc.status or 500)
@@ -367,15 +698,14 @@ async def handle_sage_rpc_keys(request: web.Request) -> web.Response:
 
 async def handle_sage_rpc_login(request: web.Request) -> web.Response:
     """Login to a Sage wallet key by fingerprint and update the server-level default."""
-    from greenfloor.adapters.sage_rpc import SageRpcError, configure_sage_fingerprint
     try:
         body = await request.json()
         fingerprint = int(body["fingerprint"])
-        client = _build_sage_client()
-        async with client:
-            result = await client.login(fingerprint)
+        client = await _app_sage_client(request.app)
+        result = await client.login(fingerprint)
         # Update the module-level default so subsequent clients use this fingerprint
         configure_sage_fingerprint(fingerprint)
+        request.app["sage_client"]["client"] = None
         return web.json_response({"ok": True, "result": result})
     except SageRpcError as exc:
         return web.json_response({"ok": False, "error": str(exc)}, status=exc.status or 500)
@@ -385,16 +715,14 @@ async def handle_sage_rpc_login(request: web.Request) -> web.Response:
 
 async def handle_sage_rpc_call(request: web.Request) -> web.Response:
     """Generic passthrough proxy: POST {"endpoint": "...", "body": {...}} -> Sage RPC."""
-    from greenfloor.adapters.sage_rpc import SageRpcError
     try:
         req_body = await request.json()
         endpoint = str(req_body.get("endpoint", "")).strip()
         if not endpoint:
             return web.json_response({"ok": False, "error": "endpoint is required"}, status=400)
         call_body = req_body.get("body") or {}
-        client = _build_sage_client()
-        async with client:
-            result = await client.call(endpoint, call_body)
+        client = await _app_sage_client(request.app)
+        result = await client.call(endpoint, call_body)
         return web.json_response({"ok": True, "result": result})
     except SageRpcError as exc:
         return web.json_response({"ok": False, **exc.to_dict()}, status=exc.status or 500)
@@ -404,15 +732,13 @@ async def handle_sage_rpc_call(request: web.Request) -> web.Response:
 
 async def handle_sage_rpc_coins(request: web.Request) -> web.Response:
     """Return the full coin list from the active Sage wallet key."""
-    from greenfloor.adapters.sage_rpc import SageRpcError
     try:
         asset_id = request.rel_url.query.get("asset_id", "").strip() or None
         limit = int(request.rel_url.query.get("limit", "500"))
         offset = int(request.rel_url.query.get("offset", "0"))
-        client = _build_sage_client()
-        async with client:
-            result = await client.get_coins(asset_id=asset_id, limit=limit, offset=offset)
-        return web.json_response({"ok": True, **result})
+        client = await _app_sage_client(request.app)
+        result = await client.get_coins(asset_id=asset_id, limit=limit, offset=offset)
+        return _orjson_response({"ok": True, **result})
     except SageRpcError as exc:
         return web.json_response({"ok": False, **exc.to_dict()}, status=exc.status or 500)
     except Exception as exc:
@@ -421,12 +747,10 @@ async def handle_sage_rpc_coins(request: web.Request) -> web.Response:
 
 async def handle_sage_rpc_cats(request: web.Request) -> web.Response:
     """Return all CAT tokens (with name/ticker/icon_url) for the active Sage key."""
-    from greenfloor.adapters.sage_rpc import SageRpcError
     try:
-        client = _build_sage_client()
-        async with client:
-            result = await client.get_cats()
-        return web.json_response({"ok": True, "cats": result.get("cats", [])})
+        client = await _app_sage_client(request.app)
+        result = await client.get_cats()
+        return _orjson_response({"ok": True, "cats": result.get("cats", [])})
     except SageRpcError as exc:
         return web.json_response({"ok": False, **exc.to_dict()}, status=exc.status or 500)
     except Exception as exc:
@@ -435,16 +759,16 @@ async def handle_sage_rpc_cats(request: web.Request) -> web.Response:
 
 async def handle_sage_rpc_offers(request: web.Request) -> web.Response:
     """Return active (and optionally completed) offers from the Sage wallet."""
-    from greenfloor.adapters.sage_rpc import SageRpcError
     try:
         limit = int(request.rel_url.query.get("limit", "200"))
         offset = int(request.rel_url.query.get("offset", "0"))
-        include_completed = request.rel_url.query.get("include_completed", "false").lower() == "true"
-        client = _build_sage_client()
-        async with client:
-            result = await client.get_offers(
-                limit=limit, offset=offset, include_completed=include_completed
-            )
+        include_completed = (
+            request.rel_url.query.get("include_completed", "false").lower() == "true"
+        )
+        client = await _app_sage_client(request.app)
+        result = await client.get_offers(
+            limit=limit, offset=offset, include_completed=include_completed
+        )
         offers = result.get("offers", [])
         return web.json_response({"ok": True, "offers": offers, "total": len(offers)})
     except SageRpcError as exc:
@@ -455,16 +779,14 @@ async def handle_sage_rpc_offers(request: web.Request) -> web.Response:
 
 async def handle_sage_rpc_cancel_offer(request: web.Request) -> web.Response:
     """Cancel a single Sage wallet offer by offer_id."""
-    from greenfloor.adapters.sage_rpc import SageRpcError
     try:
         body = await request.json()
         offer_id = str(body.get("offer_id", "")).strip()
         fee = int(body.get("fee", 0))
         if not offer_id:
             return web.json_response({"ok": False, "error": "offer_id required"}, status=400)
-        client = _build_sage_client()
-        async with client:
-            result = await client.cancel_offer(offer_id=offer_id, fee=fee)
+        client = await _app_sage_client(request.app)
+        result = await client.cancel_offer(offer_id=offer_id, fee=fee)
         return web.json_response({"ok": True, **result})
     except SageRpcError as exc:
         return web.json_response({"ok": False, **exc.to_dict()}, status=exc.status or 500)
@@ -474,7 +796,6 @@ async def handle_sage_rpc_cancel_offer(request: web.Request) -> web.Response:
 
 async def handle_sage_rpc_cancel_all_offers(request: web.Request) -> web.Response:
     """Cancel all active (non-completed) offers in the Sage wallet."""
-    from greenfloor.adapters.sage_rpc import SageRpcError
     try:
         body: dict = {}
         try:
@@ -482,73 +803,123 @@ async def handle_sage_rpc_cancel_all_offers(request: web.Request) -> web.Respons
         except Exception:
             pass
         fee = int(body.get("fee", 0))
-        client = _build_sage_client()
-        async with client:
-            offers_result = await client.get_offers(limit=500, offset=0, include_completed=False)
-            offers = offers_result.get("offers", [])
-            results = []
-            for offer in offers:
-                offer_id = str(offer.get("offer_id", "")).strip()
-                if not offer_id:
-                    continue
-                try:
-                    r = await client.cancel_offer(offer_id=offer_id, fee=fee)
-                    results.append({"offer_id": offer_id, "ok": True, **r})
-                except SageRpcError as exc:
-                    results.append({"offer_id": offer_id, "ok": False, "error": exc.body})
-                except Exception as exc:
-                    results.append({"offer_id": offer_id, "ok": False, "error": str(exc)})
+        client = await _app_sage_client(request.app)
+        offers_result = await client.get_offers(limit=500, offset=0, include_completed=False)
+        offers = offers_result.get("offers", [])
+        results = []
+        for offer in offers:
+            offer_id = str(offer.get("offer_id", "")).strip()
+            if not offer_id:
+                continue
+            try:
+                r = await client.cancel_offer(offer_id=offer_id, fee=fee)
+                results.append({"offer_id": offer_id, "ok": True, **r})
+            except SageRpcError as exc:
+                results.append({"offer_id": offer_id, "ok": False, "error": exc.body})
+            except Exception as exc:
+                results.append({"offer_id": offer_id, "ok": False, "error": str(exc)})
         cancelled = sum(1 for r in results if r.get("ok"))
-        return web.json_response({
-            "ok": True,
-            "total": len(results),
-            "cancelled": cancelled,
-            "failed": len(results) - cancelled,
-            "results": results,
-        })
+        return web.json_response(
+            {
+                "ok": True,
+                "total": len(results),
+                "cancelled": cancelled,
+                "failed": len(results) - cancelled,
+                "results": results,
+            }
+        )
     except SageRpcError as exc:
         return web.json_response({"ok": False, **exc.to_dict()}, status=exc.status or 500)
     except Exception as exc:
         return web.json_response({"ok": False, "error": str(exc)}, status=500)
 
 
-async def handle_prices(request: web.Request) -> web.Response:
-    """Return XCH/USD price (coincodex) and CAT/XCH tickers (Dexie v3)."""
-    import aiohttp
+_XCH_USD_URL = "https://coincodex.com/api/coincodex/get_coin/xch"
+_DEXIE_TICKERS_URL = "https://api.dexie.space/v3/prices/tickers"
+_PRICES_TTL_SECONDS = 5.0
+# A failed or partial refresh is cached only briefly, so an upstream outage
+# does not turn every poll into another slow upstream request.
+_PRICES_FAILURE_TTL_SECONDS = 2.0
 
-    xch_usd: float = 0.0
-    tickers: list = []
 
-    async with aiohttp.ClientSession() as session:
-        try:
-            async with session.get(
-                "https://coincodex.com/api/coincodex/get_coin/xch", timeout=aiohttp.ClientTimeout(total=8)
-            ) as r:
-                data = await r.json(content_type=None)
-                xch_usd = float(data.get("last_price_usd", 0))
-        except Exception:
-            pass
+def _new_prices_cache() -> dict[str, Any]:
+    return {"expires": 0.0, "payload": None, "last_good": None, "refresh": None}
 
-        try:
-            async with session.get(
-                "https://api.dexie.space/v3/prices/tickers", timeout=aiohttp.ClientTimeout(total=10)
-            ) as r:
-                payload = await r.json(content_type=None)
-                tickers = payload if isinstance(payload, list) else payload.get("tickers", [])
-        except Exception:
-            pass
 
-    return web.json_response({"ok": True, "xch_usd": xch_usd, "tickers": tickers})
+async def _fetch_xch_usd(session: aiohttp.ClientSession) -> float:
+    async with session.get(_XCH_USD_URL, timeout=aiohttp.ClientTimeout(total=8)) as r:
+        data = await r.json(content_type=None)
+        return float(data.get("last_price_usd", 0))
+
+
+async def _fetch_tickers(session: aiohttp.ClientSession) -> list:
+    async with session.get(_DEXIE_TICKERS_URL, timeout=aiohttp.ClientTimeout(total=10)) as r:
+        payload = await r.json(content_type=None)
+        return payload if isinstance(payload, list) else payload.get("tickers", [])
+
+
+async def _refresh_prices(cache: dict[str, Any], session: aiohttp.ClientSession) -> dict:
+    """Fetch both upstreams once and store the result in *cache*.
+
+    Parts that fail fall back to the last complete payload (or zero/empty
+    values) and are cached for ``_PRICES_FAILURE_TTL_SECONDS`` only.
+    """
+    try:
+        xch_usd, tickers = await asyncio.gather(
+            _fetch_xch_usd(session), _fetch_tickers(session), return_exceptions=True
+        )
+        last_good = cache["last_good"] or {"xch_usd": 0.0, "tickers": []}
+        complete = True
+        if isinstance(xch_usd, BaseException):
+            xch_usd = last_good["xch_usd"]
+            complete = False
+        if isinstance(tickers, BaseException):
+            tickers = last_good["tickers"]
+            complete = False
+        payload = {"ok": True, "xch_usd": xch_usd, "tickers": tickers}
+        ttl = _PRICES_TTL_SECONDS if complete else _PRICES_FAILURE_TTL_SECONDS
+        if complete:
+            cache["last_good"] = payload
+        cache["payload"] = payload
+        cache["expires"] = time.monotonic() + ttl
+        return payload
+    finally:
+        cache["refresh"] = None
+
+
+async def handle_prices(request: web.Request) -> web.Response:
+    """Return XCH/USD price (coincodex) and CAT/XCH tickers (Dexie v3).
+
+    Every open tab polls this endpoint; the last refresh is served from
+    ``app["prices_cache"]`` until it expires.  Concurrent requests after
+    expiry share one in-flight refresh task instead of each hitting the
+    upstream APIs; the check-and-start has no await point, so it needs no
+    lock.  Upstream failures never become an error response.
+    """
+    cache: dict[str, Any] = request.app["prices_cache"]
+    payload = cache["payload"]
+    if payload is not None and time.monotonic() < cache["expires"]:
+        return _orjson_response(payload)
+
+    refresh = cache["refresh"]
+    if refresh is None:
+        refresh = asyncio.ensure_future(_refresh_prices(cache, request.app["http_session"]))
+        cache["refresh"] = refresh
+    try:
+        # Shielded so one client going away does not cancel everyone's refresh.
+        payload = await asyncio.shield(refresh)
+    except Exception:
+        logger.exception("prices refresh failed")
+        payload = cache["last_good"] or {"ok": True, "xch_usd": 0.0, "tickers": []}
+    return _orjson_response(payload)
 
 
 async def handle_markets_list(request: web.Request) -> web.Response:
     """Return the markets array from markets.yaml as JSON."""
     try:
-        import yaml as _yaml
         _, mkts_path = _default_config_paths()
-        with open(mkts_path, "r", encoding="utf-8") as f:
-            data = _yaml.safe_load(f) or {}
-        return web.json_response({"ok": True, "markets": data.get("markets", [])})
+        data = await _load_yaml_cached(mkts_path) or {}
+        return _orjson_response({"ok": True, "markets": data.get("markets", [])})
     except Exception as exc:
         return web.json_response({"ok": False, "error": str(exc)}, status=500)
 
@@ -556,15 +927,12 @@ async def handle_markets_list(request: web.Request) -> web.Response:
 async def handle_markets_write(request: web.Request) -> web.Response:
     """Write the full markets array back to markets.yaml, preserving other top-level keys."""
     try:
-        import yaml as _yaml
         body = await request.json()
         markets = body.get("markets", [])
         _, mkts_path = _default_config_paths()
-        with open(mkts_path, "r", encoding="utf-8") as f:
-            data = _yaml.safe_load(f) or {}
+        data = await _load_yaml_cached(mkts_path) or {}
         data["markets"] = markets
-        with open(mkts_path, "w", encoding="utf-8") as f:
-            _yaml.dump(data, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+        await _save_yaml_cached(mkts_path, data)
         return web.json_response({"ok": True, "count": len(markets)})
     except Exception as exc:
         return web.json_response({"ok": False, "error": str(exc)}, status=500)
@@ -574,6 +942,7 @@ async def handle_markets_write(request: web.Request) -> web.Response:
 # Market loop handlers
 # ---------------------------------------------------------------------------
 
+
 async def handle_market_loop_status(request: web.Request) -> web.Response:
     loop: MarketLoop = request.app["market_loop"]
     return web.json_response(loop.status())
@@ -587,7 +956,10 @@ async def handle_market_loop_start(request: web.Request) -> web.Response:
     if status["enabled_markets"] == 0:
         return web.json_response({"ok": False, "error": "no_enabled_markets"}, status=400)
     loop.start()
-    return web.json_response({"ok": True, "status": loop.status()})
+    # start() only flips the running flag; the gating snapshot is otherwise
+    # current, so skip a second status() (it stats and reads the config files).
+    status["running"] = True
+    return web.json_response({"ok": True, "status": status})
 
 
 async def handle_market_loop_stop(request: web.Request) -> web.Response:
@@ -611,6 +983,7 @@ async def handle_market_loop_trigger(request: web.Request) -> web.Response:
 # SSE handlers for long-running commands
 # ---------------------------------------------------------------------------
 
+
 async def handle_build_offer_stream(request: web.Request) -> web.StreamResponse:
     body = {}
     try:
@@ -637,7 +1010,7 @@ async def handle_build_offer_stream(request: web.Request) -> web.StreamResponse:
     response.headers["Cache-Control"] = "no-cache"
     response.headers["X-Accel-Buffering"] = "no"
     await response.prepare(request)
-    await _stream(response, *extra, timeout=120)
+    await _stream(request.app, response, *extra, timeout=120)
     return response
 
 
@@ -657,9 +1030,12 @@ async def handle_coin_split_stream(request: web.Request) -> web.StreamResponse:
 
     extra: list[str] = [
         "coin-split",
-        "--pair", pair,
-        "--amount-per-coin", amount_per_coin,
-        "--number-of-coins", number_of_coins,
+        "--pair",
+        pair,
+        "--amount-per-coin",
+        amount_per_coin,
+        "--number-of-coins",
+        number_of_coins,
     ]
     if coin_id:
         extra += ["--coin-id", coin_id]
@@ -673,7 +1049,7 @@ async def handle_coin_split_stream(request: web.Request) -> web.StreamResponse:
     response.headers["Cache-Control"] = "no-cache"
     response.headers["X-Accel-Buffering"] = "no"
     await response.prepare(request)
-    await _stream(response, *extra, timeout=300)
+    await _stream(request.app, response, *extra, timeout=300)
     return response
 
 
@@ -703,7 +1079,7 @@ async def handle_coin_combine_stream(request: web.Request) -> web.StreamResponse
     response.headers["Cache-Control"] = "no-cache"
     response.headers["X-Accel-Buffering"] = "no"
     await response.prepare(request)
-    await _stream(response, *extra, timeout=300)
+    await _stream(request.app, response, *extra, timeout=300)
     return response
 
 
@@ -711,15 +1087,17 @@ async def handle_coin_combine_stream(request: web.Request) -> web.StreamResponse
 # App factory
 # ---------------------------------------------------------------------------
 
+
 async def _on_startup(app: web.Application) -> None:
     """Auto-start the market loop when Sage is connected and markets are enabled.
     Also calls login(fingerprint) once if a fingerprint is configured, so the
     daemon and webui both start on the right wallet without re-logging in on
     every RPC session.
     """
-    from greenfloor.adapters.sage_rpc import SageRpcError, configure_sage_fingerprint
+    # Shared pool for outbound price lookups; keeps TLS connections alive.
+    app["http_session"] = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
     # --- one-time fingerprint login at server start ---
-    cfg = _load_sage_rpc_cfg()
+    cfg = await _load_sage_rpc_cfg()
     fp_raw = cfg.get("fingerprint")
     startup_fp: int | None = None
     if fp_raw is not None:
@@ -732,9 +1110,8 @@ async def _on_startup(app: web.Application) -> None:
     configure_sage_fingerprint(startup_fp)
     if startup_fp is not None and bool(cfg.get("enabled", False)):
         try:
-            client = _build_sage_client()
-            async with client:
-                await client.login(startup_fp)
+            client = await _app_sage_client(app)
+            await client.login(startup_fp)
             logger.info("sage_fingerprint_login_ok fingerprint=%d", startup_fp)
         except Exception as exc:
             logger.warning("sage_fingerprint_login_failed fingerprint=%d error=%s", startup_fp, exc)
@@ -744,6 +1121,8 @@ async def _on_startup(app: web.Application) -> None:
 
 async def _on_cleanup(app: web.Application) -> None:
     app["market_loop"].stop()
+    await app["http_session"].close()
+    await shutdown_sage_sessions()
 
 
 def create_app() -> web.Application:
@@ -755,6 +1134,9 @@ def create_app() -> web.Application:
 
     app = web.Application()
     app["market_loop"] = market_loop
+    app["prices_cache"] = _new_prices_cache()
+    app["sage_client"] = {"key": None, "client": None}
+    app["subproc_limiter"] = _SubprocessLimiter()
     app.on_startup.append(_on_startup)
     app.on_cleanup.append(_on_cleanup)
 
@@ -793,6 +1175,7 @@ def create_app() -> web.Application:
 # Entry point
 # ---------------------------------------------------------------------------
 
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="GreenFloor Web UI")
     parser.add_argument("--host", default="127.0.0.1")
@@ -808,7 +1191,6 @@ def main() -> None:
     # Windows: use ProactorEventLoop so asyncio.create_subprocess_exec works.
     # aiohttp 3.8+ is fully compatible with ProactorEventLoop on Windows.
     if sys.platform == "win32":
-        import asyncio
         asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 
     app = create_app()
@@ -826,6 +1208,11 @@ _HTML = r"""<!DOCTYPE html>
 <meta charset="UTF-8"/>
 <meta name="viewport" content="width=device-width,initial-scale=1"/>
 <title>GreenFloor</title>
+<script>
+// The dashboard is the landing page: start its doctor run before the
+// stylesheet and main script are parsed. pages.dashboard takes it once.
+let DOCTOR_PREFETCH = fetch('/api/doctor').then(r => r.json());
+</script>
 <style>
   :root {
     --bg: #0d1117;
@@ -861,7 +1248,8 @@ _HTML = r"""<!DOCTYPE html>
   nav a {
     display: flex; align-items: center; gap: 10px;
     padding: 9px 16px; color: var(--text-muted); text-decoration: none; font-size: 14px;
-    border-left: 3px solid transparent; cursor: pointer; transition: all .15s;
+    border-left: 3px solid transparent; cursor: pointer;
+    transition: background-color .15s, color .15s, border-left-color .15s;
   }
   nav a:hover { background: var(--surface2); color: var(--text); }
   nav a.active { color: var(--text); background: var(--surface2); border-left-color: var(--green); }
@@ -881,6 +1269,9 @@ _HTML = r"""<!DOCTYPE html>
   .card {
     background: var(--surface); border: 1px solid var(--border); border-radius: 8px;
     padding: 20px; margin-bottom: 20px;
+    /* Skip layout and paint for cards scrolled out of view; "auto" keeps
+       the last rendered height as the placeholder so the scrollbar is stable. */
+    content-visibility: auto; contain-intrinsic-size: auto 600px;
   }
   .card-title { font-size: 13px; font-weight: 600; color: var(--text-muted);
                 text-transform: uppercase; letter-spacing: .05em; margin-bottom: 16px; }
@@ -910,16 +1301,26 @@ _HTML = r"""<!DOCTYPE html>
   th { text-align: left; padding: 8px 12px; color: var(--text-muted); font-weight: 600;
        font-size: 11px; text-transform: uppercase; letter-spacing: .05em;
        border-bottom: 1px solid var(--border); white-space: nowrap; }
-  td { padding: 10px 12px; border-bottom: 1px solid var(--border); vertical-align: top; }
-  tr:last-child td { border-bottom: none; }
-  tr:hover td { background: var(--surface2); }
+  td { padding: 10px 12px; vertical-align: top; }
+  /* Row borders and hover live on the <tr>, so hovering restyles one element
+     rather than every cell in the row. */
+  tbody tr { border-bottom: 1px solid var(--border); }
+  tbody tr:last-child { border-bottom: none; }
+  tbody tr:hover { background: var(--surface2); }
+  .vtbl { max-height: 480px; overflow-y: auto; }
+  .vtbl th { position: sticky; top: 0; background: var(--surface); }
+  .vtbl td { height: 34px; padding-top: 6px; padding-bottom: 6px; white-space: nowrap; }
+  tr.vpad, tr.vpad:hover { border-bottom: none; background: none; }
+  .vpad td { padding: 0; }
   .truncate { max-width: 160px; overflow: hidden; text-overflow: ellipsis; white-space: nowrap; }
+  .cell-mono { font-family: var(--font-mono); font-size: 11px; display: block; }
 
   /* ── Buttons ── */
   .btn {
     display: inline-flex; align-items: center; gap: 6px; cursor: pointer;
     padding: 7px 14px; border-radius: 6px; font-size: 13px; font-weight: 600;
-    border: 1px solid transparent; transition: all .15s;
+    border: 1px solid transparent;
+    transition: background-color .15s, border-color .15s, color .15s, opacity .15s;
   }
   .btn-primary   { background: var(--accent); color: #fff; border-color: var(--accent-hover); }
   .btn-primary:hover { background: var(--accent-hover); }
@@ -951,26 +1352,24 @@ _HTML = r"""<!DOCTYPE html>
     font-family: var(--font-mono); font-size: 12px; padding: 14px;
     max-height: 420px; overflow-y: auto; color: #c9d1d9; line-height: 1.6;
   }
-  .terminal .ln-cmd    { color: var(--text-muted); margin-bottom: 6px; }
-  .terminal .ln-ok     { color: var(--green); }
-  .terminal .ln-err    { color: var(--red); }
-  .terminal .ln-warn   { color: var(--yellow); }
-  .terminal .ln-info   { color: var(--blue); }
-  .terminal .ln-done   { font-weight: 700; }
-  .terminal .ln-json   { color: #c9d1d9; }
-  .terminal .key       { color: var(--purple); }
-  .terminal .str       { color: var(--green); }
-  .terminal .num       { color: var(--blue); }
-  .terminal .bool-t    { color: var(--green); }
-  .terminal .bool-f    { color: var(--red); }
+  /* Single-class rules: ln-* and jk-* are only used for terminal lines and
+     JSON tokens, so they need no ancestor scoping. */
+  .ln-cmd    { color: var(--text-muted); margin-bottom: 6px; }
+  .ln-ok     { color: var(--green); }
+  .ln-err    { color: var(--red); }
+  .ln-warn   { color: var(--yellow); }
+  .ln-info   { color: var(--blue); }
+  .ln-done   { font-weight: 700; }
+  .ln-json   { color: #c9d1d9; }
 
   /* ── JSON viewer ── */
   .json-view { font-family: var(--font-mono); font-size: 12px; line-height: 1.7; white-space: pre-wrap; word-break: break-all; }
-  .json-view .key  { color: var(--purple); }
-  .json-view .str  { color: var(--green); }
-  .json-view .num  { color: var(--blue); }
-  .json-view .bool { color: var(--yellow); }
-  .json-view .null { color: var(--text-muted); }
+  .jk-key   { color: var(--purple); }
+  .jk-str   { color: var(--green); }
+  .jk-num   { color: var(--blue); }
+  .jk-true  { color: var(--green); }
+  .jk-false { color: var(--red); }
+  .jk-null  { color: var(--text-muted); }
 
   /* ── Check list ── */
   .check-list { display: flex; flex-direction: column; gap: 8px; }
@@ -1038,27 +1437,34 @@ _HTML = r"""<!DOCTYPE html>
 // ---------------------------------------------------------------------------
 // Utilities
 // ---------------------------------------------------------------------------
+// Static shell nodes, looked up once: this script runs after they are parsed.
+const TOPBAR = document.getElementById('topbar-actions');
+const CONTENT = document.getElementById('content');
+const PAGE_TITLE = document.getElementById('page-title');
+const NAV_LINKS = document.querySelectorAll('nav a');
+
 function el(tag, attrs={}, ...children) {
   const e = document.createElement(tag);
-  for (const [k,v] of Object.entries(attrs)) {
+  // Attributes are applied in insertion order; for...in avoids building an
+  // entries array of [key, value] pairs on every call.
+  for (const k in attrs) {
+    const v = attrs[k];
     if (k === 'class') e.className = v;
     else if (k.startsWith('on')) e.addEventListener(k.slice(2), v);
     else e.setAttribute(k, v);
   }
-  for (const c of children) {
-    if (typeof c === 'string') e.appendChild(document.createTextNode(c));
-    else if (c) e.appendChild(c);
-  }
+  // One append() inserts every child (strings become text nodes) in one go.
+  e.append(...children.filter(Boolean));
   return e;
 }
 
 function jsonHtml(obj, indent=0) {
   const pad = '  '.repeat(indent);
   const pad1 = '  '.repeat(indent+1);
-  if (obj === null) return `<span class="null">null</span>`;
-  if (typeof obj === 'boolean') return `<span class="${obj?'bool':'bool'}" style="color:${obj?'var(--green)':'var(--red)'}">${obj}</span>`;
-  if (typeof obj === 'number') return `<span class="num">${obj}</span>`;
-  if (typeof obj === 'string') return `<span class="str">"${escHtml(obj)}"</span>`;
+  if (obj === null) return `<span class="jk-null">null</span>`;
+  if (typeof obj === 'boolean') return `<span class="jk-${obj}">${obj}</span>`;
+  if (typeof obj === 'number') return `<span class="jk-num">${obj}</span>`;
+  if (typeof obj === 'string') return `<span class="jk-str">"${escHtml(obj)}"</span>`;
   if (Array.isArray(obj)) {
     if (obj.length === 0) return '[]';
     const items = obj.map(v => `${pad1}${jsonHtml(v, indent+1)}`).join(',\n');
@@ -1067,14 +1473,94 @@ function jsonHtml(obj, indent=0) {
   if (typeof obj === 'object') {
     const keys = Object.keys(obj);
     if (keys.length === 0) return '{}';
-    const items = keys.map(k => `${pad1}<span class="key">"${escHtml(k)}"</span>: ${jsonHtml(obj[k], indent+1)}`).join(',\n');
+    const items = keys.map(k => `${pad1}<span class="jk-key">"${escHtml(k)}"</span>: ${jsonHtml(obj[k], indent+1)}`).join(',\n');
     return `{\n${items}\n${pad}}`;
   }
   return String(obj);
 }
 
+const ESC = {'&':'&amp;', '<':'&lt;', '>':'&gt;', '"':'&quot;'};
+const ESC_RE = /[&<>"]/;
+const ESC_RE_G = /[&<>"]/g;
+
+// One scan for the common nothing-to-escape case, one replace pass otherwise.
 function escHtml(s) {
-  return String(s).replace(/&/g,'&amp;').replace(/</g,'&lt;').replace(/>/g,'&gt;');
+  s = String(s);
+  return ESC_RE.test(s) ? s.replace(ESC_RE_G, c => ESC[c]) : s;
+}
+
+function badgeHtml(text, type='muted') {
+  return `<span class="badge badge-${type}"><span class="dot"></span>${escHtml(text)}</span>`;
+}
+
+// Windowed table: only the rows in (or near) the scroll viewport are in the
+// DOM; padding rows above and below keep the scroll height right.
+const VROW_HEIGHT = 34;
+const VROW_OVERSCAN = 8;
+function virtualTable(head, rows, rowHtml) {
+  const wrap = el('div',{class:'tbl-wrap vtbl'});
+  const tbody = el('tbody');
+  wrap.appendChild(el('table',{},head,tbody));
+  const cols = head.querySelectorAll('th').length;
+  const pad = h => h ? `<tr class="vpad"><td colspan="${cols}" style="height:${h}px"></td></tr>` : '';
+  let first = -1, last = -1, frame = 0;
+  function render() {
+    frame = 0;
+    const visible = Math.ceil((wrap.clientHeight || 480) / VROW_HEIGHT);
+    const start = Math.max(0, Math.floor(wrap.scrollTop / VROW_HEIGHT) - VROW_OVERSCAN);
+    const end = Math.min(rows.length, start + visible + 2 * VROW_OVERSCAN);
+    if (start === first && end === last) return;
+    first = start; last = end;
+    tbody.innerHTML = pad(start * VROW_HEIGHT) + rows.slice(start, end).map(rowHtml).join('') +
+      pad((rows.length - end) * VROW_HEIGHT);
+  }
+  wrap.addEventListener('scroll', () => { if (!frame) frame = requestAnimationFrame(render); }, {passive:true});
+  render();
+  return {el:wrap, tbody};
+}
+
+// Prototypes for repeated structures: cloneNode(true) plus textContent per
+// instance skips el()'s per-attribute and per-child dispatch.
+function tpl(html) {
+  const t = document.createElement('template');
+  t.innerHTML = html;
+  return t.content.firstElementChild;
+}
+const STAT_TPL = tpl('<div class="stat"><div class="stat-label"></div><div class="stat-value"></div></div>');
+const CHECK_TPL = tpl('<div class="check-item"><span class="ci-icon"></span><div><div class="ci-key"></div><div class="ci-val"></div></div></div>');
+
+// Build a stat grid detached from the document; callers insert it in one go.
+function statGrid(stats, cls='grid-3') {
+  const g = el('div',{class:cls});
+  for (const [label, value, style] of stats) {
+    const tile = STAT_TPL.cloneNode(true);
+    tile.firstChild.textContent = label;
+    tile.lastChild.textContent = value;
+    if (style) tile.lastChild.setAttribute('style', style);
+    g.appendChild(tile);
+  }
+  return g;
+}
+
+function checkItem(icon, key, val) {
+  const item = CHECK_TPL.cloneNode(true);
+  const info = item.lastChild;
+  item.firstChild.textContent = icon;
+  info.firstChild.textContent = key;
+  info.lastChild.textContent = val;
+  return item;
+}
+
+function loading(text='Loading…') {
+  return el('div',{class:'loading-row'}, el('div',{class:'spinner'}), ' ' + text);
+}
+
+function field(label, input) {
+  return el('div',{class:'form-group'}, el('label',{},label), input);
+}
+
+function cardTitle(text) {
+  return el('div',{class:'card-title'}, text);
 }
 
 function badge(text, type='muted') {
@@ -1092,6 +1578,24 @@ async function api(path, opts={}) {
   return r.json();
 }
 
+// For refresh handlers: each call aborts the request still in flight from the
+// previous one, and the superseded caller gets null instead of a response.
+function latestApi() {
+  let inflight = null;
+  return async function(path, opts={}) {
+    if (inflight) inflight.abort();
+    const ctrl = inflight = new AbortController();
+    try {
+      return await api(path, {...opts, signal: ctrl.signal});
+    } catch (e) {
+      if (e.name === 'AbortError') return null;
+      throw e;
+    } finally {
+      if (inflight === ctrl) inflight = null;
+    }
+  };
+}
+
 // ---------------------------------------------------------------------------
 // JSON pretty viewer
 // ---------------------------------------------------------------------------
@@ -1104,21 +1608,40 @@ function renderJson(obj) {
 // ---------------------------------------------------------------------------
 // Terminal (SSE stream)
 // ---------------------------------------------------------------------------
+const TERM_MAX_LINES = 2000;
+
 function createTerminal() {
   const term = el('div', {class:'terminal'});
   term.innerHTML = '<span class="text-muted">Ready.</span>';
-  let lineCount = 0;
+  let started = false;
+  let pending = [];
+  let frame = 0;
+
+  // Lines queue up and land once per animation frame: one HTML parse, one
+  // trim to TERM_MAX_LINES and one scroll (layout read) per flush.
+  function flush() {
+    frame = 0;
+    if (!started) { term.innerHTML = ''; started = true; }
+    term.insertAdjacentHTML('beforeend', pending.map(h => `<div>${h}</div>`).join(''));
+    pending = [];
+    for (let n = term.childElementCount - TERM_MAX_LINES; n > 0; n--) term.firstElementChild.remove();
+    term.scrollTop = term.scrollHeight;
+  }
 
   function append(html) {
-    const line = document.createElement('div');
-    line.innerHTML = html;
-    if (lineCount === 0) term.innerHTML = '';
-    term.appendChild(line);
-    lineCount++;
-    term.scrollTop = term.scrollHeight;
+    pending.push(html);
+    // rAF is paused in background tabs; don't let the queue outgrow the cap.
+    if (pending.length > TERM_MAX_LINES) pending = pending.slice(-TERM_MAX_LINES);
+    if (!frame) frame = requestAnimationFrame(flush);
+  }
+
+  // Server envelopes are always {"type":...,"data":<payload>}; cut the payload
+  // text back out instead of re-serialising the parsed object.
+  function rawData(raw) {
+    return raw.slice(raw.indexOf('"data":') + 7, -1);
   }
 
-  function handleEvent(evtType, data) {
+  function handleEvent(evtType, data, raw) {
     if (evtType === 'cmd') {
       append(`<span class="ln-cmd">$ ${escHtml(data.cmd)}</span>`);
     } else if (evtType === 'json_line') {
@@ -1128,11 +1651,11 @@ function createTerminal() {
       if (!ok || evtName.includes('error') || evtName.includes('fail')) cls = 'ln-err';
       else if (evtName.includes('warn')) cls = 'ln-warn';
       else if (evtName.includes('ok') || evtName.includes('success') || evtName.includes('confirm')) cls = 'ln-ok';
-      append(`<span class="${cls}">${escHtml(JSON.stringify(data))}</span>`);
+      append(`<span class="${cls}">${escHtml(rawData(raw))}</span>`);
     } else if (evtType === 'text_line') {
       append(`<span class="ln-json">${escHtml(data)}</span>`);
     } else if (evtType === 'stderr_text' || evtType === 'stderr_line') {
-      append(`<span class="ln-warn">${escHtml(typeof data === 'string' ? data : JSON.stringify(data))}</span>`);
+      append(`<span class="ln-warn">${escHtml(typeof data === 'string' ? data : rawData(raw))}</span>`);
     } else if (evtType === 'done') {
       const cls = data.ok ? 'ln-ok ln-done' : 'ln-err ln-done';
       append(`<span class="${cls}">── exit ${data.exit_code} ${data.ok ? '✓' : '✗'} ──</span>`);
@@ -1157,16 +1680,19 @@ async function streamPost(url, body, onEvent) {
     const {done, value} = await reader.read();
     if (done) break;
     buf += dec.decode(value, {stream:true});
-    const parts = buf.split('\n\n');
-    buf = parts.pop();
-    for (const part of parts) {
-      const line = part.trim();
+    // Walk complete events in place and slice the leftover once per chunk.
+    let start = 0, idx;
+    while ((idx = buf.indexOf('\n\n', start)) >= 0) {
+      const line = buf.slice(start, idx).trim();
+      start = idx + 2;
       if (!line.startsWith('data:')) continue;
+      const raw = line.slice(5).trim();
       try {
-        const obj = JSON.parse(line.slice(5).trim());
-        onEvent(obj.type, obj.data);
+        const obj = JSON.parse(raw);
+        onEvent(obj.type, obj.data, raw);
       } catch {}
     }
+    if (start) buf = buf.slice(start);
   }
 }
 
@@ -1176,184 +1702,193 @@ async function streamPost(url, body, onEvent) {
 
 const pages = {};
 
-// ── Dashboard ──────────────────────────────────────────────────────────────
-pages.dashboard = async function(content) {
-  content.innerHTML = '';
-  const topbar = document.getElementById('topbar-actions');
-  topbar.innerHTML = '';
-  const btn = el('button', {class:'btn btn-secondary', onclick: ()=>pages.dashboard(content)}, '↻ Refresh');
-  topbar.appendChild(btn);
+// Topbar buttons are built once per page and reused on every later visit.
+// Clicks are delegated by data-action to the handlers of the current visit.
+const topbarCache = {};
+let topbarActions = {};
+TOPBAR.addEventListener('click', e => {
+  const b = e.target.closest('[data-action]');
+  if (b && topbarActions[b.dataset.action]) topbarActions[b.dataset.action]();
+});
 
-  content.appendChild(el('div', {class:'loading-row'},
-    el('div',{class:'spinner'}), document.createTextNode(' Running doctor…')));
+// buttons: [[action, label, btnClass], ...]; returns {action: buttonElement}.
+function setTopbar(page, buttons, actions) {
+  let cached = topbarCache[page];
+  if (!cached) {
+    const byAction = {};
+    for (const [action, label, cls] of buttons) {
+      byAction[action] = el('button',{class:`btn ${cls}`,'data-action':action},label);
+    }
+    cached = topbarCache[page] = {bar: el('div',{class:'btn-group'}, ...Object.values(byAction)), byAction};
+  }
+  topbarActions = actions;
+  TOPBAR.replaceChildren(cached.bar);
+  return cached.byAction;
+}
 
-  const res = await api('/api/doctor');
+// ── Dashboard ──────────────────────────────────────────────────────────────
+pages.dashboard = async function(content) {
   content.innerHTML = '';
+  setTopbar('dashboard', [['refresh','↻ Refresh','btn-secondary']], {refresh: () => refresh()});
+
+  // The cards are built once per visit; refresh() updates their text in place
+  // and diffs the check list by key instead of tearing the page down.
+  const stats = statGrid([['Status','—'],['Exit Code','—'],['Checks','—']]);
+  const [statusVal, exitVal, checksVal] = [...stats.children].map(tile => tile.lastChild);
+  const summaryCard = el('div',{class:'card'}, cardTitle('System Status'), stats);
+  const checkList = el('div',{class:'check-list'});
+  const checkItems = new Map();
+  const checkCard = el('div',{class:'card'}, cardTitle('Doctor Checks'), checkList);
+  const rawTerm = el('div',{class:'terminal'});
+  const rawCard = el('div',{class:'card'}, cardTitle('Raw Output'), rawTerm);
+  const errTerm = el('div',{class:'terminal'});
+  errTerm.style.color = 'var(--red)';
+  const errCard = el('div',{class:'card'}, cardTitle('Error'), errTerm);
+  const cards = [summaryCard, checkCard, rawCard, errCard];
+  for (const card of cards) card.style.display = 'none';
+  const loadingRow = loading('Running doctor…');
+  content.append(loadingRow, ...cards);
+
+  // Flatten and classify the nested doctor payload into {key, icon, val} rows.
+  function collectChecks(obj, prefix, out) {
+    const keys = Object.keys(obj);
+    for (let i = 0; i < keys.length; i++) {
+      const k = keys[i], v = obj[k];
+      const key = prefix ? `${prefix}.${k}` : k;
+      if (v !== null && typeof v === 'object' && !Array.isArray(v)) {
+        collectChecks(v, key, out);
+        continue;
+      }
+      const ok = v === true || v === 'ok' || v === 'pass';
+      const fail = v === false || v === 'fail' || v === 'error';
+      out.push({key, icon: ok?'✅':fail?'❌':'ℹ️', val: typeof v === 'object' ? JSON.stringify(v) : String(v)});
+    }
+    return out;
+  }
 
-  // summary strip
-  const summaryCard = el('div', {class:'card'});
-  summaryCard.appendChild(el('div',{class:'card-title'}, 'System Status'));
-  const grid = el('div', {class:'grid-3'});
-
-  const okStat = el('div',{class:'stat'});
-  okStat.appendChild(el('div',{class:'stat-label'},'Status'));
-  const sv = el('div',{class:'stat-value',style:`color:${res.ok?'var(--green)':'var(--red)'}`});
-  sv.textContent = res.ok ? 'Healthy' : 'Issues';
-  okStat.appendChild(sv);
-  grid.appendChild(okStat);
-
-  const exitStat = el('div',{class:'stat'});
-  exitStat.appendChild(el('div',{class:'stat-label'}, 'Exit Code'));
-  const esv = el('div',{class:'stat-value'});
-  esv.textContent = res.exit_code ?? '—';
-  exitStat.appendChild(esv);
-  grid.appendChild(exitStat);
-
-  const parsedKeys = res.parsed ? Object.keys(res.parsed) : [];
-  const ksStat = el('div',{class:'stat'});
-  ksStat.appendChild(el('div',{class:'stat-label'}, 'Checks'));
-  const ksv = el('div',{class:'stat-value'});
-  ksv.textContent = parsedKeys.length || '—';
-  ksStat.appendChild(ksv);
-  grid.appendChild(ksStat);
-
-  summaryCard.appendChild(grid);
-  content.appendChild(summaryCard);
-
-  // check list
-  if (res.parsed && typeof res.parsed === 'object') {
-    const checkCard = el('div',{class:'card'});
-    checkCard.appendChild(el('div',{class:'card-title'}, 'Doctor Checks'));
-    const list = el('div',{class:'check-list'});
-    function renderChecks(obj, prefix='') {
-      for (const [k,v] of Object.entries(obj)) {
-        const fullKey = prefix ? `${prefix}.${k}` : k;
-        if (v !== null && typeof v === 'object' && !Array.isArray(v)) {
-          renderChecks(v, fullKey);
-          continue;
-        }
-        const item = el('div',{class:'check-item'});
-        const ok = v === true || v === 'ok' || v === 'pass';
-        const fail = v === false || v === 'fail' || v === 'error';
-        item.appendChild(el('span',{class:'ci-icon'}, ok?'✅':fail?'❌':'ℹ️'));
-        const info = el('div');
-        info.appendChild(el('div',{class:'ci-key'}, fullKey));
-        info.appendChild(el('div',{class:'ci-val'}, typeof v === 'object' ? JSON.stringify(v) : String(v)));
-        item.appendChild(info);
-        list.appendChild(item);
+  function updateChecks(checks) {
+    const seen = new Set();
+    const added = document.createDocumentFragment();
+    for (const c of checks) {
+      seen.add(c.key);
+      const item = checkItems.get(c.key);
+      if (!item) {
+        const node = checkItem(c.icon, c.key, c.val);
+        checkItems.set(c.key, node);
+        added.appendChild(node);
+        continue;
       }
+      const icon = item.firstChild, val = item.lastChild.lastChild;
+      if (icon.textContent !== c.icon) icon.textContent = c.icon;
+      if (val.textContent !== c.val) val.textContent = c.val;
     }
-    renderChecks(res.parsed);
-    checkCard.appendChild(list);
-    content.appendChild(checkCard);
+    for (const [key, item] of checkItems) {
+      if (!seen.has(key)) { item.remove(); checkItems.delete(key); }
+    }
+    checkList.appendChild(added);
   }
 
-  // raw output fallback
-  if (!res.parsed && res.raw) {
-    const rawCard = el('div',{class:'card'});
-    rawCard.appendChild(el('div',{class:'card-title'}, 'Raw Output'));
-    const term = el('div',{class:'terminal'});
-    term.textContent = res.raw;
-    rawCard.appendChild(term);
-    content.appendChild(rawCard);
+  function show(card, visible) {
+    card.style.display = visible ? '' : 'none';
   }
 
-  if (res.error) {
-    const errCard = el('div',{class:'card'});
-    errCard.appendChild(el('div',{class:'card-title'}, 'Error'));
-    const term = el('div',{class:'terminal'});
-    term.style.color = 'var(--red)';
-    term.textContent = res.error + '\n' + (res.stderr||'');
-    errCard.appendChild(term);
-    content.appendChild(errCard);
+  const fetchDoctor = latestApi();
+
+  let generation = 0;
+
+  async function refresh() {
+    const gen = ++generation;
+    const prefetched = DOCTOR_PREFETCH;
+    DOCTOR_PREFETCH = null;
+    const res = await (prefetched || fetchDoctor('/api/doctor'));
+    if (!res || gen !== generation) return;
+    loadingRow.remove();
+
+    const parsed = res.parsed && typeof res.parsed === 'object' ? res.parsed : null;
+    statusVal.textContent = res.ok ? 'Healthy' : 'Issues';
+    statusVal.style.color = res.ok ? 'var(--green)' : 'var(--red)';
+    exitVal.textContent = res.exit_code ?? '—';
+    checksVal.textContent = (res.parsed ? Object.keys(res.parsed).length : 0) || '—';
+    show(summaryCard, true);
+
+    updateChecks(parsed ? collectChecks(parsed, '', []) : []);
+    show(checkCard, !!parsed);
+
+    rawTerm.textContent = !res.parsed && res.raw ? res.raw : '';
+    show(rawCard, !res.parsed && !!res.raw);
+
+    errTerm.textContent = res.error ? res.error + '\n' + (res.stderr||'') : '';
+    show(errCard, !!res.error);
   }
+
+  refresh();
 };
 
 // ── Offers ─────────────────────────────────────────────────────────────────
 pages.offers = async function(content) {
   content.innerHTML = '';
-  const topbar = document.getElementById('topbar-actions');
-  topbar.innerHTML = '';
-
-  const btnRefresh = el('button',{class:'btn btn-secondary', onclick:()=>loadOffers()},'↻ Refresh');
-  const btnReconcile = el('button',{class:'btn btn-primary', onclick:()=>runReconcile()},'⚡ Reconcile');
-  topbar.appendChild(el('div',{class:'btn-group'}, btnRefresh, btnReconcile));
+  const {reconcile: btnReconcile} = setTopbar('offers',
+    [['refresh','↻ Refresh','btn-secondary'], ['reconcile','⚡ Reconcile','btn-primary']],
+    {refresh: () => loadOffers(), reconcile: () => runReconcile()});
 
   const statusCard = el('div',{class:'card'});
   const reconCard  = el('div',{class:'card'});
   reconCard.style.display = 'none';
-  content.appendChild(statusCard);
-  content.appendChild(reconCard);
+  content.append(statusCard, reconCard);
+
+  const fetchStatus = latestApi();
 
   async function loadOffers() {
-    statusCard.innerHTML = '<div class="card-title">Offers Status</div><div class="loading-row"><div class="spinner"></div> Loading…</div>';
-    const res = await api('/api/offers-status?limit=50&events_limit=20');
-    statusCard.innerHTML = '<div class="card-title">Offers Status</div>';
+    statusCard.replaceChildren(cardTitle('Offers Status'), loading());
+    const res = await fetchStatus('/api/offers-status?limit=50&events_limit=20');
+    if (!res) return;
+    const title = el('div',{class:'card-title'},'Offers Status');
     if (!res.parsed) {
       const t = el('div',{class:'terminal'}); t.textContent = res.raw||res.error||'No output';
-      statusCard.appendChild(t); return;
+      statusCard.replaceChildren(title, t); return;
     }
     const offers = res.parsed.offers || res.parsed.results || [];
     if (!offers.length) {
-      statusCard.appendChild(el('div',{class:'empty'},'No offers found.'));
+      statusCard.replaceChildren(title, el('div',{class:'empty'},'No offers found.'));
       return;
     }
-    const wrap = el('div',{class:'tbl-wrap'});
-    const tbl = el('table');
-    tbl.appendChild(el('thead',{},el('tr',{},
+    const total = offers.length;
+    const active = offers.filter(o=>(o.state||'').includes('active')).length;
+    const head = el('thead',{},el('tr',{},
       ...[['Offer ID','160px'],['Market',''],['State',''],['Pair',''],['Taker Signal',''],['Created',''],['Expires',''],['Events','']].map(
         ([h,w])=>{ const th=el('th'); th.textContent=h; if(w) th.style.minWidth=w; return th;}
       )
-    )));
-    const tbody = el('tbody');
-    for (const o of offers) {
+    ));
+    // Visible rows are rendered as one HTML string; every field goes through escHtml.
+    const fmtDate = v => v ? new Date(v).toLocaleString() : '—';
+    const {el:wrap, tbody} = virtualTable(head, offers, o => {
       const state = o.state || o.offer_state || '?';
       const stateColor = state==='active'?'green':state==='taken'?'blue':state==='expired'?'muted':'yellow';
       const takerSig = o.taker_signal || '—';
-      const ts = takerSig !== 'none' && takerSig !== '—' ? badge(takerSig,'blue') : el('span',{class:'text-muted'}, takerSig);
-      const evts = (o.events||[]).length;
-      const row = el('tr',{});
-      function td(child) { const t=el('td'); if(typeof child==='string') t.textContent=child; else t.appendChild(child); return t; }
-      const idSpan = el('span',{class:'truncate',style:'font-family:var(--font-mono);font-size:11px;display:block'}); idSpan.textContent=o.offer_id||'—';
-      row.appendChild(td(idSpan));
-      row.appendChild(td(o.market_id||'—'));
-      row.appendChild(el('td',{},badge(state,stateColor)));
-      row.appendChild(td(`${o.base_symbol||'?'}:${o.quote_asset||'?'}`));
-      row.appendChild(el('td',{},ts));
-      row.appendChild(td(o.created_at ? new Date(o.created_at).toLocaleString() : '—'));
-      row.appendChild(td(o.expires_at ? new Date(o.expires_at).toLocaleString() : '—'));
-      row.appendChild(td(String(evts)));
-      tbody.appendChild(row);
-    }
-    tbl.appendChild(tbody);
-    wrap.appendChild(tbl);
-    statusCard.appendChild(wrap);
-    // summary
-    const total = offers.length;
-    const active = offers.filter(o=>(o.state||'').includes('active')).length;
-    statusCard.insertBefore(
-      (() => {
-        const g = el('div',{class:'grid-3 mb-16'});
-        function stat(l,v) { const s=el('div',{class:'stat'}); s.appendChild(el('div',{class:'stat-label'},l)); const sv=el('div',{class:'stat-value'}); sv.textContent=v; s.appendChild(sv); return s; }
-        g.appendChild(stat('Total',total));
-        g.appendChild(stat('Active',active));
-        g.appendChild(stat('Other',total-active));
-        return g;
-      })(),
-      wrap
-    );
+      const ts = takerSig !== 'none' && takerSig !== '—' ? badgeHtml(takerSig,'blue') : `<span class="text-muted">${escHtml(takerSig)}</span>`;
+      return `<tr data-offer-id="${escHtml(o.offer_id||'')}">` +
+        `<td><span class="truncate cell-mono">${escHtml(o.offer_id||'—')}</span></td>` +
+        `<td>${escHtml(o.market_id||'—')}</td>` +
+        `<td>${badgeHtml(state,stateColor)}</td>` +
+        `<td>${escHtml(`${o.base_symbol||'?'}:${o.quote_asset||'?'}`)}</td>` +
+        `<td>${ts}</td>` +
+        `<td>${escHtml(fmtDate(o.created_at))}</td>` +
+        `<td>${escHtml(fmtDate(o.expires_at))}</td>` +
+        `<td>${(o.events||[]).length}</td>` +
+        '</tr>';
+    });
+    const frag = document.createDocumentFragment();
+    frag.append(statGrid([['Total',total],['Active',active],['Other',total-active]], 'grid-3 mb-16'), wrap);
+    statusCard.replaceChildren(title, frag);
   }
 
   async function runReconcile() {
     btnReconcile.disabled = true;
     reconCard.style.display = '';
-    reconCard.innerHTML = '<div class="card-title">Reconcile Output</div><div class="loading-row"><div class="spinner"></div> Reconciling…</div>';
+    reconCard.replaceChildren(cardTitle('Reconcile Output'), loading('Reconciling…'));
     const res = await api('/api/offers-reconcile', {method:'POST',headers:{'Content-Type':'application/json'},body:JSON.stringify({})});
     reconCard.innerHTML = '<div class="card-title">Reconcile Output</div>';
-    const viewer = el('div',{class:'terminal'});
-    viewer.appendChild(el('pre',{class:'json-view'}));
-    viewer.querySelector('pre').innerHTML = jsonHtml(res.parsed||{raw:res.raw,error:res.error});
-    reconCard.appendChild(viewer);
+    reconCard.appendChild(el('div',{class:'terminal'},renderJson(res.parsed||{raw:res.raw,error:res.error})));
     btnReconcile.disabled = false;
   }
 
@@ -1363,101 +1898,78 @@ pages.offers = async function(content) {
 // ── Coins ──────────────────────────────────────────────────────────────────
 pages.coins = async function(content) {
   content.innerHTML = '';
-  const topbar = document.getElementById('topbar-actions');
-  topbar.innerHTML = '';
-  const btnRefresh = el('button',{class:'btn btn-secondary',onclick:()=>loadCoins()},'↻ Refresh');
-  topbar.appendChild(btnRefresh);
-
-  const listCard   = el('div',{class:'card'});
-  const splitCard  = el('div',{class:'card'});
-  const combineCard= el('div',{class:'card'});
-  content.appendChild(listCard);
-
-  // Split form
-  splitCard.appendChild(el('div',{class:'card-title'},'Split Coin'));
-  const splitForm = buildSplitForm();
-  splitCard.appendChild(splitForm.el);
-  content.appendChild(splitCard);
+  setTopbar('coins', [['refresh','↻ Refresh','btn-secondary']], {refresh: () => loadCoins()});
 
-  // Combine form
-  combineCard.appendChild(el('div',{class:'card-title'},'Combine Coins'));
+  const listCard = el('div',{class:'card'});
+  const splitForm = buildSplitForm();
   const combineForm = buildCombineForm();
-  combineCard.appendChild(combineForm.el);
-  content.appendChild(combineCard);
+  content.append(
+    listCard,
+    el('div',{class:'card'}, cardTitle('Split Coin'), splitForm.el),
+    el('div',{class:'card'}, cardTitle('Combine Coins'), combineForm.el),
+  );
+
+  const fetchCoins = latestApi();
 
   async function loadCoins() {
-    listCard.innerHTML = '<div class="card-title">Coin Inventory</div><div class="loading-row"><div class="spinner"></div> Loading…</div>';
-    const res = await api('/api/coins-list');
-    listCard.innerHTML = '<div class="card-title">Coin Inventory</div>';
+    listCard.replaceChildren(cardTitle('Coin Inventory'), loading());
+    const res = await fetchCoins('/api/coins-list');
+    if (!res) return;
+    const title = el('div',{class:'card-title'},'Coin Inventory');
     if (!res.parsed) {
-      const t = el('div',{class:'terminal'}); t.textContent = res.raw||res.error||'No output'; listCard.appendChild(t); return;
+      const t = el('div',{class:'terminal'}); t.textContent = res.raw||res.error||'No output'; listCard.replaceChildren(title, t); return;
     }
     const coins = res.parsed.coins || res.parsed.results || [];
-    if (!coins.length) { listCard.appendChild(el('div',{class:'empty'},'No coins found.')); return; }
-    const wrap = el('div',{class:'tbl-wrap'});
-    const tbl = el('table');
-    tbl.appendChild(el('thead',{},el('tr',{},
+    if (!coins.length) { listCard.replaceChildren(title, el('div',{class:'empty'},'No coins found.')); return; }
+    const total = coins.length;
+    const spendable = coins.filter(c=>c.spendable).length;
+    const head = el('thead',{},el('tr',{},
       ...['Asset','Coin ID','Amount','State','Spendable'].map(h=>{ const t=el('th'); t.textContent=h; return t; })
-    )));
-    const tbody = el('tbody');
-    for (const c of coins) {
+    ));
+    const {el:wrap, tbody} = virtualTable(head, coins, c => {
       const state = c.state||c.coin_state||'?';
       const ok = state==='spendable'||state==='confirmed';
-      const row = el('tr');
-      function td(v) { const t=el('td'); t.textContent=String(v??'—'); return t; }
-      const idSpan = el('span',{style:'font-family:var(--font-mono);font-size:11px'}); idSpan.textContent=c.coin_id||c.id||'—';
-      row.appendChild(td(c.asset||c.ticker||c.asset_id||'XCH'));
-      row.appendChild(el('td',{},idSpan));
-      row.appendChild(td(c.amount_mojos||c.amount||c.mojos||'—'));
-      row.appendChild(el('td',{},badge(state,ok?'green':'yellow')));
-      row.appendChild(el('td',{},badge(c.spendable?'yes':'no', c.spendable?'green':'muted')));
-      tbody.appendChild(row);
-    }
-    tbl.appendChild(tbody);
-    wrap.appendChild(tbl);
-    listCard.appendChild(wrap);
-    const total = coins.length;
-    const spendable = coins.filter(c=>c.spendable).length;
-    listCard.insertBefore((() => {
-      const g = el('div',{class:'grid-3 mb-16'});
-      function stat(l,v) { const s=el('div',{class:'stat'}); s.appendChild(el('div',{class:'stat-label'},l)); const sv=el('div',{class:'stat-value'}); sv.textContent=v; s.appendChild(sv); return s; }
-      g.appendChild(stat('Total Coins',total));
-      g.appendChild(stat('Spendable',spendable));
-      g.appendChild(stat('Locked',total-spendable));
-      return g;
-    })(), wrap);
+      return `<tr data-coin-id="${escHtml(c.coin_id||c.id||'')}">` +
+        `<td>${escHtml(c.asset||c.ticker||c.asset_id||'XCH')}</td>` +
+        `<td><span class="cell-mono">${escHtml(c.coin_id||c.id||'—')}</span></td>` +
+        `<td>${escHtml(c.amount_mojos||c.amount||c.mojos||'—')}</td>` +
+        `<td>${badgeHtml(state,ok?'green':'yellow')}</td>` +
+        `<td>${badgeHtml(c.spendable?'yes':'no', c.spendable?'green':'muted')}</td>` +
+        '</tr>';
+    });
+    const frag = document.createDocumentFragment();
+    frag.append(statGrid([['Total Coins',total],['Spendable',spendable],['Locked',total-spendable]], 'grid-3 mb-16'), wrap);
+    listCard.replaceChildren(title, frag);
   }
 
   function buildSplitForm() {
-    const wrapper = el('div');
-    const row1 = el('div',{class:'form-row'});
-    const fg1=el('div',{class:'form-group'}); fg1.appendChild(el('label',{},'Pair')); const inpPair=el('input',{type:'text',placeholder:'e.g. TDBX:txch'}); fg1.appendChild(inpPair); row1.appendChild(fg1);
-    const fg2=el('div',{class:'form-group'}); fg2.appendChild(el('label',{},'Amount Per Coin')); const inpAmt=el('input',{type:'number',placeholder:'e.g. 1000'}); fg2.appendChild(inpAmt); row1.appendChild(fg2);
-    wrapper.appendChild(row1);
-    const row2 = el('div',{class:'form-row'});
-    const fg3=el('div',{class:'form-group'}); fg3.appendChild(el('label',{},'Number of Coins')); const inpNum=el('input',{type:'number',placeholder:'e.g. 10'}); fg3.appendChild(inpNum); row2.appendChild(fg3);
-    const fg4=el('div',{class:'form-group'}); fg4.appendChild(el('label',{},'Coin ID (optional)')); const inpCoin=el('input',{type:'text',placeholder:'leave blank for auto-select'}); fg4.appendChild(inpCoin); row2.appendChild(fg4);
-    wrapper.appendChild(row2);
+    const inpPair=el('input',{type:'text',placeholder:'e.g. TDBX:txch'});
+    const inpAmt=el('input',{type:'number',placeholder:'e.g. 1000'});
+    const inpNum=el('input',{type:'number',placeholder:'e.g. 10'});
+    const inpCoin=el('input',{type:'text',placeholder:'leave blank for auto-select'});
     const {term,handleEvent} = createTerminal();
     const btn = el('button',{class:'btn btn-primary',onclick:async()=>{ btn.disabled=true; term.style.display=''; await streamPost('/api/coin-split/stream',{pair:inpPair.value.trim(),coin_id:inpCoin.value.trim(),amount_per_coin:+inpAmt.value,number_of_coins:+inpNum.value},handleEvent); btn.disabled=false; }},'▶ Split');
-    wrapper.appendChild(el('div',{class:'btn-group mt-16'},btn));
     term.style.display='none';
-    wrapper.appendChild(el('div',{class:'mt-16'},term));
+    const wrapper = el('div',{},
+      el('div',{class:'form-row'}, field('Pair',inpPair), field('Amount Per Coin',inpAmt)),
+      el('div',{class:'form-row'}, field('Number of Coins',inpNum), field('Coin ID (optional)',inpCoin)),
+      el('div',{class:'btn-group mt-16'},btn),
+      el('div',{class:'mt-16'},term));
     return {el:wrapper};
   }
 
   function buildCombineForm() {
-    const wrapper = el('div');
-    const row1 = el('div',{class:'form-row'});
-    const fg1=el('div',{class:'form-group'}); fg1.appendChild(el('label',{},'Pair')); const inpPair=el('input',{type:'text',placeholder:'e.g. TDBX:txch'}); fg1.appendChild(inpPair); row1.appendChild(fg1);
-    const fg2=el('div',{class:'form-group'}); fg2.appendChild(el('label',{},'Input Coin Count')); const inpCnt=el('input',{type:'number',value:'2',placeholder:'e.g. 10'}); fg2.appendChild(inpCnt); row1.appendChild(fg2);
-    wrapper.appendChild(row1);
-    const fg3=el('div',{class:'form-group'}); fg3.appendChild(el('label',{},'Asset ID (optional)')); const inpAsset=el('input',{type:'text',placeholder:'e.g. xch or CAT asset id'}); fg3.appendChild(inpAsset); wrapper.appendChild(fg3);
+    const inpPair=el('input',{type:'text',placeholder:'e.g. TDBX:txch'});
+    const inpCnt=el('input',{type:'number',value:'2',placeholder:'e.g. 10'});
+    const inpAsset=el('input',{type:'text',placeholder:'e.g. xch or CAT asset id'});
     const {term,handleEvent} = createTerminal();
     const btn = el('button',{class:'btn btn-primary',onclick:async()=>{ btn.disabled=true; term.style.display=''; await streamPost('/api/coin-combine/stream',{pair:inpPair.value.trim(),input_coin_count:+inpCnt.value,asset_id:inpAsset.value.trim()},handleEvent); btn.disabled=false; }},'▶ Combine');
-    wrapper.appendChild(el('div',{class:'btn-group mt-16'},btn));
     term.style.display='none';
-    wrapper.appendChild(el('div',{class:'mt-16'},term));
+    const wrapper = el('div',{},
+      el('div',{class:'form-row'}, field('Pair',inpPair), field('Input Coin Count',inpCnt)),
+      field('Asset ID (optional)',inpAsset),
+      el('div',{class:'btn-group mt-16'},btn),
+      el('div',{class:'mt-16'},term));
     return {el:wrapper};
   }
 
@@ -1467,31 +1979,19 @@ pages.coins = async function(content) {
 // ── Build Offer ─────────────────────────────────────────────────────────────
 pages.build = async function(content) {
   content.innerHTML = '';
-  const topbar = document.getElementById('topbar-actions');
-  topbar.innerHTML = '';
-
-  const card = el('div',{class:'card'});
-  card.appendChild(el('div',{class:'card-title'},'Build & Post Offer'));
-
-  const row1 = el('div',{class:'form-row'});
-  const fg1=el('div',{class:'form-group'}); fg1.appendChild(el('label',{},'Pair')); const inpPair=el('input',{type:'text',placeholder:'e.g. CARBON22:xch',value:'CARBON22:xch'}); fg1.appendChild(inpPair); row1.appendChild(fg1);
-  const fg2=el('div',{class:'form-group'}); fg2.appendChild(el('label',{},'Size (base units)')); const inpSize=el('input',{type:'number',value:'1',min:'1'}); fg2.appendChild(inpSize); row1.appendChild(fg2);
-  card.appendChild(row1);
-
-  const row2 = el('div',{class:'form-row'});
-  const fg3=el('div',{class:'form-group'}); fg3.appendChild(el('label',{},'Network'));
-  const selNet=el('select'); ['mainnet','testnet11'].forEach(n=>{ const o=el('option',{value:n}); o.textContent=n; selNet.appendChild(o); }); fg3.appendChild(selNet); row2.appendChild(fg3);
-  const fg4=el('div',{class:'form-group'}); fg4.appendChild(el('label',{},'Venue'));
-  const selVenue=el('select'); [['','(default)'],['dexie','Dexie'],['splash','Splash']].forEach(([v,t])=>{ const o=el('option',{value:v}); o.textContent=t; selVenue.appendChild(o); }); fg4.appendChild(selVenue); row2.appendChild(fg4);
-  card.appendChild(row2);
 
-  const chkRow = el('div',{class:'checkbox-row mb-16'});
+  const inpPair=el('input',{type:'text',placeholder:'e.g. CARBON22:xch',value:'CARBON22:xch'});
+  const inpSize=el('input',{type:'number',value:'1',min:'1'});
+  const selNet=el('select',{}, ...['mainnet','testnet11'].map(n=>el('option',{value:n},n)));
+  const selVenue=el('select',{}, ...[['','(default)'],['dexie','Dexie'],['splash','Splash']].map(([v,t])=>el('option',{value:v},t)));
   const chkDry = el('input',{type:'checkbox',id:'dry-run-chk',checked:''}); chkDry.checked=true;
-  const chkLbl = el('label',{for:'dry-run-chk'},'Dry run (no actual posting)');
-  chkRow.appendChild(chkDry); chkRow.appendChild(chkLbl);
-  card.appendChild(chkRow);
-  const hint = el('div',{class:'form-hint mb-16'},'⚠ Uncheck dry run only when you have keys onboarded and a funded vault.');
-  card.appendChild(hint);
+
+  const card = el('div',{class:'card'},
+    cardTitle('Build & Post Offer'),
+    el('div',{class:'form-row'}, field('Pair',inpPair), field('Size (base units)',inpSize)),
+    el('div',{class:'form-row'}, field('Network',selNet), field('Venue',selVenue)),
+    el('div',{class:'checkbox-row mb-16'}, chkDry, el('label',{for:'dry-run-chk'},'Dry run (no actual posting)')),
+    el('div',{class:'form-hint mb-16'},'⚠ Uncheck dry run only when you have keys onboarded and a funded vault.'));
 
   const {term,handleEvent} = createTerminal();
   const btn = el('button',{class:'btn btn-primary',onclick:async()=>{
@@ -1513,61 +2013,53 @@ pages.build = async function(content) {
   });
   btn.className = 'btn btn-secondary';
 
-  card.appendChild(el('div',{class:'btn-group'},btn));
   term.style.display='none';
-  card.appendChild(el('div',{class:'mt-16'},term));
+  card.append(el('div',{class:'btn-group'},btn), el('div',{class:'mt-16'},term));
   content.appendChild(card);
 };
 
 // ── Config ──────────────────────────────────────────────────────────────────
 pages.config = async function(content) {
   content.innerHTML = '';
-  const topbar = document.getElementById('topbar-actions');
-  topbar.innerHTML = '';
-  const btnRefresh = el('button',{class:'btn btn-secondary',onclick:()=>pages.config(content)},'↻ Refresh');
-  const btnValidate = el('button',{class:'btn btn-primary',onclick:()=>loadValidate()},'✓ Validate Config');
-  topbar.appendChild(el('div',{class:'btn-group'},btnRefresh,btnValidate));
+  setTopbar('config',
+    [['refresh','↻ Refresh','btn-secondary'], ['validate','✓ Validate Config','btn-primary']],
+    {refresh: () => pages.config(content), validate: () => loadValidate()});
 
   // Paths card
-  const pathsCard = el('div',{class:'card'});
-  pathsCard.appendChild(el('div',{class:'card-title'},'Config Paths'));
-  pathsCard.innerHTML += '<div class="loading-row"><div class="spinner"></div> Loading…</div>';
-  content.appendChild(pathsCard);
-
+  const pathsCard = el('div',{class:'card'}, cardTitle('Config Paths'), loading());
   const validateCard = el('div',{class:'card'});
   validateCard.style.display='none';
-  content.appendChild(validateCard);
+  content.append(pathsCard, validateCard);
 
   const res = await api('/api/config-paths');
-  pathsCard.innerHTML = '<div class="card-title">Config Paths & Environment</div>';
-  const list = el('div',{class:'check-list'});
-  for (const [k,v] of Object.entries(res)) {
-    const item = el('div',{class:'check-item'});
-    item.appendChild(el('span',{class:'ci-icon'},'📄'));
-    const info=el('div');
-    info.appendChild(el('div',{class:'ci-key'},k.replace(/_/g,' ')));
-    info.appendChild(el('div',{class:'ci-val'},String(v)));
-    item.appendChild(info);
-    list.appendChild(item);
+  const items = document.createDocumentFragment();
+  const keys = Object.keys(res);
+  for (let i = 0; i < keys.length; i++) {
+    const k = keys[i];
+    items.appendChild(checkItem('📄', k.replace(/_/g,' '), String(res[k])));
   }
-  pathsCard.appendChild(list);
+  pathsCard.replaceChildren(cardTitle('Config Paths & Environment'), el('div',{class:'check-list'}, items));
+
+  // Validation output rarely changes between clicks: keep the rendered viewer
+  // and reuse it while the payload serialises identically.
+  let lastKey = null, lastView = null;
 
   async function loadValidate() {
     validateCard.style.display='';
-    validateCard.innerHTML = '<div class="card-title">Config Validation</div><div class="loading-row"><div class="spinner"></div> Validating…</div>';
+    validateCard.replaceChildren(cardTitle('Config Validation'), loading('Validating…'));
     const r = await api('/api/config-validate');
-    validateCard.innerHTML = '<div class="card-title">Config Validation</div>';
-    const hdr = el('div',{class:'section-header mb-16'});
-    hdr.appendChild(statusBadge(r.ok));
-    validateCard.appendChild(hdr);
+    const output = el('div',{class:'terminal'});
     if (r.parsed) {
-      const pre = el('div',{class:'terminal'});
-      pre.appendChild(el('pre',{class:'json-view'}));
-      pre.querySelector('pre').innerHTML = jsonHtml(r.parsed);
-      validateCard.appendChild(pre);
+      const key = JSON.stringify(r.parsed);
+      if (key !== lastKey) { lastKey = key; lastView = renderJson(r.parsed); }
+      output.appendChild(lastView);
     } else {
-      const t = el('div',{class:'terminal'}); t.textContent=r.raw||r.error||''; validateCard.appendChild(t);
+      output.textContent = r.raw||r.error||'';
     }
+    validateCard.replaceChildren(
+      cardTitle('Config Validation'),
+      el('div',{class:'section-header mb-16'}, statusBadge(r.ok)),
+      output);
   }
 };
 
@@ -1583,19 +2075,21 @@ const PAGE_TITLES = {
 };
 
 function navigate(page) {
-  document.querySelectorAll('nav a').forEach(a=>{
+  for (let i = 0, n = NAV_LINKS.length; i < n; i++) {
+    const a = NAV_LINKS[i];
     a.classList.toggle('active', a.dataset.page===page);
-  });
-  document.getElementById('page-title').textContent = PAGE_TITLES[page]||page;
-  const content = document.getElementById('content');
-  content.innerHTML = '';
-  document.getElementById('topbar-actions').innerHTML='';
-  (pages[page]||pages.dashboard)(content);
+  }
+  PAGE_TITLE.textContent = PAGE_TITLES[page]||page;
+  CONTENT.innerHTML = '';
+  TOPBAR.replaceChildren();
+  topbarActions = {};
+  (pages[page]||pages.dashboard)(CONTENT);
 }
 
-document.querySelectorAll('nav a').forEach(a=>{
+for (let i = 0, n = NAV_LINKS.length; i < n; i++) {
+  const a = NAV_LINKS[i];
   a.addEventListener('click',()=>navigate(a.dataset.page));
-});
+}
 
 // Load env info
 (async()=>{
@@ -1614,6 +2108,10 @@ navigate('dashboard');
 </html>
 """
 
+_HTML_BYTES = _HTML.encode()
+_HTML_GZIP = gzip.compress(_HTML_BYTES, compresslevel=6)
+_HTML_ETAG = f'"{hashlib.md5(_HTML_BYTES, usedforsecurity=False).hexdigest()}"'
+
 
 if __name__ == "__main__":
     main()
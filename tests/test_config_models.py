@@ -109,6 +109,16 @@ def test_parse_markets_config_accepts_valid_strategy_controls() -> None:
     assert out.markets[0].pricing["strategy_target_spread_bps"] == 120
 
 
+def test_parse_markets_config_builds_immutable_ladders() -> None:
+    out = parse_markets_config({"markets": [_base_market_row()]})
+    sell = out.markets[0].ladders["sell"]
+    assert isinstance(sell, tuple)
+    assert sell[0].size_base_units == 1
+    assert sell[0].split_buffer_count == 0
+    with pytest.raises(AttributeError):
+        sell[0].target_count = 2  # type: ignore[misc]
+
+
 # ---------------------------------------------------------------------------
 # parse_program_config: happy path
 # ---------------------------------------------------------------------------
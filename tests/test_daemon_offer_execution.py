@@ -284,6 +284,7 @@ def test_execute_strategy_actions_applies_post_cooldown_after_retry_exhaust(monk
 
 def test_build_offer_for_action_direct_builder_call(monkeypatch) -> None:
     monkeypatch.delenv("GREENFLOOR_OFFER_BUILDER_CMD", raising=False)
+    monkeypatch.setattr("greenfloor.cli.offer_builder_sdk._OFFER_BUILDER", ("sdk", ()))
     captured = {}
 
     def _fake_build_offer(payload):
@@ -323,6 +324,68 @@ def test_build_offer_for_action_direct_builder_call(monkeypatch) -> None:
     assert captured["payload"]["keyring_yaml_path"] == "/tmp/keyring.yaml"
 
 
+def test_execute_strategy_actions_preflights_each_sage_rung_before_building_it(
+    monkeypatch,
+) -> None:
+    daemon_main._POST_COOLDOWN_UNTIL.clear()
+    events: list[tuple[str, int]] = []
+
+    def _fake_preflight(*, asset_id, offer_mojos, number_of_coins, receive_address) -> bool:
+        _ = asset_id, number_of_coins, receive_address
+        events.append(("preflight", offer_mojos // 1000))
+        return True
+
+    def _fake_build_offer_texts(payloads):
+        events.append(("build", int(payloads[0]["size_base_units"])))
+        return [f"offer1-{p['size_base_units']}" for p in payloads]
+
+    class _RecordingDexie(_FakeDexie):
+        def post_offer(self, offer: str) -> dict:
+            events.append(("post", int(offer.rsplit("-", 1)[1])))
+            return super().post_offer(offer)
+
+    monkeypatch.setattr(daemon_main, "sage_certs_present", lambda: True)
+    monkeypatch.setattr(daemon_main, "_daemon_sage_coin_preflight", _fake_preflight)
+    monkeypatch.setattr(
+        "greenfloor.cli.offer_builder_sdk.build_offer_texts",
+        _fake_build_offer_texts,
+    )
+    dexie = _RecordingDexie(post_result={"success": True, "id": "offer-1"})
+    actions = [
+        PlannedAction(
+            size=size,
+            repeat=2,
+            pair="xch",
+            expiry_unit="minutes",
+            expiry_value=65,
+            cancel_after_create=True,
+            reason="below_target",
+        )
+        for size in (1, 10)
+    ]
+
+    result = _execute_strategy_actions(
+        market=_market(),
+        strategy_actions=actions,
+        runtime_dry_run=False,
+        xch_price_usd=32.0,
+        dexie=cast(Any, dexie),
+        store=cast(Any, _FakeStore()),
+    )
+
+    assert result["executed_count"] == 4
+    assert events == [
+        ("preflight", 1),
+        ("build", 1),
+        ("post", 1),
+        ("post", 1),
+        ("preflight", 10),
+        ("build", 10),
+        ("post", 10),
+        ("post", 10),
+    ]
+
+
 def test_inject_reseed_action_when_no_active_offers() -> None:
     store = _FakeStore()
     store.offer_states = [{"offer_id": "old-1", "market_id": "m1", "state": "expired"}]
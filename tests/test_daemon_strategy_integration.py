@@ -21,7 +21,7 @@ def _market_with_quote(quote_asset: str) -> MarketConfig:
         signer_key_id="key-main-1",
         inventory=MarketInventoryConfig(low_watermark_base_units=100),
         ladders={
-            "sell": [
+            "sell": (
                 MarketLadderEntry(
                     size_base_units=1,
                     target_count=7,
@@ -40,7 +40,7 @@ def _market_with_quote(quote_asset: str) -> MarketConfig:
                     split_buffer_count=0,
                     combine_when_excess_factor=2.0,
                 ),
-            ]
+            )
         },
     )
 
@@ -72,6 +72,16 @@ def test_strategy_config_from_market_reads_configurable_price_bands_and_spread()
     assert cfg.max_xch_price_usd == 39.0
 
 
+def test_strategy_config_from_market_reuses_config_for_unchanged_reload() -> None:
+    first = _strategy_config_from_market(_market_with_quote("xch"))
+    assert _strategy_config_from_market(_market_with_quote("xch")) is first
+
+    changed = _market_with_quote("xch")
+    changed.pricing = {"strategy_target_spread_bps": 90}
+    assert _strategy_config_from_market(changed) is not first
+    assert _strategy_config_from_market(changed).target_spread_bps == 90
+
+
 def test_strategy_state_from_bucket_counts_includes_xch_price() -> None:
     state = _strategy_state_from_bucket_counts(
         {1: 2, 10: 1, 100: 0},
@@ -109,18 +119,34 @@ def _two_sided_market() -> MarketConfig:
             "buy_usd_per_base": 0.98,
         },
         ladders={
-            "sell": [
-                MarketLadderEntry(size_base_units=1, target_count=3,
-                                  split_buffer_count=0, combine_when_excess_factor=2.0),
-                MarketLadderEntry(size_base_units=5, target_count=2,
-                                  split_buffer_count=0, combine_when_excess_factor=2.0),
-            ],
-            "buy": [
-                MarketLadderEntry(size_base_units=1, target_count=4,
-                                  split_buffer_count=0, combine_when_excess_factor=2.0),
-                MarketLadderEntry(size_base_units=5, target_count=2,
-                                  split_buffer_count=0, combine_when_excess_factor=2.0),
-            ],
+            "sell": (
+                MarketLadderEntry(
+                    size_base_units=1,
+                    target_count=3,
+                    split_buffer_count=0,
+                    combine_when_excess_factor=2.0,
+                ),
+                MarketLadderEntry(
+                    size_base_units=5,
+                    target_count=2,
+                    split_buffer_count=0,
+                    combine_when_excess_factor=2.0,
+                ),
+            ),
+            "buy": (
+                MarketLadderEntry(
+                    size_base_units=1,
+                    target_count=4,
+                    split_buffer_count=0,
+                    combine_when_excess_factor=2.0,
+                ),
+                MarketLadderEntry(
+                    size_base_units=5,
+                    target_count=2,
+                    split_buffer_count=0,
+                    combine_when_excess_factor=2.0,
+                ),
+            ),
         },
     )
 
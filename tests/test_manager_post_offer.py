@@ -1383,6 +1383,7 @@ def test_build_offer_text_for_request_direct_call(monkeypatch) -> None:
     from greenfloor.cli import manager
 
     monkeypatch.delenv("GREENFLOOR_OFFER_BUILDER_CMD", raising=False)
+    monkeypatch.setattr("greenfloor.cli.offer_builder_sdk._OFFER_BUILDER", ("sdk", ()))
     monkeypatch.setattr(
         "greenfloor.cli.offer_builder_sdk.build_offer",
         lambda _payload: "offer1direct",
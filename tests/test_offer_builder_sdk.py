@@ -1,7 +1,15 @@
 from __future__ import annotations
 
+import asyncio
+import io
 import json
+import shlex
+import sys
+import threading
 
+import pytest
+
+from greenfloor.adapters import sage_rpc
 from greenfloor.cli import offer_builder_sdk
 
 
@@ -149,3 +157,225 @@ def test_coin_backed_signing_uses_signing_module(monkeypatch) -> None:
     assert captured["payload"]["key_id"] == "k1"
     assert captured["payload"]["plan"]["op_type"] == "offer"
     assert captured["payload"]["plan"]["offer_amount"] == 10000
+
+
+def test_build_offer_via_sage_reuses_one_event_loop(monkeypatch) -> None:
+    loops = []
+
+    async def _fake_make_offer(payload):
+        loops.append(asyncio.get_running_loop())
+        return f"offer1{payload['n']}"
+
+    monkeypatch.setattr(offer_builder_sdk, "_sage_make_offer_async", _fake_make_offer)
+    assert offer_builder_sdk._build_offer_via_sage({"n": 1}) == "offer11"
+    assert offer_builder_sdk._build_offer_via_sage({"n": 2}) == "offer12"
+    assert len(loops) == 2
+    assert loops[0] is loops[1]
+    assert loops[0].is_running()
+
+
+def test_sage_loop_thread_cancels_call_that_outlives_timeout() -> None:
+    cancelled = threading.Event()
+
+    async def _hang() -> str:
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return "unreachable"
+
+    with pytest.raises(TimeoutError):
+        offer_builder_sdk._sage_loop.run(_hang(), timeout=0.05)
+    assert cancelled.wait(5)
+    assert (
+        offer_builder_sdk._SAGE_CALL_TIMEOUT_SECONDS > sage_rpc._STATE_CHANGING_READ_TIMEOUT_SECONDS
+    )
+
+
+class _FakeSageClient:
+    def __init__(self) -> None:
+        self.entered = 0
+        self.params: list[dict] = []
+
+    async def __aenter__(self) -> _FakeSageClient:
+        self.entered += 1
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        return None
+
+    async def make_offer(self, params: dict) -> dict:
+        self.params.append(params)
+        amount = params["offered_assets"][0]["amount"]
+        return {"offer": f"offer1n{amount}"}
+
+
+def test_build_offer_texts_batches_sage_payloads_on_one_client(monkeypatch) -> None:
+    client = _FakeSageClient()
+    monkeypatch.setattr(offer_builder_sdk, "resolve_sage_client", lambda: client)
+    payload = {"use_sage_wallet": True, "quote_price_quote_per_base": 0.5}
+
+    results = offer_builder_sdk.build_offer_texts(
+        [
+            {**payload, "size_base_units": 1},
+            {**payload, "size_base_units": 0},
+            {**payload, "size_base_units": 2},
+        ]
+    )
+
+    assert results[0] == "offer1n1000"
+    assert isinstance(results[1], ValueError)
+    assert str(results[1]) == "invalid_size_base_units"
+    assert results[2] == "offer1n2000"
+    assert client.entered == 1
+    assert len(client.params) == 2
+
+
+class _OverlapSageClient(_FakeSageClient):
+    def __init__(self) -> None:
+        super().__init__()
+        self.in_flight: dict[str | None, int] = {}
+        self.peak: dict[str | None, int] = {}
+        self.peak_total = 0
+
+    async def make_offer(self, params: dict) -> dict:
+        asset_id = params["offered_assets"][0]["asset_id"]
+        self.in_flight[asset_id] = self.in_flight.get(asset_id, 0) + 1
+        self.peak[asset_id] = max(self.peak.get(asset_id, 0), self.in_flight[asset_id])
+        self.peak_total = max(self.peak_total, sum(self.in_flight.values()))
+        await asyncio.sleep(0.01)
+        self.in_flight[asset_id] -= 1
+        return await super().make_offer(params)
+
+
+def test_build_offer_texts_serializes_sage_offers_per_offered_asset(monkeypatch) -> None:
+    client = _OverlapSageClient()
+    monkeypatch.setattr(offer_builder_sdk, "resolve_sage_client", lambda: client)
+    payload = {"use_sage_wallet": True, "quote_price_quote_per_base": 0.5}
+
+    results = offer_builder_sdk.build_offer_texts(
+        [
+            {**payload, "asset_id": "aa" * 32, "size_base_units": 1},
+            {**payload, "asset_id": "aa" * 32, "size_base_units": 2},
+            {**payload, "asset_id": "bb" * 32, "size_base_units": 3},
+            {**payload, "asset_id": "bb" * 32, "size_base_units": 4},
+        ]
+    )
+
+    assert results == ["offer1n1000", "offer1n2000", "offer1n3000", "offer1n4000"]
+    assert client.peak == {"aa" * 32: 1, "bb" * 32: 1}
+    assert client.peak_total == 2
+
+
+def _use_builder_cmd(monkeypatch, cmd: str) -> None:
+    monkeypatch.setenv("GREENFLOOR_OFFER_BUILDER_CMD", cmd)
+    monkeypatch.setattr(
+        offer_builder_sdk, "_OFFER_BUILDER", offer_builder_sdk._offer_builder_from_env()
+    )
+
+
+_ECHO_SERVER = """
+import json, os, sys
+for line in sys.stdin:
+    payload = json.loads(line)
+    print(json.dumps({"status": "executed", "offer": f"offer1{os.getpid()}-{payload['n']}"}), flush=True)
+"""
+
+
+def test_build_offer_text_reuses_server_mode_builder(monkeypatch) -> None:
+    cmd = f"{shlex.quote(sys.executable)} -c {shlex.quote(_ECHO_SERVER)} --server"
+    _use_builder_cmd(monkeypatch, cmd)
+    server = offer_builder_sdk._BuilderServer()
+    monkeypatch.setattr(offer_builder_sdk, "_builder_server", server)
+    try:
+        first = offer_builder_sdk.build_offer_text({"n": 1})
+        second = offer_builder_sdk.build_offer_text({"n": 2})
+    finally:
+        server._terminate()
+    pid_first, n_first = first.removeprefix("offer1").split("-")
+    pid_second, n_second = second.removeprefix("offer1").split("-")
+    assert pid_first == pid_second
+    assert (n_first, n_second) == ("1", "2")
+
+
+_SILENT_BUILDER = "import sys, time\nsys.stdin.readline()\ntime.sleep(30)"
+
+
+@pytest.mark.parametrize("server_flag", ["", " --server"])
+def test_build_offer_text_reports_builder_timeout_as_runtime_error(
+    monkeypatch, server_flag: str
+) -> None:
+    cmd = f"{shlex.quote(sys.executable)} -c {shlex.quote(_SILENT_BUILDER)}{server_flag}"
+    _use_builder_cmd(monkeypatch, cmd)
+    monkeypatch.setattr(offer_builder_sdk, "_OFFER_BUILDER_TIMEOUT_SECONDS", 0.5)
+    server = offer_builder_sdk._BuilderServer()
+    monkeypatch.setattr(offer_builder_sdk, "_builder_server", server)
+    try:
+        with pytest.raises(RuntimeError, match="^offer_builder_failed:timeout$"):
+            offer_builder_sdk.build_offer_text({"n": 1})
+        assert server._proc is None
+    finally:
+        server._terminate()
+
+
+def test_server_mode_reports_unencodable_payload_as_runtime_error(monkeypatch) -> None:
+    cmd = f"{shlex.quote(sys.executable)} -c {shlex.quote(_ECHO_SERVER)} --server"
+    _use_builder_cmd(monkeypatch, cmd)
+    server = offer_builder_sdk._BuilderServer()
+    monkeypatch.setattr(offer_builder_sdk, "_builder_server", server)
+    try:
+        with pytest.raises(RuntimeError, match="^offer_builder_failed:"):
+            offer_builder_sdk.build_offer_text({"n": 2**70})
+        assert server._proc is None
+        assert offer_builder_sdk.build_offer_text({"n": 1}).endswith("-1")
+    finally:
+        server._terminate()
+
+
+def test_main_server_mode_answers_each_line(monkeypatch, capsys) -> None:
+    monkeypatch.setattr(offer_builder_sdk, "_import_sdk", lambda: _FakeSdk)
+    monkeypatch.setattr(offer_builder_sdk.sys, "argv", ["offer_builder_sdk", "--server"])
+    monkeypatch.setattr(
+        offer_builder_sdk.sys,
+        "stdin",
+        io.StringIO(json.dumps({"spend_bundle_hex": "aa"}) + "\n\nnot json\n"),
+    )
+
+    offer_builder_sdk.main()
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line["status"] for line in lines] == ["executed", "skipped"]
+    assert lines[0]["offer"] == "offer1fake"
+    assert lines[1]["reason"] == "invalid_request_json"
+
+
+def test_build_offer_text_reports_one_shot_command_failure(monkeypatch) -> None:
+    script = "import sys; sys.stderr.write('boom'); sys.exit(3)"
+    _use_builder_cmd(monkeypatch, f"{shlex.quote(sys.executable)} -c {shlex.quote(script)}")
+
+    with pytest.raises(RuntimeError, match="offer_builder_failed:boom"):
+        offer_builder_sdk.build_offer_text({"n": 7})
+
+
+def test_sage_offer_params_validates_fields_in_table_order() -> None:
+    with pytest.raises(ValueError, match="invalid_size_base_units"):
+        offer_builder_sdk._sage_offer_params({"quote_price_quote_per_base": 0})
+    with pytest.raises(ValueError, match="invalid_quote_price_quote_per_base"):
+        offer_builder_sdk._sage_offer_params({"size_base_units": 1})
+
+    params = offer_builder_sdk._sage_offer_params(
+        {"size_base_units": 2, "quote_price_quote_per_base": 0.5, "expiry_unit": "hours"}
+    )
+    assert params["offered_assets"] == [{"asset_id": None, "amount": 2000}]
+    assert params["requested_assets"] == [{"asset_id": None, "amount": 1000}]
+    assert params["expiration_seconds"] == 36000
+
+
+def test_parse_builder_stdout_reads_bytes_without_stripping() -> None:
+    assert offer_builder_sdk._parse_builder_stdout(b"") == {}
+    assert offer_builder_sdk._parse_builder_stdout(b" \n") == {}
+    assert offer_builder_sdk._parse_builder_stdout(b'{"status": "executed"}\n') == {
+        "status": "executed"
+    }
+    with pytest.raises(RuntimeError, match="offer_builder_invalid_json"):
+        offer_builder_sdk._parse_builder_stdout(b"not json\n")
@@ -3,11 +3,19 @@
 Kept in a dedicated file to avoid AST-parser recursion errors that occur when
 pytest tries to render failure tracebacks in very large test files.
 """
+
 from __future__ import annotations
 
+import itertools
 import json
+import re
 from typing import Any
 
+from greenfloor.adapters.sage_rpc import SageRpcError
+from greenfloor.cli.manager import _sage_count_eligible_coins, _sage_preflight_cat_split
+
+_NON_WS_RE = re.compile(r"\S")
+
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -16,9 +24,10 @@ from typing import Any
 
 def _sage_coins(amounts: list[int], spent_heights: list[int | None] | None = None) -> list[dict]:
     """Build minimal Sage coin dict records for preflight tests."""
-    if spent_heights is None:
-        spent_heights = [None] * len(amounts)
-    return [{"amount": a, "spent_height": sh} for a, sh in zip(amounts, spent_heights)]
+    heights: list[int | None] = (
+        list(spent_heights) if spent_heights is not None else [None] * len(amounts)
+    )
+    return [{"amount": a, "spent_height": sh} for a, sh in zip(amounts, heights, strict=True)]
 
 
 class _FakeSageClient:
@@ -39,7 +48,7 @@ class _FakeSageClient:
         self._receive_address = receive_address
         self.split_calls: list[dict[str, Any]] = []
 
-    async def __aenter__(self) -> "_FakeSageClient":
+    async def __aenter__(self) -> _FakeSageClient:
         return self
 
     async def __aexit__(self, *_: Any) -> None:
@@ -48,7 +57,9 @@ class _FakeSageClient:
     async def get_sync_status(self) -> dict[str, Any]:
         return {"receive_address": self._receive_address}
 
-    async def get_coins(self, *, asset_id: str | None = None, limit: int = 100, offset: int = 0) -> dict[str, Any]:
+    async def get_coins(
+        self, *, asset_id: str | None = None, limit: int = 100, offset: int = 0
+    ) -> dict[str, Any]:
         try:
             return {"coins": next(self._coins_iter)}
         except StopIteration:
@@ -84,17 +95,8 @@ def _monotonic_from(*values: float):
     during ``loop.close()``, so we need the mock to be safe against extra calls
     beyond what the test scenario specifies.
     """
-    it = iter(values)
-    last: list[float] = [0.0]
-
-    def _mono() -> float:
-        try:
-            last[0] = next(it)
-        except StopIteration:
-            pass
-        return last[0]
-
-    return _mono
+    it = itertools.chain(values, itertools.repeat(values[-1] if values else 0.0))
+    return lambda: next(it)
 
 
 # ---------------------------------------------------------------------------
@@ -103,8 +105,6 @@ def _monotonic_from(*values: float):
 
 
 def test_sage_count_eligible_coins_basic() -> None:
-    from greenfloor.cli.manager import _sage_count_eligible_coins
-
     coins = _sage_coins([1000, 500, 2000, 1000])
     # Only exact matches count; over/under-sized coins are excluded.
     assert _sage_count_eligible_coins(coins, offer_mojos=1000) == 2  # indices 0, 3
@@ -113,20 +113,26 @@ def test_sage_count_eligible_coins_basic() -> None:
 
 
 def test_sage_count_eligible_coins_ignores_spent() -> None:
-    from greenfloor.cli.manager import _sage_count_eligible_coins
-
     coins = _sage_coins([1000, 1000], spent_heights=[123, None])
     assert _sage_count_eligible_coins(coins, offer_mojos=1000) == 1
 
 
 def test_sage_count_eligible_coins_ignores_locked() -> None:
     """Coins with a non-None lock_id are committed to open Sage offers and must not be counted."""
-    from greenfloor.cli.manager import _sage_count_eligible_coins
-
     coins = [
-        {"amount": 1000, "spent_height": None, "lock_id": None},      # eligible: lock_id is None
+        {"amount": 1000, "spent_height": None, "lock_id": None},  # eligible: lock_id is None
         {"amount": 1000, "spent_height": None, "lock_id": "abc123"},  # locked → skip
-        {"amount": 1000, "spent_height": None},                       # no lock_id key → eligible
+        {"amount": 1000, "spent_height": None},  # no lock_id key → eligible
+    ]
+    assert _sage_count_eligible_coins(coins, offer_mojos=1000) == 2
+
+
+def test_sage_count_eligible_coins_converts_non_int_amounts() -> None:
+    coins = [
+        {"amount": "1000", "spent_height": None},  # numeric string → eligible
+        {"amount": "n/a", "spent_height": None},  # unparseable → skip
+        {"amount": None, "spent_height": None},  # missing value → skip
+        {"amount": 1000, "spent_height": None},
     ]
     assert _sage_count_eligible_coins(coins, offer_mojos=1000) == 2
 
@@ -138,8 +144,6 @@ def test_sage_count_eligible_coins_ignores_locked() -> None:
 
 def test_sage_preflight_xch_skips_immediately() -> None:
     """For XCH/txch/1/empty the preflight must return 0 without any RPC calls."""
-    from greenfloor.cli.manager import _sage_preflight_cat_split
-
     for xch_id in ("xch", "txch", "1", ""):
         rc = _sage_preflight_cat_split(
             asset_id=xch_id,
@@ -156,8 +160,6 @@ def test_sage_preflight_xch_skips_immediately() -> None:
 
 def test_sage_preflight_already_ready(monkeypatch: Any) -> None:
     """Return 0 immediately when enough eligible coins already exist."""
-    from greenfloor.cli.manager import _sage_preflight_cat_split
-
     client = _FakeSageClient(coins_sequence=[_sage_coins([1000, 1000])])
     _patch_sage_client(monkeypatch, client)
 
@@ -170,6 +172,36 @@ def test_sage_preflight_already_ready(monkeypatch: Any) -> None:
     assert not client.split_calls, "no split should have been submitted"
 
 
+class _PagedSageClient(_FakeSageClient):
+    """Serves one coin list through ``limit``/``offset`` pages like Sage does."""
+
+    def __init__(self, coins: list[dict]) -> None:
+        super().__init__(coins_sequence=[])
+        self._coins = coins
+        self.offsets: list[int] = []
+
+    async def get_coins(
+        self, *, asset_id: str | None = None, limit: int = 100, offset: int = 0
+    ) -> dict[str, Any]:
+        self.offsets.append(offset)
+        return {"coins": self._coins[offset : offset + limit], "total": len(self._coins)}
+
+
+def test_sage_preflight_counts_across_pages_and_stops_when_ready(monkeypatch: Any) -> None:
+    """Eligible coins past the first page count, and paging stops once enough are seen."""
+    client = _PagedSageClient(_sage_coins([5] * 200 + [1000] * 200 + [5] * 200))
+    _patch_sage_client(monkeypatch, client)
+
+    rc = _sage_preflight_cat_split(
+        asset_id="ae1536aa",
+        offer_mojos=1000,
+        number_of_coins=3,
+    )
+    assert rc == 0
+    assert not client.split_calls
+    assert client.offsets == [0, 200]
+
+
 # ---------------------------------------------------------------------------
 # split submitted, one poll → ready
 # ---------------------------------------------------------------------------
@@ -179,7 +211,7 @@ def test_sage_preflight_splits_and_polls_until_ready(monkeypatch: Any) -> None:
     """Submit a split; after 1 poll the new coins appear → return 0."""
     client = _FakeSageClient(
         coins_sequence=[
-            _sage_coins([]),      # initial check  → 0 eligible
+            _sage_coins([]),  # initial check  → 0 eligible
             _sage_coins([1000]),  # first poll     → 1 eligible, done
         ],
         receive_address="xch1sage_recv",
@@ -188,8 +220,6 @@ def test_sage_preflight_splits_and_polls_until_ready(monkeypatch: Any) -> None:
     monkeypatch.setattr("greenfloor.cli.manager.time.sleep", lambda _: None)
     monkeypatch.setattr("greenfloor.cli.manager._get_monotonic", _monotonic_from(0.0, 5.0, 5.0))
 
-    from greenfloor.cli.manager import _sage_preflight_cat_split
-
     rc = _sage_preflight_cat_split(
         asset_id="ae1536aa",
         offer_mojos=1000,
@@ -214,8 +244,6 @@ def test_sage_preflight_receive_address_override(monkeypatch: Any) -> None:
     monkeypatch.setattr("greenfloor.cli.manager.time.sleep", lambda _: None)
     monkeypatch.setattr("greenfloor.cli.manager._get_monotonic", _monotonic_from(0.0, 5.0, 5.0))
 
-    from greenfloor.cli.manager import _sage_preflight_cat_split
-
     rc = _sage_preflight_cat_split(
         asset_id="ae1536aa",
         receive_address="xch1explicit_override",  # must win over sage default
@@ -236,8 +264,8 @@ def test_sage_preflight_creates_correct_number_of_addresses(monkeypatch: Any) ->
     """bulk_send_cat should receive one address entry per missing coin."""
     client = _FakeSageClient(
         coins_sequence=[
-            _sage_coins([500]),              # initial: 1 of 3 exactly-denominated
-            _sage_coins([500, 500, 500]),    # poll: 3 eligible, done
+            _sage_coins([500]),  # initial: 1 of 3 exactly-denominated
+            _sage_coins([500, 500, 500]),  # poll: 3 eligible, done
         ],
         receive_address="xch1sage_recv",
     )
@@ -245,8 +273,6 @@ def test_sage_preflight_creates_correct_number_of_addresses(monkeypatch: Any) ->
     monkeypatch.setattr("greenfloor.cli.manager.time.sleep", lambda _: None)
     monkeypatch.setattr("greenfloor.cli.manager._get_monotonic", _monotonic_from(0.0, 5.0, 5.0))
 
-    from greenfloor.cli.manager import _sage_preflight_cat_split
-
     rc = _sage_preflight_cat_split(
         asset_id="ae1536aa",
         offer_mojos=500,
@@ -281,8 +307,6 @@ def test_sage_preflight_times_out_and_emits_warning(monkeypatch: Any, capsys: An
         _monotonic_from(0.0, 50.0, 50.0, 130.0),
     )
 
-    from greenfloor.cli.manager import _sage_preflight_cat_split
-
     rc = _sage_preflight_cat_split(
         asset_id="ae1536aa",
         offer_mojos=1000,
@@ -297,12 +321,8 @@ def test_sage_preflight_times_out_and_emits_warning(monkeypatch: Any, capsys: An
     decoder = json.JSONDecoder()
     messages: list[dict] = []
     pos = 0
-    while pos < len(out):
-        while pos < len(out) and out[pos] in " \t\n\r":
-            pos += 1
-        if pos >= len(out):
-            break
-        obj, pos = decoder.raw_decode(out, pos)
+    while (m := _NON_WS_RE.search(out, pos)) is not None:
+        obj, pos = decoder.raw_decode(out, m.start())
         messages.append(obj)
     results = [m["result"] for m in messages]
     assert "still_waiting" in results
@@ -316,9 +336,6 @@ def test_sage_preflight_times_out_and_emits_warning(monkeypatch: Any, capsys: An
 
 def test_sage_preflight_split_failed_returns_3(monkeypatch: Any) -> None:
     """Return 3 when bulk_send_cat raises SageRpcError."""
-    from greenfloor.adapters.sage_rpc import SageRpcError
-    from greenfloor.cli.manager import _sage_preflight_cat_split
-
     client = _FakeSageClient(
         coins_sequence=[_sage_coins([])],
         split_error=SageRpcError(500, "Insufficient balance", "bulk_send_cat"),
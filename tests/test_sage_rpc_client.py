@@ -0,0 +1,423 @@
+"""Tests for SageRpcClient session handling and request plumbing."""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import os
+import ssl
+from pathlib import Path
+
+import pytest
+
+from greenfloor.adapters import sage_rpc
+from greenfloor.adapters.sage_rpc import SageRpcClient, SageRpcError, shutdown_sage_sessions
+
+
+@pytest.fixture(autouse=True)
+def _clear_response_cache():
+    sage_rpc._response_cache.clear()
+    yield
+    sage_rpc._response_cache.clear()
+
+
+class _FakeResponse:
+    def __init__(self, status: int, body: bytes) -> None:
+        self.status = status
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self) -> str:
+        # call() must never go through text(): it runs charset detection,
+        # which is pointless for Sage's UTF-8 JSON.
+        raise AssertionError("SageRpcClient.call() must read raw bytes")
+
+    async def __aenter__(self) -> _FakeResponse:
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        return None
+
+
+class _FakeSession:
+    def __init__(self, status: int = 200, body: bytes = b"{}") -> None:
+        self.closed = False
+        self.posts: list[dict] = []
+        self._status = status
+        self._body = body
+
+    def post(self, url: str, **kwargs: object) -> _FakeResponse:
+        self.posts.append({"url": url, **kwargs})
+        return _FakeResponse(self._status, self._body)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def _make_client(
+    cert: str = "/fake/wallet.crt",
+    *,
+    status: int = 200,
+    body: bytes = b"{}",
+) -> tuple[SageRpcClient, list[_FakeSession]]:
+    client = SageRpcClient(cert_path=Path(cert), key_path=Path("/fake/wallet.key"))
+    made: list[_FakeSession] = []
+
+    def _factory() -> _FakeSession:
+        session = _FakeSession(status, body)
+        made.append(session)
+        return session
+
+    client._make_session = _factory  # type: ignore[method-assign,assignment]
+    return client, made
+
+
+def test_clients_share_session_within_loop() -> None:
+    async def _run() -> None:
+        first, made_first = _make_client()
+        second, made_second = _make_client()
+        async with first:
+            pass
+        async with second:
+            pass
+        assert len(made_first) == 1
+        assert made_second == []
+        assert made_first[0].closed is False
+
+    asyncio.run(_run())
+
+
+def test_distinct_cert_pairs_get_distinct_sessions() -> None:
+    async def _run() -> None:
+        first, made_first = _make_client("/fake/a.crt")
+        second, made_second = _make_client("/fake/b.crt")
+        async with first, second:
+            pass
+        assert len(made_first) == 1
+        assert len(made_second) == 1
+
+    asyncio.run(_run())
+
+
+def test_shared_session_closed_when_loop_shuts_down() -> None:
+    made: list[_FakeSession] = []
+
+    async def _run() -> None:
+        client, sessions = _make_client()
+        async with client:
+            pass
+        made.extend(sessions)
+
+    asyncio.run(_run())
+    assert len(made) == 1
+    assert made[0].closed is True
+
+
+def test_short_lived_loops_leave_no_cached_sessions() -> None:
+    made: list[_FakeSession] = []
+
+    async def _run() -> None:
+        client, sessions = _make_client()
+        async with client:
+            pass
+        made.extend(sessions)
+
+    for _ in range(5):
+        asyncio.run(_run())
+    gc.collect()
+    assert len(sage_rpc._shared_sessions) == 0
+    assert len(made) == 5
+    assert all(session.closed for session in made)
+
+
+def test_shutdown_sage_sessions_closes_and_forgets_sessions() -> None:
+    async def _run() -> None:
+        client, made = _make_client()
+        async with client:
+            pass
+        await shutdown_sage_sessions()
+        assert made[0].closed is True
+        async with client:
+            pass
+        assert len(made) == 2
+
+    asyncio.run(_run())
+
+
+class _FakeSslContext:
+    def __init__(self) -> None:
+        self.check_hostname = True
+        self.verify_mode = None
+        self.loaded: list[tuple[str, str]] = []
+
+    def load_cert_chain(self, certfile: str, keyfile: str) -> None:
+        self.loaded.append((certfile, keyfile))
+
+
+def test_ssl_context_reused_until_cert_changes(tmp_path: Path, monkeypatch) -> None:
+    built: list[_FakeSslContext] = []
+
+    def _fake_create_default_context() -> _FakeSslContext:
+        ctx = _FakeSslContext()
+        built.append(ctx)
+        return ctx
+
+    monkeypatch.setattr(ssl, "create_default_context", _fake_create_default_context)
+    sage_rpc._build_ssl_ctx.cache_clear()
+    cert = tmp_path / "wallet.crt"
+    key = tmp_path / "wallet.key"
+    cert.write_text("cert")
+    key.write_text("key")
+
+    first = sage_rpc._ssl_ctx_for(cert, key)
+    assert sage_rpc._ssl_ctx_for(cert, key) is first
+    assert len(built) == 1
+
+    stat = cert.stat()
+    os.utime(cert, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert sage_rpc._ssl_ctx_for(cert, key) is not first
+    assert len(built) == 2
+    sage_rpc._build_ssl_ctx.cache_clear()
+
+
+def test_call_batch_runs_calls_concurrently_in_order() -> None:
+    async def _run() -> None:
+        client, _ = _make_client()
+        in_flight = 0
+        peak = 0
+
+        async def _fake_call(endpoint: str, body: dict | None = None) -> dict:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return {"endpoint": endpoint, "body": body}
+
+        client.call = _fake_call  # type: ignore[method-assign]
+        results = await client.call_batch([("get_version", {}), ("get_key", {"fingerprint": None})])
+        assert results == [
+            {"endpoint": "get_version", "body": {}},
+            {"endpoint": "get_key", "body": {"fingerprint": None}},
+        ]
+        assert peak == 2
+
+    asyncio.run(_run())
+
+
+def test_call_sends_orjson_body_and_parses_response() -> None:
+    async def _run() -> None:
+        client, made = _make_client(body=b'{"offer": "offer1abc"}')
+        async with client:
+            result = await client.call("make_offer", {"fee": 0})
+        assert result == {"offer": "offer1abc"}
+        post = made[0].posts[0]
+        assert post["url"] == "https://127.0.0.1:9257/make_offer"
+        assert post["data"] == b'{"fee":0}'
+        assert post["headers"] == {"Content-Type": "application/json"}
+
+    asyncio.run(_run())
+
+
+def test_call_applies_per_endpoint_timeouts_with_per_call_override() -> None:
+    async def _run() -> None:
+        client, made = _make_client()
+        async with client:
+            await client.call("get_sync_status", {})
+            await client.call("make_offer", {})
+            await client.call("make_offer", {}, timeout=120.0)
+        read_only, state_changing, override = (p["timeout"] for p in made[0].posts)
+        assert read_only.total == 30.0
+        assert read_only.connect == 5.0
+        assert state_changing.total is None
+        assert state_changing.connect == 5.0
+        assert state_changing.sock_read == 300.0
+        assert override.total == 120.0
+        assert override.sock_read == 120.0
+
+    asyncio.run(_run())
+
+
+def test_call_raises_sage_rpc_error_on_non_200() -> None:
+    async def _run() -> None:
+        client, _ = _make_client(status=500, body=b"boom")
+        async with client:
+            with pytest.raises(SageRpcError) as excinfo:
+                await client.call("get_version")
+        assert excinfo.value.status == 500
+        assert excinfo.value.body == "boom"
+        assert excinfo.value.endpoint == "get_version"
+
+    asyncio.run(_run())
+
+
+def test_call_returns_decoded_text_for_non_json_body() -> None:
+    async def _run() -> None:
+        client, _ = _make_client(body=b"not json")
+        async with client:
+            assert await client.call("get_version") == "not json"
+
+    asyncio.run(_run())
+
+
+def test_call_builds_url_for_endpoints_outside_the_known_table() -> None:
+    async def _run() -> None:
+        client, made = _make_client()
+        async with client:
+            await client.get_version()
+            await client.call("get_nfts", {})
+        assert [p["url"] for p in made[0].posts] == [
+            "https://127.0.0.1:9257/get_version",
+            "https://127.0.0.1:9257/get_nfts",
+        ]
+
+    asyncio.run(_run())
+
+
+def test_sage_rpc_error_formats_message_on_str() -> None:
+    exc = SageRpcError(404, "missing", "get_token")
+    assert str(exc) == "Sage RPC 'get_token' failed with HTTP 404: missing"
+    assert exc.to_dict() == {"error": "missing", "status": 404, "endpoint": "get_token"}
+
+
+def test_bulk_send_cat_sends_one_transaction_by_default() -> None:
+    async def _run() -> None:
+        client, made = _make_client(body=b'{"summary": {}}')
+        async with client:
+            result = await client.bulk_send_cat(
+                asset_id="aa" * 32, addresses=["xch1a"] * 1000, amount=1000
+            )
+        assert result == {"summary": {}}
+        assert len(made[0].posts) == 1
+
+    asyncio.run(_run())
+
+
+def test_bulk_send_cat_sends_opt_in_chunks_one_at_a_time() -> None:
+    async def _run() -> None:
+        client, _ = _make_client()
+        sent: list[list[str]] = []
+        in_flight = 0
+
+        async def _fake_call(endpoint: str, body: dict | None = None) -> dict:
+            nonlocal in_flight
+            assert endpoint == "bulk_send_cat"
+            assert body is not None
+            in_flight += 1
+            assert in_flight == 1
+            await asyncio.sleep(0)
+            in_flight -= 1
+            sent.append(body["addresses"])
+            return {"n": len(body["addresses"])}
+
+        client.call = _fake_call  # type: ignore[method-assign]
+        addresses = [f"xch1addr{i}" for i in range(5)]
+        result = await client.bulk_send_cat(
+            asset_id="aa" * 32, addresses=addresses, amount=1000, chunk_size=2
+        )
+        assert result == {"chunks": [{"n": 2}, {"n": 2}, {"n": 1}]}
+        assert [a for chunk in sent for a in chunk] == addresses
+
+    asyncio.run(_run())
+
+
+def test_get_all_coins_fetches_remaining_pages_concurrently() -> None:
+    async def _run() -> None:
+        client, _ = _make_client()
+        all_coins = [{"coin_id": f"c{i}"} for i in range(7)]
+        offsets: list[int] = []
+
+        async def _fake_get_coins(*, asset_id=None, limit=100, offset=0) -> dict:
+            offsets.append(offset)
+            return {"coins": all_coins[offset : offset + limit], "total": len(all_coins)}
+
+        client.get_coins = _fake_get_coins  # type: ignore[method-assign]
+        coins = await client.get_all_coins(asset_id="aa" * 32, page_size=3)
+        assert coins == all_coins
+        assert offsets == [0, 3, 6]
+
+    asyncio.run(_run())
+
+
+def test_plain_http_client_skips_tls_context(monkeypatch) -> None:
+    def _fail(*_args: object) -> None:
+        raise AssertionError("TLS context must not be built for tls=False")
+
+    monkeypatch.setattr(sage_rpc, "_ssl_ctx_for", _fail)
+
+    async def _run() -> None:
+        client = SageRpcClient(
+            cert_path="/missing/wallet.crt", key_path="/missing/wallet.key", tls=False
+        )
+        session = client._make_session()
+        try:
+            assert client._base_url == "http://127.0.0.1:9257"
+        finally:
+            await session.close()
+
+    asyncio.run(_run())
+
+
+def test_plain_http_rejects_non_loopback_host() -> None:
+    with pytest.raises(ValueError, match="loopback"):
+        SageRpcClient(
+            cert_path="/fake/wallet.crt", key_path="/fake/wallet.key", host="10.0.0.5", tls=False
+        )
+
+
+def test_get_version_is_cached_until_a_state_changing_call() -> None:
+    async def _run() -> None:
+        client, made = _make_client(body=b'{"version": "0.10.0"}')
+        async with client:
+            first = await client.get_version()
+            first["version"] = "mutated"
+            assert await client.get_version() == {"version": "0.10.0"}
+            await client.get_sync_status()
+            await client.get_version()
+            assert len(made[0].posts) == 2
+            await client.make_offer({"fee": 0})
+            await client.get_version()
+            await client.login(123)
+            await client.get_version()
+        assert [p["url"].rsplit("/", 1)[1] for p in made[0].posts] == [
+            "get_version",
+            "get_sync_status",
+            "make_offer",
+            "get_version",
+            "login",
+            "get_version",
+        ]
+
+    asyncio.run(_run())
+
+
+def test_balance_endpoints_are_never_cached() -> None:
+    async def _run() -> None:
+        client, made = _make_client(body=b'{"cats": []}')
+        async with client:
+            await client.get_cats()
+            await client.get_cats()
+            await client.get_token("aa" * 32)
+            await client.get_token("aa" * 32)
+        assert len(made[0].posts) == 4
+
+    asyncio.run(_run())
+
+
+def test_side_effecting_endpoints_are_never_cached() -> None:
+    async def _run() -> None:
+        client, made = _make_client(body=b'{"offer": "offer1abc"}')
+        async with client:
+            await client.make_offer({"fee": 0})
+            await client.make_offer({"fee": 0})
+        assert len(made[0].posts) == 2
+
+    asyncio.run(_run())
+
+
+def test_resolve_sage_client_keeps_default_path_objects() -> None:
+    client = sage_rpc.resolve_sage_client()
+    assert client._cert_path is sage_rpc._default_cert_path()
+    assert client._key_path is sage_rpc._default_key_path()
@@ -9,12 +9,15 @@ Sage login RPC is only issued:
 This means Sage UI wallet switches have no immediate effect; they are only
 overridden when the webui issues an explicit login.
 """
+
 from __future__ import annotations
 
 import asyncio
 from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock
 
+import pytest
+
+from greenfloor.adapters import sage_rpc
 from greenfloor.adapters.sage_rpc import (
     SageRpcClient,
     configure_sage_fingerprint,
@@ -26,50 +29,82 @@ from greenfloor.adapters.sage_rpc import (
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _make_client(fingerprint: int | None = None) -> SageRpcClient:
-    return SageRpcClient(
-        port=9257,
-        cert_path=Path("/fake/wallet.crt"),
-        key_path=Path("/fake/wallet.key"),
-        fingerprint=fingerprint,
-    )
 
+@pytest.fixture(scope="module")
+def runner():
+    # One event loop for the whole module instead of an asyncio.run() loop
+    # bring-up and teardown per test.
+    with asyncio.Runner() as r:
+        yield r
 
-def _patch_session(client: SageRpcClient) -> MagicMock:
-    mock_session = MagicMock()
-    mock_session.closed = False
-    mock_session.close = AsyncMock()
-    client._make_session = MagicMock(return_value=mock_session)  # type: ignore[method-assign]
-    client.login = AsyncMock(return_value={"success": True})  # type: ignore[method-assign]
-    return mock_session
 
+@pytest.fixture(autouse=True)
+def _restore_default_fingerprint():
+    original = sage_rpc._default_fingerprint
+    yield
+    sage_rpc._default_fingerprint = original
 
-# ---------------------------------------------------------------------------
-# __aenter__ never calls login regardless of fingerprint
-# ---------------------------------------------------------------------------
 
+class _FakeSession:
+    closed = False
 
-def test_aenter_no_fingerprint_does_not_call_login() -> None:
-    async def _run() -> None:
-        client = _make_client(fingerprint=None)
+    async def close(self) -> None:
+        return None
+
+
+class _LoginRecorder:
+    """Stands in for SageRpcClient.login and records each fingerprint."""
+
+    def __init__(self) -> None:
+        self.calls: list[int] = []
+
+    async def __call__(self, fingerprint: int) -> dict:
+        self.calls.append(fingerprint)
+        return {"success": True}
+
+
+def _patch_session(client: SageRpcClient) -> _FakeSession:
+    session = _FakeSession()
+    client._make_session = lambda: session  # type: ignore[method-assign,assignment,return-value]
+    client.login = _LoginRecorder()  # type: ignore[method-assign,assignment]
+    return session
+
+
+@pytest.fixture
+def make_client():
+    """Factory for clients with a stubbed session and login; one per call."""
+
+    def _make(fingerprint: int | None = None) -> SageRpcClient:
+        client = SageRpcClient(
+            port=9257,
+            cert_path=Path("/fake/wallet.crt"),
+            key_path=Path("/fake/wallet.key"),
+            fingerprint=fingerprint,
+        )
         _patch_session(client)
-        result = await client.__aenter__()
-        assert result is client
-        client.login.assert_not_called()
+        return client
+
+    return _make
+
+
+# ---------------------------------------------------------------------------
+# __aenter__ never calls login regardless of fingerprint
+# ---------------------------------------------------------------------------
 
-    asyncio.run(_run())
 
+@pytest.mark.parametrize("fingerprint", [None, 111222333])
+def test_aenter_does_not_call_login(
+    runner: asyncio.Runner, make_client, fingerprint: int | None
+) -> None:
+    """A fingerprint is stored on the client but __aenter__ never calls login()."""
 
-def test_aenter_with_fingerprint_does_not_call_login() -> None:
-    """Fingerprint is stored on the client but __aenter__ never calls login()."""
     async def _run() -> None:
-        client = _make_client(fingerprint=111222333)
-        _patch_session(client)
+        client = make_client(fingerprint=fingerprint)
         result = await client.__aenter__()
         assert result is client
-        client.login.assert_not_called()
+        assert client.login.calls == []
 
-    asyncio.run(_run())
+    runner.run(_run())
 
 
 # ---------------------------------------------------------------------------
@@ -78,35 +113,19 @@ def test_aenter_with_fingerprint_does_not_call_login() -> None:
 
 
 def test_configure_sage_fingerprint_sets_default() -> None:
-    from greenfloor.adapters import sage_rpc as mod
-
-    original = mod._default_fingerprint
-    try:
-        configure_sage_fingerprint(424242)
-        assert mod._default_fingerprint == 424242
-
-        configure_sage_fingerprint(None)
-        assert mod._default_fingerprint is None
-    finally:
-        mod._default_fingerprint = original
-
+    configure_sage_fingerprint(424242)
+    assert sage_rpc._default_fingerprint == 424242
 
-def test_resolve_sage_client_uses_module_default(tmp_path: Path) -> None:
-    from greenfloor.adapters import sage_rpc as mod
+    configure_sage_fingerprint(None)
+    assert sage_rpc._default_fingerprint is None
 
-    fake_cert = tmp_path / "wallet.crt"
-    fake_cert.touch()
-    fake_key = tmp_path / "wallet.key"
-    fake_key.touch()
 
-    original = mod._default_fingerprint
-    try:
-        configure_sage_fingerprint(777888)
-        client = resolve_sage_client(
-            port=9257,
-            cert_path=str(fake_cert),
-            key_path=str(fake_key),
-        )
-        assert client._fingerprint == 777888
-    finally:
-        mod._default_fingerprint = original
+def test_resolve_sage_client_uses_module_default() -> None:
+    # resolve_sage_client never touches the filesystem, so the paths need not exist.
+    configure_sage_fingerprint(777888)
+    client = resolve_sage_client(
+        port=9257,
+        cert_path="/fake/wallet.crt",
+        key_path="/fake/wallet.key",
+    )
+    assert client._fingerprint == 777888
@@ -157,3 +157,43 @@ def test_evaluate_market_carries_target_spread_bps_into_actions() -> None:
     )
     assert len(actions) == 1
     assert actions[0].target_spread_bps == 125
+
+
+def test_evaluate_market_generic_ladder_uses_presorted_targets() -> None:
+    config = StrategyConfig(pair="xch", targets_by_size={50: 1, 5: 3, 20: 2})
+    assert config.sorted_targets == ((5, 3), (20, 2), (50, 1))
+    assert config == StrategyConfig(pair="xch", targets_by_size={5: 3, 20: 2, 50: 1})
+
+    actions = evaluate_market(
+        state=MarketState(
+            ones=0, tens=0, hundreds=0, xch_price_usd=30.0, buckets_by_size={5: 1, 20: 2}
+        ),
+        config=config,
+        clock=_clock(),
+    )
+    assert [(a.size, a.repeat) for a in actions] == [(5, 2), (50, 1)]
+
+
+def test_planned_action_to_dict_lists_every_field() -> None:
+    action = PlannedAction(
+        size=10,
+        repeat=2,
+        pair="xch",
+        expiry_unit="minutes",
+        expiry_value=10,
+        cancel_after_create=True,
+        reason="below_target",
+        target_spread_bps=125,
+        direction="buy",
+    )
+    assert action.to_dict() == {
+        "size": 10,
+        "repeat": 2,
+        "pair": "xch",
+        "expiry_unit": "minutes",
+        "expiry_value": 10,
+        "cancel_after_create": True,
+        "reason": "below_target",
+        "target_spread_bps": 125,
+        "direction": "buy",
+    }
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import shutil
+from pathlib import Path
+
+from greenfloor.webui import market_loop
+from greenfloor.webui.market_loop import MarketLoop
+
+
+def test_count_enabled_markets_reparses_only_when_file_changes(tmp_path: Path, monkeypatch) -> None:
+    markets_path = tmp_path / "markets.yaml"
+    shutil.copy("config/markets.yaml", markets_path)
+    parses: list[Path] = []
+    real_load = market_loop.load_markets_config_with_optional_overlay
+
+    def _counting_load(*, path: Path, overlay_path: Path | None):
+        parses.append(path)
+        return real_load(path=path, overlay_path=overlay_path)
+
+    monkeypatch.setattr(market_loop, "load_markets_config_with_optional_overlay", _counting_load)
+    market_loop._load_markets_cached.cache_clear()
+    loop = MarketLoop(program_path=Path("config/program.yaml"), markets_path=markets_path)
+
+    assert loop._count_enabled_markets() == 0
+    assert loop._count_enabled_markets() == 0
+    assert len(parses) == 1
+
+    markets_path.write_text(
+        markets_path.read_text(encoding="utf-8").replace("enabled: false", "enabled: true"),
+        encoding="utf-8",
+    )
+    stat = markets_path.stat()
+    os.utime(markets_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert loop._count_enabled_markets() > 0
+    assert len(parses) == 2
+    market_loop._load_markets_cached.cache_clear()
+
+
+def test_log_events_are_bounded_and_status_returns_latest(monkeypatch) -> None:
+    loop = MarketLoop(
+        program_path=Path("config/program.yaml"), markets_path=Path("config/markets.yaml")
+    )
+    monkeypatch.setattr(loop, "_sage_connected", lambda: False)
+    for i in range(market_loop._MAX_LOG_EVENTS + 5):
+        loop._emit("tick", f"event {i}")
+
+    assert len(loop._log_events) == market_loop._MAX_LOG_EVENTS
+    recent = loop.status()["recent_events"]
+    assert [e["message"] for e in recent] == [
+        f"event {i}"
+        for i in range(market_loop._MAX_LOG_EVENTS - 15, market_loop._MAX_LOG_EVENTS + 5)
+    ]
+
+
+def test_now_iso_formats_once_per_second(monkeypatch) -> None:
+    market_loop._format_iso.cache_clear()
+    now_ns = [1_771_588_800_250_000_000]
+    monkeypatch.setattr(market_loop.time, "time_ns", lambda: now_ns[0])
+
+    first = market_loop._now_iso()
+    now_ns[0] += 500_000_000
+    assert market_loop._now_iso() is first
+    assert first == "2026-02-20T12:00:00+00:00"
+    now_ns[0] += 500_000_000
+    assert market_loop._now_iso() == "2026-02-20T12:00:01+00:00"
+    market_loop._format_iso.cache_clear()
+
+
+def _counting_loop(monkeypatch) -> tuple[MarketLoop, list[int]]:
+    loop = MarketLoop(
+        program_path=Path("config/program.yaml"), markets_path=Path("config/markets.yaml")
+    )
+    cycles: list[int] = []
+
+    async def _fake_cycle() -> dict:
+        cycles.append(len(cycles) + 1)
+        await asyncio.sleep(0)
+        return {"loop_interval_seconds": 3600, "status": "ok", "cycle": len(cycles)}
+
+    monkeypatch.setattr(loop, "_run_once_in_executor", _fake_cycle)
+    return loop, cycles
+
+
+def test_trigger_once_wakes_sleeping_loop_without_overlap(monkeypatch) -> None:
+    async def _run() -> None:
+        loop, cycles = _counting_loop(monkeypatch)
+        loop.start()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert cycles == [1]
+
+        result = await asyncio.wait_for(loop.trigger_once(), timeout=1)
+        assert result["cycle"] == 2
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert cycles == [1, 2]
+        loop.stop()
+
+    asyncio.run(_run())
+
+
+def test_trigger_once_during_cycle_reuses_in_flight_result(monkeypatch) -> None:
+    async def _run() -> None:
+        loop, cycles = _counting_loop(monkeypatch)
+        loop.start()
+        await asyncio.sleep(0)
+        assert cycles == [1]
+
+        # Awaited directly (not via wait_for) so the trigger lands mid-cycle.
+        result = await loop.trigger_once()
+        assert result["cycle"] == 1
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert cycles == [1]
+        loop.stop()
+
+    asyncio.run(_run())
+
+
+def test_trigger_once_runs_directly_when_loop_stopped(monkeypatch) -> None:
+    async def _run() -> None:
+        loop, cycles = _counting_loop(monkeypatch)
+        first, second = await asyncio.gather(loop.trigger_once(), loop.trigger_once())
+        assert (first["cycle"], second["cycle"]) == (1, 2)
+        assert cycles == [1, 2]
+
+    asyncio.run(_run())
@@ -0,0 +1,623 @@
+"""Tests for the web UI server helpers."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import cast
+
+import pytest
+from aiohttp import web
+
+from greenfloor.webui import server
+
+
+@pytest.fixture(autouse=True)
+def _clear_yaml_cache():
+    server._YAML_CACHE.clear()
+    yield
+    server._YAML_CACHE.clear()
+
+
+def _load(path: Path):
+    return asyncio.run(server._load_yaml_cached(str(path)))
+
+
+def test_load_yaml_cached_reparses_only_when_file_changes(tmp_path: Path) -> None:
+    path = tmp_path / "program.yaml"
+    path.write_text("sage_rpc:\n  port: 9257\n", encoding="utf-8")
+
+    first = _load(path)
+    parsed = server._YAML_CACHE[str(path)][2]
+    first["sage_rpc"]["port"] = 1
+    assert _load(path) == {"sage_rpc": {"port": 9257}}
+    assert server._YAML_CACHE[str(path)][2] is parsed
+
+    path.write_text("sage_rpc:\n  port: 9999\n", encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert _load(path) == {"sage_rpc": {"port": 9999}}
+    assert server._YAML_CACHE[str(path)][2] is not parsed
+
+
+def test_load_yaml_cached_evicts_least_recently_used(tmp_path: Path) -> None:
+    paths = []
+    for i in range(server._YAML_CACHE_MAX + 1):
+        path = tmp_path / f"{i}.yaml"
+        path.write_text(f"n: {i}\n", encoding="utf-8")
+        paths.append(str(path))
+        _load(path)
+    assert len(server._YAML_CACHE) == server._YAML_CACHE_MAX
+    assert paths[0] not in server._YAML_CACHE
+    assert paths[-1] in server._YAML_CACHE
+
+
+def _request(**attrs) -> web.Request:
+    return cast(web.Request, SimpleNamespace(**attrs))
+
+
+def _json_body(response: web.Response):
+    assert isinstance(response.body, bytes)
+    return json.loads(response.body)
+
+
+def _prices_cache() -> dict:
+    return server._new_prices_cache()
+
+
+def test_handle_prices_fetches_concurrently_on_shared_session(monkeypatch) -> None:
+    session = object()
+    in_flight = 0
+    peak = 0
+
+    async def _fake_xch(sess):
+        nonlocal in_flight, peak
+        assert sess is session
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        raise RuntimeError("coincodex down")
+
+    async def _fake_tickers(sess):
+        nonlocal in_flight, peak
+        assert sess is session
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return [{"ticker_id": "BYC_XCH"}]
+
+    monkeypatch.setattr(server, "_fetch_xch_usd", _fake_xch)
+    monkeypatch.setattr(server, "_fetch_tickers", _fake_tickers)
+    request = _request(app={"http_session": session, "prices_cache": _prices_cache()})
+
+    response = asyncio.run(server.handle_prices(request))
+    assert _json_body(response) == {
+        "ok": True,
+        "xch_usd": 0.0,
+        "tickers": [{"ticker_id": "BYC_XCH"}],
+    }
+    assert peak == 2
+
+
+def test_handle_prices_serves_cached_payload_within_ttl(monkeypatch) -> None:
+    fetches = 0
+
+    async def _fake_xch(_session):
+        nonlocal fetches
+        fetches += 1
+        await asyncio.sleep(0)
+        return 5.0
+
+    async def _fake_tickers(_session):
+        return []
+
+    monkeypatch.setattr(server, "_fetch_xch_usd", _fake_xch)
+    monkeypatch.setattr(server, "_fetch_tickers", _fake_tickers)
+
+    async def _run() -> None:
+        request = _request(app={"http_session": object(), "prices_cache": _prices_cache()})
+        responses = await asyncio.gather(*(server.handle_prices(request) for _ in range(3)))
+        assert {_json_body(r)["xch_usd"] for r in responses} == {5.0}
+        assert fetches == 1
+        request.app["prices_cache"]["expires"] -= server._PRICES_TTL_SECONDS
+        await server.handle_prices(request)
+        assert fetches == 2
+
+    asyncio.run(_run())
+
+
+def test_handle_prices_caches_failures_briefly_and_serves_last_good(monkeypatch) -> None:
+    xch_prices: list[float | Exception] = [5.0, RuntimeError("coincodex down"), 6.0]
+    fetches = 0
+
+    async def _fake_xch(_session):
+        nonlocal fetches
+        fetches += 1
+        result = xch_prices.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def _fake_tickers(_session):
+        return [{"ticker_id": "BYC_XCH"}]
+
+    monkeypatch.setattr(server, "_fetch_xch_usd", _fake_xch)
+    monkeypatch.setattr(server, "_fetch_tickers", _fake_tickers)
+
+    async def _run() -> None:
+        cache = _prices_cache()
+        request = _request(app={"http_session": object(), "prices_cache": cache})
+        assert _json_body(await server.handle_prices(request))["xch_usd"] == 5.0
+
+        cache["expires"] = 0.0
+        assert _json_body(await server.handle_prices(request))["xch_usd"] == 5.0
+        assert cache["expires"] - time.monotonic() <= server._PRICES_FAILURE_TTL_SECONDS
+        assert _json_body(await server.handle_prices(request))["xch_usd"] == 5.0
+        assert fetches == 2
+
+        cache["expires"] = 0.0
+        assert _json_body(await server.handle_prices(request))["xch_usd"] == 6.0
+        assert fetches == 3
+
+    asyncio.run(_run())
+
+
+def test_handle_prices_never_errors_when_refresh_raises(monkeypatch) -> None:
+    async def _boom(_cache, _session):
+        raise RuntimeError("unexpected")
+
+    monkeypatch.setattr(server, "_refresh_prices", _boom)
+    request = _request(app={"http_session": object(), "prices_cache": _prices_cache()})
+
+    response = asyncio.run(server.handle_prices(request))
+    assert response.status == 200
+    assert _json_body(response) == {"ok": True, "xch_usd": 0.0, "tickers": []}
+
+
+def test_handle_prices_shares_one_refresh_that_survives_client_cancel(monkeypatch) -> None:
+    release = asyncio.Event()
+    fetches = 0
+
+    async def _slow_xch(_session):
+        nonlocal fetches
+        fetches += 1
+        await release.wait()
+        return 7.0
+
+    async def _fake_tickers(_session):
+        return []
+
+    monkeypatch.setattr(server, "_fetch_xch_usd", _slow_xch)
+    monkeypatch.setattr(server, "_fetch_tickers", _fake_tickers)
+
+    async def _run() -> None:
+        cache = _prices_cache()
+        request = _request(app={"http_session": object(), "prices_cache": cache})
+        first = asyncio.create_task(server.handle_prices(request))
+        waiter = asyncio.create_task(server.handle_prices(request))
+        await asyncio.sleep(0)
+        assert cache["refresh"] is not None
+        # The client that started the refresh goes away; the others still get it.
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        assert _json_body(await waiter)["xch_usd"] == 7.0
+        assert fetches == 1
+        assert cache["refresh"] is None
+
+    asyncio.run(_run())
+
+
+def test_app_sage_client_reused_until_sage_rpc_config_changes(monkeypatch) -> None:
+    cfg = {"port": 9257, "cert_path": "/fake/wallet.crt", "key_path": "/fake/wallet.key"}
+
+    async def _fake_cfg() -> dict:
+        return dict(cfg)
+
+    monkeypatch.setattr(server, "_load_sage_rpc_cfg", _fake_cfg)
+    app = cast(web.Application, {"sage_client": {"key": None, "client": None}})
+
+    def _client():
+        return asyncio.run(server._app_sage_client(app))
+
+    first = _client()
+    assert _client() is first
+
+    cfg["port"] = 9258
+    second = _client()
+    assert second is not first
+    assert second._base_url == "https://127.0.0.1:9258"
+
+
+def test_orjson_response_encodes_yaml_shaped_payloads() -> None:
+    response = server._orjson_response({"ok": True, "markets": [{1: "a", "id": "m1"}]}, status=201)
+    assert response.status == 201
+    assert response.content_type == "application/json"
+    assert _json_body(response) == {"ok": True, "markets": [{"1": "a", "id": "m1"}]}
+
+
+class _RecordingStreamResponse(web.StreamResponse):
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes: list[bytes] = []
+
+    async def write(self, data: bytes | bytearray | memoryview) -> None:
+        self.writes.append(bytes(data))
+
+    def events(self) -> list[dict]:
+        frames = b"".join(self.writes).split(b"\n\n")
+        assert frames.pop() == b""
+        assert all(f.startswith(b"data: ") for f in frames)
+        return [json.loads(f[len(b"data: ") :]) for f in frames]
+
+
+def _stream_app() -> web.Application:
+    return cast(web.Application, {"subproc_limiter": server._SubprocessLimiter()})
+
+
+def _fake_manager(tmp_path: Path, body: str) -> str:
+    script = tmp_path / "greenfloor-manager"
+    script.write_text(f"#!{sys.executable}\nimport json, sys\n{body}\n", encoding="utf-8")
+    script.chmod(0o755)
+    return str(script)
+
+
+def _use_manager(monkeypatch, manager: str) -> None:
+    monkeypatch.setattr(server, "_manager_cmd", lambda: manager)
+
+
+def test_stream_emits_cmd_output_and_done_events(tmp_path: Path, monkeypatch) -> None:
+    manager = _fake_manager(
+        tmp_path,
+        'print(json.dumps({"step": 1}))\nprint("warming up", file=sys.stderr)',
+    )
+    _use_manager(monkeypatch, manager)
+    response = _RecordingStreamResponse()
+
+    asyncio.run(
+        server._stream(
+            _stream_app(),
+            response,
+            "doctor",
+            program_path="p.yaml",
+            markets_path="m.yaml",
+            timeout=30,
+        )
+    )
+
+    events = response.events()
+    assert events[0]["type"] == "cmd"
+    assert sorted((e["type"], e["data"]) for e in events[1:-1]) == [
+        ("json_line", {"step": 1}),
+        ("stderr_text", "warming up"),
+    ]
+    assert events[-1] == {"type": "done", "data": {"exit_code": 0, "ok": True}}
+
+
+def test_stream_classifies_json_and_text_lines(tmp_path: Path, monkeypatch) -> None:
+    manager = _fake_manager(
+        tmp_path,
+        'print(json.dumps([1, "two"]))\nprint("not json {")\nprint("\\u00e9t\\u00e9")\n'
+        'print("[INFO] starting")\nprint(json.dumps({"amount": 2 ** 70}), file=sys.stderr)',
+    )
+    _use_manager(monkeypatch, manager)
+    response = _RecordingStreamResponse()
+
+    asyncio.run(
+        server._stream(_stream_app(), response, program_path="p.yaml", markets_path="m.yaml")
+    )
+
+    events = [(e["type"], e["data"]) for e in response.events()[1:-1]]
+    assert [e for e in events if not e[0].startswith("stderr")] == [
+        ("json_line", [1, "two"]),
+        ("text_line", "not json {"),
+        ("text_line", "\u00e9t\u00e9"),
+        ("text_line", "[INFO] starting"),
+    ]
+    # JSON lines are passed through verbatim, so wide integers stay exact.
+    assert ("stderr_line", {"amount": 2**70}) in events
+
+
+def test_stream_splits_bulk_reads_into_lines(tmp_path: Path, monkeypatch) -> None:
+    manager = _fake_manager(
+        tmp_path,
+        "sys.stdout.write('\\n'.join(json.dumps({'n': i}) for i in range(2000)))",
+    )
+    _use_manager(monkeypatch, manager)
+    response = _RecordingStreamResponse()
+
+    asyncio.run(
+        server._stream(_stream_app(), response, program_path="p.yaml", markets_path="m.yaml")
+    )
+
+    events = response.events()
+    assert [e["data"] for e in events if e["type"] == "json_line"] == [
+        {"n": i} for i in range(2000)
+    ]
+    # Bursts are coalesced into a handful of writes, each ending on a frame boundary.
+    assert len(response.writes) < 50
+    assert all(w.endswith(b"\n\n") for w in response.writes)
+
+
+def test_config_paths_cached_only_once_home_config_exists(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    monkeypatch.setattr(server, "_RESOLVED_PATHS", {})
+    home_cfg = tmp_path / ".greenfloor" / "config"
+    repo_program = str(server._REPO_ROOT / "config" / "program.yaml")
+
+    assert server._default_config_paths()[0] == repo_program
+    assert server._RESOLVED_PATHS == {}
+
+    home_cfg.mkdir(parents=True)
+    (home_cfg / "program.yaml").write_text("{}\n", encoding="utf-8")
+    (home_cfg / "markets.yaml").write_text("{}\n", encoding="utf-8")
+    resolved = (str(home_cfg / "program.yaml"), str(home_cfg / "markets.yaml"))
+    assert server._default_config_paths() == resolved
+
+    calls = 0
+    real_exists = Path.exists
+
+    def _counting_exists(self: Path) -> bool:
+        nonlocal calls
+        calls += 1
+        return real_exists(self)
+
+    monkeypatch.setattr(Path, "exists", _counting_exists)
+    assert server._default_config_paths() == resolved
+    assert calls == 0
+
+
+def test_manager_cmd_cached_only_once_venv_script_exists(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(server, "_VENV_BIN", tmp_path)
+    monkeypatch.setattr(server, "_RESOLVED_PATHS", {})
+
+    assert server._manager_cmd() == "greenfloor-manager"
+    script = tmp_path / "greenfloor-manager"
+    script.write_text("", encoding="utf-8")
+    assert server._manager_cmd() == str(script)
+    script.unlink()
+    assert server._manager_cmd() == str(script)
+
+
+def test_manager_prefix_follows_config_created_after_startup(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    monkeypatch.setattr(server, "_RESOLVED_PATHS", {})
+    home_cfg = tmp_path / ".greenfloor" / "config"
+
+    prefix = server._manager_prefix(None, None)
+    assert prefix[2] == str(server._REPO_ROOT / "config" / "program.yaml")
+    assert prefix[5:] == ("--json",)
+
+    home_cfg.mkdir(parents=True)
+    (home_cfg / "program.yaml").write_text("{}\n", encoding="utf-8")
+    (home_cfg / "markets.yaml").write_text("{}\n", encoding="utf-8")
+    prefix = server._manager_prefix(None, None)
+    assert prefix[2] == str(home_cfg / "program.yaml")
+    assert prefix[4] == str(home_cfg / "markets.yaml")
+    assert server._manager_prefix("p.yaml", "m.yaml")[1:5] == (
+        "--program-config",
+        "p.yaml",
+        "--markets-config",
+        "m.yaml",
+    )
+
+
+def _index_request(**headers: str) -> web.Request:
+    return _request(headers=headers)
+
+
+def test_handle_index_serves_precompressed_html_with_etag() -> None:
+    gzipped = asyncio.run(server.handle_index(_index_request(**{"Accept-Encoding": "gzip, br"})))
+    assert gzipped.headers["Content-Encoding"] == "gzip"
+    assert isinstance(gzipped.body, bytes)
+    assert gzip.decompress(gzipped.body) == server._HTML.encode()
+    etag = gzipped.headers["ETag"]
+
+    plain = asyncio.run(server.handle_index(_index_request()))
+    assert "Content-Encoding" not in plain.headers
+    assert plain.body == server._HTML.encode()
+    assert plain.headers["ETag"] == etag
+
+    cached = asyncio.run(server.handle_index(_index_request(**{"If-None-Match": etag})))
+    assert cached.status == 304
+    assert cached.body is None
+
+
+class _JsonRequest:
+    def __init__(self, body: dict) -> None:
+        self._body = body
+
+    async def json(self) -> dict:
+        return self._body
+
+
+def test_config_write_replaces_file_atomically_and_primes_cache(
+    tmp_path: Path, monkeypatch
+) -> None:
+    prog = tmp_path / "program.yaml"
+    prog.write_text("app:\n  network: mainnet\nsage_rpc:\n  port: 9257\n", encoding="utf-8")
+    prog.chmod(0o640)
+    monkeypatch.setattr(server, "_default_config_paths", lambda: (str(prog), "unused"))
+
+    async def _run() -> None:
+        response = await server.handle_config_write(
+            cast(
+                web.Request,
+                _JsonRequest({"patches": {"sage_rpc.port": 9300, "app.network": "testnet11"}}),
+            )
+        )
+        assert _json_body(response) == {"ok": True, "path": str(prog)}
+        cached = server._YAML_CACHE[str(prog)]
+        assert cached[:2] == (prog.stat().st_mtime_ns, prog.stat().st_size)
+        assert await server._load_yaml_cached(str(prog)) == {
+            "app": {"network": "testnet11"},
+            "sage_rpc": {"port": 9300},
+        }
+        assert server._YAML_CACHE[str(prog)][2] is cached[2]
+
+    asyncio.run(_run())
+    assert (prog.stat().st_mode & 0o777) == 0o640
+    assert [p.name for p in tmp_path.iterdir()] == ["program.yaml"]
+
+
+def test_write_yaml_updates_symlink_target_in_place(tmp_path: Path) -> None:
+    real_dir = tmp_path / "dotfiles"
+    real_dir.mkdir()
+    real = real_dir / "program.yaml"
+    real.write_text("app:\n  network: mainnet\n", encoding="utf-8")
+    link = tmp_path / "program.yaml"
+    link.symlink_to(real)
+
+    st = server._write_yaml(str(link), {"app": {"network": "testnet11"}})
+
+    assert link.is_symlink()
+    assert os.readlink(link) == str(real)
+    assert real.read_text(encoding="utf-8") == "app:\n  network: testnet11\n"
+    assert st.st_ino == real.stat().st_ino
+    assert sorted(p.name for p in real_dir.iterdir()) == ["program.yaml"]
+
+
+def test_coalesce_writes_flushes_on_size_and_sentinel() -> None:
+    async def _run() -> list[bytes]:
+        response = _RecordingStreamResponse()
+        queue: asyncio.Queue = asyncio.Queue()
+        big = b"x" * server._SSE_FLUSH_BYTES
+        for frame in (b"a", big, b"b", b"c", None):
+            queue.put_nowait(frame)
+        await server._coalesce_writes(response, queue)
+        return response.writes
+
+    assert asyncio.run(_run()) == [b"a" + b"x" * server._SSE_FLUSH_BYTES, b"bc"]
+
+
+class _FakeMarketLoop:
+    def __init__(self) -> None:
+        self.status_calls = 0
+        self.started = False
+
+    def status(self) -> dict:
+        self.status_calls += 1
+        return {"running": self.started, "sage_connected": True, "enabled_markets": 2}
+
+    def start(self) -> None:
+        self.started = True
+
+
+def test_market_loop_start_reads_status_once() -> None:
+    loop = _FakeMarketLoop()
+    request = _request(app={"market_loop": loop})
+
+    response = asyncio.run(server.handle_market_loop_start(request))
+
+    assert _json_body(response) == {
+        "ok": True,
+        "status": {"running": True, "sage_connected": True, "enabled_markets": 2},
+    }
+    assert loop.started is True
+    assert loop.status_calls == 1
+
+
+def test_subprocess_limiter_bounds_concurrency_and_counts_waiters() -> None:
+    async def _run() -> None:
+        limiter = server._SubprocessLimiter(limit=2)
+        release = asyncio.Event()
+        peak = 0
+
+        async def _job() -> None:
+            nonlocal peak
+            async with limiter:
+                peak = max(peak, limiter.running)
+                await release.wait()
+
+        tasks = [asyncio.create_task(_job()) for _ in range(5)]
+        await asyncio.sleep(0)
+        assert limiter.snapshot() == {"limit": 2, "running": 2, "waiting": 3}
+        release.set()
+        await asyncio.gather(*tasks)
+        assert peak == 2
+        assert limiter.snapshot() == {"limit": 2, "running": 0, "waiting": 0}
+
+    asyncio.run(_run())
+
+
+def test_stream_kills_timed_out_command_after_forwarding_output(
+    tmp_path: Path, monkeypatch
+) -> None:
+    manager = _fake_manager(
+        tmp_path,
+        'import time\nprint(json.dumps({"step": 1}), flush=True)\ntime.sleep(30)',
+    )
+    _use_manager(monkeypatch, manager)
+    response = _RecordingStreamResponse()
+
+    asyncio.run(
+        server._stream(
+            _stream_app(), response, program_path="p.yaml", markets_path="m.yaml", timeout=1
+        )
+    )
+
+    events = [(e["type"], e["data"]) for e in response.events()[1:]]
+    assert events == [
+        ("json_line", {"step": 1}),
+        ("error", {"message": "command timed out"}),
+    ]
+
+
+class _DisconnectingStreamResponse(_RecordingStreamResponse):
+    """Accepts the first write, then fails like a client that went away."""
+
+    async def write(self, data: bytes | bytearray | memoryview) -> None:
+        if self.writes:
+            raise ConnectionResetError("client disconnected")
+        await super().write(data)
+
+
+def test_stream_kills_command_and_frees_slot_when_client_disconnects(
+    tmp_path: Path, monkeypatch
+) -> None:
+    # ~1 MiB of output overruns the pipe and StreamReader buffers, so the
+    # child blocks writing once nobody drains them; then it would idle.
+    manager = _fake_manager(
+        tmp_path,
+        "import time\n"
+        "for i in range(20000):\n"
+        "    print(json.dumps({'n': i, 'pad': 'x' * 32}))\n"
+        "sys.stdout.flush()\n"
+        "time.sleep(30)",
+    )
+    _use_manager(monkeypatch, manager)
+    app = _stream_app()
+    spawned: list[asyncio.subprocess.Process] = []
+    real_exec = asyncio.create_subprocess_exec
+
+    async def _recording_exec(*args, **kwargs):
+        proc = await real_exec(*args, **kwargs)
+        spawned.append(proc)
+        return proc
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", _recording_exec)
+
+    async def _run() -> None:
+        with pytest.raises(ConnectionResetError):
+            await asyncio.wait_for(
+                server._stream(
+                    app,
+                    _DisconnectingStreamResponse(),
+                    program_path="p.yaml",
+                    markets_path="m.yaml",
+                    timeout=30,
+                ),
+                timeout=10,
+            )
+
+    asyncio.run(_run())
+    assert app["subproc_limiter"].snapshot() == {"limit": 4, "running": 0, "waiting": 0}
+    assert spawned[0].returncode is not None and spawned[0].returncode < 0